@@ -1,13 +1,30 @@
+from typing import List
 from fastapi import APIRouter, Depends, UploadFile, File
 from services.ai_service import AIService, get_ai_service
+from services.recipe_service import RecipeService
 from domain.agent import ChatRequest, ChatResponse, IngredientsRequest, ConsultRequest
-from api.deps import get_current_active_user
+from domain.recipe import IngredientMatch
+from api.deps import get_current_active_user, get_recipe_service
+from core.config import get_settings
 from domain.user import UserInDB
 from core.ratelimit import limiter
 from fastapi import Request
 
 router = APIRouter()
 
+settings = get_settings()
+
+# Catalog recipes offered instead of an AI answer
+CATALOG_MATCH_LIMIT = 5
+
+
+def _catalog_answer(matches: List[IngredientMatch]) -> str:
+    lines = ["Z těchto ingrediencí můžete uvařit recepty z naší sbírky:"]
+    for match in matches:
+        missing = f" (chybí: {', '.join(match.missing)})" if match.missing else ""
+        lines.append(f"- {match.title}{missing}")
+    return "\n".join(lines)
+
 @router.post("/chat", response_model=ChatResponse)
 @limiter.limit("20/minute")
 async def chat_with_agent(
@@ -43,11 +60,20 @@ async def generate_from_ingredients(
     ing_data: IngredientsRequest,
     request: Request,
     ai_service: AIService = Depends(get_ai_service),
+    recipe_service: RecipeService = Depends(get_recipe_service),
     current_user: UserInDB = Depends(get_current_active_user)
 ):
     """
     Generate a recipe based on a list of ingredients.
+    Recipes already in the catalog that need at most CATALOG_MAX_MISSING
+    more ingredients are returned instead, without calling the AI.
     """
+    if ing_data.use_catalog:
+        matches = await recipe_service.match_ingredients(
+            ing_data.ingredients, CATALOG_MATCH_LIMIT, settings.CATALOG_MAX_MISSING
+        )
+        if matches:
+            return ChatResponse(response=_catalog_answer(matches), recipes=matches)
     response_text = await ai_service.generate_recipe_from_ingredients(ing_data.ingredients)
     return ChatResponse(response=response_text)
 
@@ -1,14 +1,20 @@
 from fastapi import Depends, HTTPException, status
 from typing import Optional
 from fastapi.security import OAuth2PasswordBearer
-from jose import jwt, JWTError
+from jose import JWTError
+from auth.jwt import decode_token
+from core.cache import TTLCache
 from core.config import get_settings
 from core.database import get_database
+from core.invalidation import ChangeEvent, invalidation_bus
 from repository.user_repository import UserRepository
 from repository.recipe_repository import RecipeRepository
 from repository.shopping_cart_repository import ShoppingCartRepository
-from domain.user import UserInDB
+from repository.favorite_repository import FavoriteRepository
+from domain.user import UserInDB, UserRole
+from auth.revocation import token_revocations
 from services.recipe_service import RecipeService
+from services.shopping_list_service import ShoppingListService
 from services.scraping_service import ScrapingService
 from services.ai_service import AIService
 
@@ -16,6 +22,70 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 oauth2_scheme_optional = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login", auto_error=False)
 settings = get_settings()
 
+# Authenticated users by token subject (email), so most requests skip the
+# user lookup. Dropped on every write to the user, see _on_user_change
+user_cache = TTLCache(ttl=settings.USER_CACHE_SECONDS, maxsize=settings.USER_CACHE_SIZE)
+# Bumped on every invalidation; a lookup that raced with one is not cached
+_user_generation = 0
+
+
+def _on_user_change(event: ChangeEvent):
+    global _user_generation
+    _user_generation += 1
+    if event.operation == "reset":
+        user_cache.clear()
+        return
+    if event.document and event.document.get("email"):
+        user_cache.pop(event.document["email"])
+    # The email may have changed, and deletes only carry the id
+    user_cache.pop_matching(lambda user: user.id == event.document_id)
+
+
+invalidation_bus.subscribe("users", _on_user_change)
+
+
+async def _get_user(email: str, user_repo: UserRepository) -> Optional[UserInDB]:
+    user = user_cache.get(email)
+    if user is None:
+        generation = _user_generation
+        user = await user_repo.get_by_email(email)
+        if user is None:
+            return None
+        if generation == _user_generation:
+            user_cache.set(email, user)
+    # The cached instance is shared between requests
+    return user.model_copy()
+
+
+# Claims that let an access token stand in for the user (STATELESS_TOKENS)
+_USER_CLAIMS = ("uid", "role", "active", "ver")
+
+
+async def _resolve_user(payload: dict, user_repo: UserRepository) -> Optional[UserInDB]:
+    """The user a valid token payload names, or None if it is unknown or revoked."""
+    if (
+        settings.STATELESS_TOKENS
+        and token_revocations.ready
+        and all(claim in payload for claim in _USER_CLAIMS)
+    ):
+        if token_revocations.is_revoked(payload["uid"], payload["ver"]):
+            return None
+        # Only what the claims carry; the password hash and created_at are
+        # not known without a lookup
+        return UserInDB.model_construct(
+            id=payload["uid"],
+            email=payload["sub"],
+            role=UserRole(payload["role"]),
+            is_active=payload["active"],
+            hashed_password="",
+            token_version=payload["ver"],
+        )
+
+    user = await _get_user(payload["sub"], user_repo)
+    if user is None or payload.get("ver", 0) < user.token_version:
+        return None
+    return user
+
 async def get_user_repo(db = Depends(get_database)) -> UserRepository:
     return UserRepository(db)
 
@@ -25,6 +95,9 @@ async def get_recipe_repo(db = Depends(get_database)) -> RecipeRepository:
 async def get_shopping_cart_repo(db = Depends(get_database)) -> ShoppingCartRepository:
     return ShoppingCartRepository(db)
 
+async def get_favorite_repo(db = Depends(get_database)) -> FavoriteRepository:
+    return FavoriteRepository(db)
+
 async def get_current_user(
     token: str = Depends(oauth2_scheme), 
     user_repo: UserRepository = Depends(get_user_repo)
@@ -35,14 +108,14 @@ async def get_current_user(
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        payload = decode_token(token)
         email: str = payload.get("sub")
         if email is None:
             raise credentials_exception
     except JWTError:
         raise credentials_exception
         
-    user = await user_repo.get_by_email(email)
+    user = await _resolve_user(payload, user_repo)
     if user is None:
         raise credentials_exception
     return user
@@ -54,14 +127,14 @@ async def get_current_user_optional(
     if not token:
         return None
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        payload = decode_token(token)
         email: str = payload.get("sub")
         if email is None:
             return None
     except JWTError:
         return None
         
-    user = await user_repo.get_by_email(email)
+    user = await _resolve_user(payload, user_repo)
     return user
 
 async def get_current_active_user(current_user: UserInDB = Depends(get_current_user)) -> UserInDB:
@@ -83,7 +156,7 @@ async def get_current_user_from_refresh_token(
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        payload = decode_token(token)
         email: str = payload.get("sub")
         token_type: str = payload.get("type")
         if email is None or token_type != "refresh":
@@ -91,8 +164,10 @@ async def get_current_user_from_refresh_token(
     except JWTError:
         raise credentials_exception
         
+    # Always read from the database: this is where deactivation and other
+    # revocations reach stateless sessions
     user = await user_repo.get_by_email(email)
-    if user is None:
+    if user is None or payload.get("ver", 0) < user.token_version:
         raise credentials_exception
     return user
 
@@ -106,6 +181,13 @@ async def get_ai_service(db = Depends(get_database)) -> AIService:
 async def get_recipe_service(
     recipe_repo: RecipeRepository = Depends(get_recipe_repo),
     scraping_service: ScrapingService = Depends(get_scraping_service),
-    ai_service: AIService = Depends(get_ai_service)
+    ai_service: AIService = Depends(get_ai_service),
+    favorite_repo: FavoriteRepository = Depends(get_favorite_repo)
 ) -> RecipeService:
-    return RecipeService(recipe_repo, scraping_service, ai_service)
+    return RecipeService(recipe_repo, scraping_service, ai_service, favorite_repo)
+
+async def get_shopping_list_service(
+    recipe_repo: RecipeRepository = Depends(get_recipe_repo),
+    cart_repo: ShoppingCartRepository = Depends(get_shopping_cart_repo)
+) -> ShoppingListService:
+    return ShoppingListService(recipe_repo, cart_repo)
@@ -1,14 +1,64 @@
-from fastapi import APIRouter, Depends, Query, status
-from typing import List, Optional
-from domain.recipe import RecipeCreate, RecipeUpdate, RecipeResponse, Visibility
+import json
+import tempfile
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import JSONResponse, StreamingResponse
+from typing import BinaryIO, Iterator, List, Optional, Set
+from domain.recipe import (
+    RecipeCreate, RecipeUpdate, RecipeResponse, RecipeFacets, RecipeSuggestions, IngredientMatch, Visibility, SearchMode, ExportFormat,
+    RECIPE_FIELD_PROFILES, parse_recipe_fields
+)
 from domain.user import UserInDB
 from services.recipe_service import RecipeService
 from api.deps import get_current_user, get_current_user_optional, get_recipe_service
+from core.pagination import NEXT_CURSOR_HEADER, next_cursor
+from core.ratelimit import limiter
+from core.streaming import iter_ndjson_lines
 
 router = APIRouter()
 
 # Optional Auth helper can be implemented here if needed in future
 
+CURSOR_DESCRIPTION = f"Opaque token from the {NEXT_CURSOR_HEADER} header of the previous page; replaces skip"
+FIELDS_DESCRIPTION = (
+    "Comma-separated fields to return instead of the full recipe, "
+    f"or a profile: {', '.join(RECIPE_FIELD_PROFILES)}. _id is always included."
+)
+
+
+def get_fields(fields: Optional[str] = Query(default=None, description=FIELDS_DESCRIPTION)) -> Optional[Set[str]]:
+    try:
+        return parse_recipe_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+# Bulk import limits: longest accepted NDJSON line, and how much of the
+# per-line results is kept in memory before spilling to a temporary file
+BULK_MAX_LINE_BYTES = 1 << 20
+BULK_RESULTS_IN_MEMORY = 1 << 20
+
+
+def _iter_file(f: BinaryIO, chunk_size: int = 1 << 16) -> Iterator[bytes]:
+    try:
+        while chunk := f.read(chunk_size):
+            yield chunk
+    finally:
+        f.close()
+
+
+def _list_response(response: Response, recipes: list, fields: Optional[Set[str]], cursor: Optional[str] = None):
+    """
+    Full recipes go through response_model as usual. Sparse ones are
+    serialized directly so that unselected fields are left out entirely.
+    """
+    if not fields:
+        if cursor:
+            response.headers[NEXT_CURSOR_HEADER] = cursor
+        return recipes
+
+    content = [r.model_dump(by_alias=True, mode="json", include=fields | {"id"}) for r in recipes]
+    return JSONResponse(content=content, headers={NEXT_CURSOR_HEADER: cursor} if cursor else None)
+
 
 @router.post("/", response_model=RecipeResponse, status_code=status.HTTP_201_CREATED)
 async def create_recipe(
@@ -29,24 +79,143 @@ async def import_recipe_by_url(
     """
     return await service.create_recipe_from_url(url, current_user.id)
 
+@router.post("/bulk", status_code=status.HTTP_200_OK)
+@limiter.limit("10/minute")
+async def bulk_create_recipes(
+    request: Request,
+    current_user: UserInDB = Depends(get_current_user),
+    service: RecipeService = Depends(get_recipe_service)
+):
+    """
+    Create many recipes from an NDJSON body (Content-Type: application/x-ndjson),
+    one RecipeCreate object per line. The body is read as a stream and written
+    in batches; recipes imported before (same web_url, or same title without
+    one) are reported as duplicates.
+
+    Responds with NDJSON: one {"line", "status", "_id" | "detail"} object per
+    non-empty input line (errors come before the batch they were found in, so
+    match results by "line"), then a final {"summary": {...}} line. Recipes
+    the database refused, or a whole batch whose write failed, are errors
+    too; later batches are still written.
+    """
+    summary = {"created": 0, "duplicate": 0, "error": 0}
+    # Results are sent once the whole body is read, so clients that upload
+    # before reading cannot deadlock; past 1 MB they wait on disk, not in memory.
+    results = tempfile.SpooledTemporaryFile(max_size=BULK_RESULTS_IN_MEMORY, mode="w+b")
+    try:
+        lines = iter_ndjson_lines(request.stream(), BULK_MAX_LINE_BYTES)
+        async for result in service.bulk_create_recipes(lines, current_user.id):
+            summary[result["status"]] += 1
+            results.write(json.dumps(result).encode() + b"\n")
+        results.write(json.dumps({"summary": summary}).encode() + b"\n")
+        results.seek(0)
+    except BaseException:
+        results.close()
+        raise
+
+    return StreamingResponse(_iter_file(results), media_type="application/x-ndjson")
+
 @router.get("/me", response_model=List[RecipeResponse])
 async def read_my_recipes(
+    response: Response,
     skip: int = 0,
     limit: int = Query(default=100, ge=1, le=100),
     search: Optional[str] = None,
+    search_mode: SearchMode = Query(default=SearchMode.TEXT, description="Ranked full-text search or legacy regex"),
+    cursor: Optional[str] = Query(default=None, description=CURSOR_DESCRIPTION),
+    fields: Optional[Set[str]] = Depends(get_fields),
     current_user: UserInDB = Depends(get_current_user),
     service: RecipeService = Depends(get_recipe_service)
 ):
-    return await service.list_my_recipes(current_user.id, skip, limit, search)
+    recipes = await service.list_my_recipes(current_user.id, skip, limit, search, search_mode, cursor, fields)
+    # Ranked search is ordered by relevance and pages with skip only
+    ranked = search and search_mode == SearchMode.TEXT
+    return _list_response(response, recipes, fields, None if ranked else next_cursor(recipes, limit))
+
+@router.get("/me/export")
+async def export_my_recipes(
+    format: ExportFormat = Query(default=ExportFormat.NDJSON, description="ndjson (one recipe per line) or json (one array)"),
+    current_user: UserInDB = Depends(get_current_user),
+    service: RecipeService = Depends(get_recipe_service)
+):
+    """
+    Download all of your recipes, newest first. The response is streamed
+    from the database, so it works for libraries of any size.
+    """
+    media_type = "application/x-ndjson" if format == ExportFormat.NDJSON else "application/json"
+    return StreamingResponse(
+        service.export_my_recipes(current_user.id, format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="recipes.{format.value}"'}
+    )
 
 @router.get("/favorites", response_model=List[RecipeResponse])
 async def read_favorite_recipes(
+    response: Response,
     skip: int = 0,
     limit: int = Query(default=100, ge=1, le=100),
+    cursor: Optional[str] = Query(default=None, description=CURSOR_DESCRIPTION),
+    fields: Optional[Set[str]] = Depends(get_fields),
     current_user: UserInDB = Depends(get_current_user),
     service: RecipeService = Depends(get_recipe_service)
 ):
-    return await service.list_favorite_recipes(current_user.id, skip, limit)
+    recipes, next_page = await service.list_favorite_recipes(current_user.id, skip, limit, cursor, fields)
+    return _list_response(response, recipes, fields, next_page)
+
+@router.get("/random", response_model=List[RecipeResponse])
+async def read_random_recipes(
+    response: Response,
+    limit: int = Query(default=5, ge=1, le=20),
+    fields: Optional[Set[str]] = Depends(get_fields),
+    current_user: Optional[UserInDB] = Depends(get_current_user_optional),
+    service: RecipeService = Depends(get_recipe_service)
+):
+    user_id = current_user.id if current_user else None
+    recipes = await service.get_random_recipes(limit, user_id, fields)
+    return _list_response(response, recipes, fields)
+
+@router.get("/facets", response_model=RecipeFacets)
+async def read_recipe_facets(
+    search: Optional[str] = None,
+    tags: Optional[List[str]] = Query(None),
+    tag_limit: int = Query(default=20, ge=1, le=100),
+    current_user: Optional[UserInDB] = Depends(get_current_user_optional),
+    service: RecipeService = Depends(get_recipe_service)
+):
+    """
+    Counts for the public feed plus the caller's own private recipes, for the
+    same `search`/`tags` filter as GET /recipes/. Without a filter the public
+    part is cached for FACETS_CACHE_SECONDS and, on large collections,
+    estimated from a sample (`estimated: true`).
+    """
+    user_id = current_user.id if current_user else None
+    return await service.get_facets(user_id, search, tags, tag_limit)
+
+@router.get("/suggest", response_model=RecipeSuggestions)
+async def suggest_recipes(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(default=10, ge=1, le=20),
+    service: RecipeService = Depends(get_recipe_service)
+):
+    """
+    Search-as-you-type: public recipe titles and tags starting with `q`,
+    ignoring case and diacritics. Answered from memory, not MongoDB.
+    """
+    return await service.suggest(q, limit)
+
+@router.get("/by-ingredients", response_model=List[IngredientMatch])
+async def read_recipes_by_ingredients(
+    ingredients: List[str] = Query(..., min_length=1, max_length=50),
+    max_missing: Optional[int] = Query(default=None, ge=0, description="Skip recipes needing more ingredients than this"),
+    limit: int = Query(default=20, ge=1, le=100),
+    service: RecipeService = Depends(get_recipe_service)
+):
+    """
+    "What can I cook": public recipes using the given ingredients, ranked by
+    how few ingredients are missing, then by how many are used. Basic
+    staples (salt, pepper, oil, water) are assumed to be at hand.
+    """
+    return await service.match_ingredients(ingredients, limit, max_missing)
 
 @router.get("/{recipe_id}", response_model=RecipeResponse)
 async def read_recipe(
@@ -84,21 +253,18 @@ async def toggle_favorite(
 
 @router.get("/", response_model=List[RecipeResponse])
 async def read_public_recipes(
+    response: Response,
     skip: int = 0,
     limit: int = Query(default=100, ge=1, le=100),
     search: Optional[str] = None,
     tags: Optional[List[str]] = Query(None),
+    search_mode: SearchMode = Query(default=SearchMode.TEXT, description="Ranked full-text search or legacy regex"),
+    cursor: Optional[str] = Query(default=None, description=CURSOR_DESCRIPTION),
+    fields: Optional[Set[str]] = Depends(get_fields),
     current_user: Optional[UserInDB] = Depends(get_current_user_optional),
     service: RecipeService = Depends(get_recipe_service)
 ):
     user_id = current_user.id if current_user else None
-    return await service.list_recipes(user_id, skip, limit, search, tags)
-
-@router.get("/random", response_model=List[RecipeResponse])
-async def read_random_recipes(
-    limit: int = Query(default=5, ge=1, le=20),
-    current_user: Optional[UserInDB] = Depends(get_current_user_optional),
-    service: RecipeService = Depends(get_recipe_service)
-):
-    user_id = current_user.id if current_user else None
-    return await service.get_random_recipes(limit, user_id)
+    recipes = await service.list_recipes(user_id, skip, limit, search, tags, search_mode, cursor, fields)
+    ranked = search and search_mode == SearchMode.TEXT
+    return _list_response(response, recipes, fields, None if ranked else next_cursor(recipes, limit))
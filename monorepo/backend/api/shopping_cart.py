@@ -1,9 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from typing import List
-from domain.shopping_cart import ShoppingCartInDB, ShoppingItem
+from domain.shopping_cart import ShoppingCartInDB, ShoppingItem, ShoppingListRequest
 from domain.user import UserInDB
 from repository.shopping_cart_repository import ShoppingCartRepository
-from api.deps import get_current_user, get_shopping_cart_repo
+from services.shopping_list_service import ShoppingListService
+from api.deps import get_current_user, get_shopping_cart_repo, get_shopping_list_service
 
 router = APIRouter()
 
@@ -12,10 +13,7 @@ async def get_my_cart(
     current_user: UserInDB = Depends(get_current_user),
     repo: ShoppingCartRepository = Depends(get_shopping_cart_repo)
 ):
-    cart = await repo.get_by_user_id(current_user.id)
-    if not cart:
-        cart = await repo.create(current_user.id)
-    return cart
+    return await repo.create(current_user.id)
 
 @router.post("/items", response_model=ShoppingCartInDB)
 async def add_item(
@@ -23,14 +21,21 @@ async def add_item(
     current_user: UserInDB = Depends(get_current_user),
     repo: ShoppingCartRepository = Depends(get_shopping_cart_repo)
 ):
-    cart = await repo.add_item(current_user.id, item)
-    if not cart:
-        # Create cart if it doesn't exist then add item
-        await repo.create(current_user.id)
-        cart = await repo.add_item(current_user.id, item)
-        if not cart:
-            raise HTTPException(status_code=400, detail="Failed to add item to cart")
-    return cart
+    # Creates the cart on first use
+    return await repo.add_item(current_user.id, item)
+
+@router.post("/from-recipes", response_model=ShoppingCartInDB)
+async def add_recipes(
+    request: ShoppingListRequest,
+    current_user: UserInDB = Depends(get_current_user),
+    service: ShoppingListService = Depends(get_shopping_list_service)
+):
+    """
+    Add the ingredients of several recipes to the cart in one request.
+    Ingredients with the same name are merged and their amounts summed
+    across units (200 g + 0.3 kg of flour -> 500 g).
+    """
+    return await service.add_recipes_to_cart(request.recipe_ids, current_user.id)
 
 @router.delete("/items/{item_id}", response_model=ShoppingCartInDB)
 async def remove_item(
@@ -48,9 +53,5 @@ async def clear_cart(
     current_user: UserInDB = Depends(get_current_user),
     repo: ShoppingCartRepository = Depends(get_shopping_cart_repo)
 ):
-    success = await repo.clear_cart(current_user.id)
-    if not success:
-         # It's fine if it was already empty or didn't exist, but repo returns false if modified_count == 0
-         # Let's just return success regardless for now to be idempotent
-         pass
+    await repo.clear_cart(current_user.id)
     return None
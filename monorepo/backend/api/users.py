@@ -1,21 +1,48 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from typing import List, Optional
 from domain.user import UserResponse, UserInDB
 from repository.user_repository import UserRepository
 from api.deps import get_current_active_user, get_current_admin_user, get_user_repo
+from core.config import get_settings
+from core.pagination import NEXT_CURSOR_HEADER, decode_cursor, next_cursor
 
 router = APIRouter()
+settings = get_settings()
 
 @router.get("/me", response_model=UserResponse)
-async def read_users_me(current_user: UserInDB = Depends(get_current_active_user)):
+async def read_users_me(
+    current_user: UserInDB = Depends(get_current_active_user),
+    user_repo: UserRepository = Depends(get_user_repo)
+):
+    if settings.STATELESS_TOKENS:
+        # Stateless tokens do not carry the whole profile
+        user = await user_repo.get_by_id(current_user.id)
+        if user is None:
+            raise HTTPException(status_code=404, detail="User not found")
+        return user
     return current_user
 
 @router.get("/", response_model=List[UserResponse])
 async def read_users(
+    response: Response,
     skip: int = 0,
     limit: int = Query(default=100, ge=1, le=100),
+    cursor: Optional[str] = Query(
+        default=None,
+        description=f"Opaque token from the {NEXT_CURSOR_HEADER} header of the previous page; replaces skip"
+    ),
     current_user: UserInDB = Depends(get_current_admin_user),
     user_repo: UserRepository = Depends(get_user_repo)
 ):
-    users = await user_repo.get_all(skip=skip, limit=limit)
+    after_id = None
+    if cursor:
+        try:
+            after_id, _ = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    users = await user_repo.get_all(skip=skip, limit=limit, after_id=after_id)
+    token = next_cursor(users, limit, with_created_at=False)
+    if token:
+        response.headers[NEXT_CURSOR_HEADER] = token
     return users
@@ -1,10 +1,149 @@
+import base64
+import hashlib
+import hmac
+import json
+import time
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Dict, Optional
 from jose import jwt
+from jose.exceptions import ExpiredSignatureError, JWTError
+from core.cache import TTLCache
 from core.config import get_settings
 
 settings = get_settings()
 
+# Algorithms verified by TokenVerifier itself; others go through jose
+_HMAC_DIGESTS = {"HS256": "sha256", "HS384": "sha384", "HS512": "sha512"}
+
+
+def parse_keys(secret_key: str, jwt_keys: str) -> Dict[Optional[str], str]:
+    """
+    Verification keys by kid from JWT_KEYS ("kid:secret,kid:secret"). Tokens
+    without a kid were signed with SECRET_KEY, listed under None.
+    """
+    keys: Dict[Optional[str], str] = {None: secret_key}
+    for entry in jwt_keys.split(","):
+        if entry.strip():
+            kid, _, secret = entry.strip().partition(":")
+            if not secret:
+                raise ValueError(f"JWT_KEYS entry '{kid}' has no secret")
+            keys[kid] = secret
+    return keys
+
+
+def _b64decode(segment: str) -> bytes:
+    return base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4))
+
+
+class TokenVerifier:
+    """
+    Verifies the app's JWTs. Decoded claims are cached by token hash until
+    the token expires, so a client reusing its access token is verified
+    once; HMAC tokens are checked with hmac/json directly, which is several
+    times faster than jose. Claims returned are shared and must not be
+    modified.
+
+    Several keys can be active at once (JWT_KEYS): tokens name theirs in the
+    "kid" header, which makes rotating SECRET_KEY possible without logging
+    everybody out.
+    """
+
+    def __init__(self, keys: Dict[Optional[str], str], algorithm: str, cache_size: int = 10000):
+        self.keys = {kid: secret.encode() for kid, secret in keys.items()}
+        self.algorithm = algorithm
+        self._digest = _HMAC_DIGESTS.get(algorithm)
+        self._cache = TTLCache(ttl=0, maxsize=cache_size)
+
+    def decode(self, token: str) -> dict:
+        """Verified claims of `token`. Raises JWTError (ExpiredSignatureError once expired)."""
+        token_hash = hashlib.sha256(token.encode()).digest()
+        claims = self._cache.get(token_hash)
+        if claims is not None:
+            return claims
+
+        claims = self._verify(token) if self._digest else self._verify_with_jose(token)
+        exp = claims.get("exp")
+        if exp is not None:
+            remaining = exp - time.time()
+            if remaining <= 0:
+                raise ExpiredSignatureError("Signature has expired.")
+            self._cache.set(token_hash, claims, ttl=remaining)
+        return claims
+
+    def _key(self, header: dict) -> bytes:
+        kid = header.get("kid")
+        # Unhashable kids (lists, objects) must be refused, not raise TypeError
+        if kid is not None and not isinstance(kid, str):
+            raise JWTError("Unknown key id")
+        key = self.keys.get(kid)
+        if key is None:
+            raise JWTError("Unknown signing key")
+        return key
+
+    def _verify(self, token: str) -> dict:
+        try:
+            header_segment, payload_segment, signature_segment = token.split(".")
+            header = json.loads(_b64decode(header_segment))
+            signature = _b64decode(signature_segment)
+        except (ValueError, TypeError):
+            raise JWTError("Malformed token")
+        # Never let the token choose the algorithm
+        if not isinstance(header, dict) or header.get("alg") != self.algorithm:
+            raise JWTError("Unexpected algorithm")
+
+        signing_input = f"{header_segment}.{payload_segment}".encode()
+        expected = hmac.digest(self._key(header), signing_input, self._digest)
+        if not hmac.compare_digest(expected, signature):
+            raise JWTError("Signature verification failed")
+
+        try:
+            claims = json.loads(_b64decode(payload_segment))
+        except (ValueError, TypeError):
+            raise JWTError("Malformed token")
+        if not isinstance(claims, dict):
+            raise JWTError("Malformed token")
+        now = time.time()
+        if "exp" in claims and not (isinstance(claims["exp"], (int, float)) and claims["exp"] > now):
+            raise ExpiredSignatureError("Signature has expired.")
+        if "nbf" in claims and not (isinstance(claims["nbf"], (int, float)) and claims["nbf"] <= now):
+            raise JWTError("The token is not yet valid")
+        return claims
+
+    def _verify_with_jose(self, token: str) -> dict:
+        key = self._key(jwt.get_unverified_header(token))
+        return jwt.decode(token, key.decode(), algorithms=[self.algorithm])
+
+
+_keys = parse_keys(settings.SECRET_KEY, settings.JWT_KEYS)
+if settings.JWT_SIGNING_KID and settings.JWT_SIGNING_KID not in _keys:
+    raise ValueError(f"JWT_SIGNING_KID '{settings.JWT_SIGNING_KID}' is not in JWT_KEYS")
+token_verifier = TokenVerifier(_keys, settings.ALGORITHM, settings.TOKEN_CACHE_SIZE)
+
+
+def decode_token(token: str) -> dict:
+    return token_verifier.decode(token)
+
+
+def _encode(claims: dict) -> str:
+    if settings.JWT_SIGNING_KID:
+        kid = settings.JWT_SIGNING_KID
+        return jwt.encode(claims, _keys[kid], algorithm=settings.ALGORITHM, headers={"kid": kid})
+    return jwt.encode(claims, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+
+
+def user_claims(user) -> dict:
+    """
+    Claims identifying a UserInDB in its tokens. "sub" is the email; the
+    rest lets access tokens be verified without a lookup (STATELESS_TOKENS).
+    """
+    return {
+        "sub": user.email,
+        "uid": user.id,
+        "role": user.role,
+        "active": user.is_active,
+        "ver": user.token_version,
+    }
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta:
@@ -12,7 +151,7 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     else:
         expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     to_encode.update({"exp": expire, "type": "access"})
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+    encoded_jwt = _encode(to_encode)
     return encoded_jwt
 
 def create_refresh_token(data: dict, expires_delta: Optional[timedelta] = None):
@@ -22,5 +161,5 @@ def create_refresh_token(data: dict, expires_delta: Optional[timedelta] = None):
     else:
         expire = datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
     to_encode.update({"exp": expire, "type": "refresh"})
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+    encoded_jwt = _encode(to_encode)
     return encoded_jwt
@@ -0,0 +1,91 @@
+import asyncio
+from typing import Dict, Optional
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from core.cache import TTLCache
+from core.config import get_settings
+from core.invalidation import ChangeEvent, invalidation_bus
+
+settings = get_settings()
+
+
+class TokenRevocations:
+    """
+    Current token_version of every user whose tokens were ever revoked, for
+    stateless access tokens. UserRepository.update_user bumps a user's
+    token_version when their role, active flag or password changes; access
+    tokens carrying an older version are refused.
+
+    The list is reloaded from the database every `refresh_interval` seconds
+    and updated at once from the invalidation bus. Only users with a
+    non-zero version are held, so it stays small.
+    """
+
+    def __init__(self, refresh_interval: float = 10.0):
+        self.refresh_interval = refresh_interval
+        self._versions: Dict[str, int] = {}
+        # Deleted users, kept for as long as their access tokens can live;
+        # a reload cannot see them
+        self._deleted = TTLCache(ttl=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60, maxsize=100_000)
+        self._task: Optional[asyncio.Task] = None
+        self.ready = False
+
+    def __len__(self) -> int:
+        return len(self._versions)
+
+    def is_revoked(self, user_id: str, token_version: int) -> bool:
+        if self._deleted.get(user_id):
+            return True
+        return self._versions.get(user_id, 0) > token_version
+
+    def on_user_change(self, event: ChangeEvent):
+        if event.operation == "delete":
+            self._deleted.set(event.document_id, True)
+        elif event.document and event.document.get("token_version"):
+            version = event.document["token_version"]
+            self._versions[event.document_id] = max(version, self._versions.get(event.document_id, 0))
+        # Resets are covered by the next reload
+
+    async def load(self, database: AsyncIOMotorDatabase):
+        versions = {}
+        cursor = database.users.find({"token_version": {"$gt": 0}}, {"token_version": 1})
+        async for doc in cursor:
+            versions[str(doc["_id"])] = doc["token_version"]
+        # Versions only grow; keep any newer one the bus delivered meanwhile
+        for user_id, version in self._versions.items():
+            if version > versions.get(user_id, 0):
+                versions[user_id] = version
+        self._versions = versions
+        self.ready = True
+
+    async def start(self, database: AsyncIOMotorDatabase):
+        """
+        Load the list, then keep reloading it in the background. Until a
+        load succeeds, access tokens are checked against the database.
+        """
+        try:
+            await self.load(database)
+        except Exception as e:
+            print(f"Failed to load token revocations: {e}")
+        self._task = asyncio.create_task(self._run(database))
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self, database: AsyncIOMotorDatabase):
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await self.load(database)
+            except Exception as e:
+                # Keep serving from the last list; the bus still updates it
+                print(f"Failed to reload token revocations: {e}")
+
+
+token_revocations = TokenRevocations(settings.TOKEN_REVOCATION_REFRESH_SECONDS)
+invalidation_bus.subscribe("users", token_revocations.on_user_change)
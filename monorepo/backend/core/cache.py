@@ -0,0 +1,135 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Small in-process cache. Entries expire `ttl` seconds after being set and
+    the least recently used ones are evicted beyond `maxsize`. Each worker
+    process has its own copy, so only cache what may be briefly stale.
+    """
+
+    def __init__(self, ttl: float, maxsize: int = 1024):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        item = self._data.get(key, _MISSING)
+        if item is _MISSING:
+            self.misses += 1
+            return default
+        expires_at, value = item
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        self._data[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        item = self._data.pop(key, _MISSING)
+        return default if item is _MISSING else item[1]
+
+    def pop_matching(self, predicate: Callable[[Any], bool]) -> int:
+        """Drop every value `predicate` accepts; a full scan, for rare invalidations."""
+        keys = [key for key, (_, value) in self._data.items() if predicate(value)]
+        for key in keys:
+            del self._data[key]
+        return len(keys)
+
+    def clear(self):
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+        }
+
+
+class ReadThroughCache:
+    """
+    TTLCache filled by a loader, with concurrent misses for the same key
+    coalesced into one load ("singleflight"): while a key is being loaded,
+    other callers wait for that load instead of starting their own.
+
+    invalidate() also detaches a load in progress, so a value read before a
+    write is handed to the callers already waiting for it but never stored.
+    None (not found) is returned as is and not cached.
+    """
+
+    def __init__(self, ttl: float, maxsize: int = 1024):
+        self._cache = TTLCache(ttl, maxsize)
+        self._loading: Dict[Hashable, asyncio.Task] = {}
+        self.loads = 0
+        self.coalesced = 0
+
+    async def get(self, key: Hashable, load: Callable[[], Awaitable[Any]]) -> Any:
+        value = self._cache.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        task = self._loading.get(key)
+        if task is None:
+            self.loads += 1
+            task = asyncio.ensure_future(self._load(key, load))
+            self._loading[key] = task
+            task.add_done_callback(_retrieve_exception)
+        else:
+            self.coalesced += 1
+        # A caller giving up (client disconnect) must not cancel the load
+        # for everybody else
+        return await asyncio.shield(task)
+
+    async def _load(self, key: Hashable, load: Callable[[], Awaitable[Any]]) -> Any:
+        this = asyncio.current_task()
+        try:
+            value = await load()
+            if value is not None and self._loading.get(key) is this:
+                self._cache.set(key, value)
+            return value
+        finally:
+            if self._loading.get(key) is this:
+                del self._loading[key]
+
+    def invalidate(self, key: Hashable):
+        self._cache.pop(key)
+        self._loading.pop(key, None)
+
+    def clear(self):
+        self._cache.clear()
+        self._loading.clear()
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self._cache.stats(), "loads": self.loads, "coalesced": self.coalesced}
+
+
+def _retrieve_exception(task: asyncio.Task):
+    # Failures reach the callers awaiting the load; this only keeps asyncio
+    # from warning when all of them gave up first
+    if not task.cancelled():
+        task.exception()
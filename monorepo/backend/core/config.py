@@ -1,7 +1,7 @@
 from pydantic import field_validator
 from pydantic_settings import BaseSettings
 from functools import lru_cache
-from typing import List, Optional, Any
+from typing import List, Literal, Optional, Any
 
 class Settings(BaseSettings):
     API_V1_STR: str = "/api/v1"
@@ -10,12 +10,63 @@ class Settings(BaseSettings):
     # MongoDB
     MONGO_DB_URL: str = "mongodb://localhost:27017"
     DATABASE_NAME: str = "recipe_app"
+    # Apply pending migrations and build indexes on startup
+    AUTO_MIGRATE: bool = True
+    # Connection pool; MIN_POOL_SIZE connections are opened during startup
+    MONGO_MAX_POOL_SIZE: int = 100
+    MONGO_MIN_POOL_SIZE: int = 10
+    # How long a request may wait for a free connection before failing
+    MONGO_WAIT_QUEUE_TIMEOUT_MS: int = 5000
+    MONGO_SERVER_SELECTION_TIMEOUT_MS: int = 5000
+    # Wire compression in order of preference; snappy needs python-snappy
+    MONGO_COMPRESSORS: str = "zstd,zlib"
+    # Where staleness-tolerant public reads (feed, random, search) go; on a
+    # standalone server every mode reads from that server. Checked on startup
+    MONGO_PUBLIC_READ_PREFERENCE: Literal[
+        "primary", "primaryPreferred", "secondary", "secondaryPreferred", "nearest"
+    ] = "secondaryPreferred"
+    # Skip secondaries lagging more than this (90 is the minimum MongoDB allows)
+    MONGO_MAX_STALENESS_SECONDS: int = 90
+    # How long unfiltered /recipes/facets results are reused
+    FACETS_CACHE_SECONDS: int = 60
+    # GET /recipes/{id} responses reused per worker (size-bounded LRU);
+    # dropped on our own writes and, via the change stream, on other writes
+    RECIPE_CACHE_SECONDS: int = 30
+    RECIPE_CACHE_SIZE: int = 5000
+    # Tail a change stream so in-process caches see writes made by other
+    # workers and scripts (needs a replica set; ignored on a standalone server)
+    CHANGE_STREAMS_ENABLED: bool = True
+    # How long an authenticated user is reused without a lookup, per worker.
+    # Writes through the API drop it at once; other writes are seen via the
+    # change stream, or after this long without one. 0 disables the cache
+    USER_CACHE_SECONDS: int = 30
+    USER_CACHE_SIZE: int = 10000
+    # /agent/generate-from-ingredients answers from our own recipes, without
+    # calling the AI, when some need at most this many extra ingredients
+    CATALOG_MAX_MISSING: int = 1
     
     # Security
     SECRET_KEY: str = "temporary_secret_key_for_vibe_coding"
     ALGORITHM: str = "HS256"
+    # Extra signing keys as "kid:secret,kid:secret". New tokens are signed
+    # with JWT_SIGNING_KID (SECRET_KEY if empty); tokens signed with any
+    # listed key, or with SECRET_KEY and no kid, are accepted. To rotate, add
+    # a key, sign with it, and drop the old one once its tokens expired
+    JWT_KEYS: str = ""
+    JWT_SIGNING_KID: str = ""
+    # Decoded tokens remembered until they expire, per worker
+    TOKEN_CACHE_SIZE: int = 10000
+    # bcrypt work factor; stored hashes with another cost are rehashed on login
+    BCRYPT_ROUNDS: int = 12
+    # Threads hashing passwords per worker, off the event loop
+    PASSWORD_HASH_WORKERS: int = 2
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    # Trust the user id, role and active flag carried by access tokens instead
+    # of looking the user up; revoked tokens are refused from an in-memory
+    # list reloaded every TOKEN_REVOCATION_REFRESH_SECONDS
+    STATELESS_TOKENS: bool = False
+    TOKEN_REVOCATION_REFRESH_SECONDS: int = 10
     
     # AI (Gemini via OpenAI Library)
     GEMINI_API_KEY: str = ""
@@ -1,21 +1,167 @@
+import asyncio
+import threading
+import time
+from enum import Enum
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import monitoring, read_preferences
+from pymongo.read_preferences import ReadPreference
 from core.config import get_settings
 
 settings = get_settings()
 
+
+class PoolStats(monitoring.ConnectionPoolListener):
+    """
+    Connection pool counters, updated from the driver's event callbacks
+    (which run on Motor's worker threads, hence the lock).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.open = 0
+            self.in_use = 0
+            self.created = 0
+            self.closed = 0
+            self.checkouts = 0
+            self.checkout_failures = {}
+            self.max_checkout_ms = 0.0
+            self._total_checkout_ms = 0.0
+            self.clears = 0
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "open": self.open,
+                "in_use": self.in_use,
+                "created": self.created,
+                "closed": self.closed,
+                "checkouts": self.checkouts,
+                "checkout_failures": dict(self.checkout_failures),
+                "avg_checkout_ms": round(self._total_checkout_ms / self.checkouts, 3) if self.checkouts else 0.0,
+                "max_checkout_ms": round(self.max_checkout_ms, 3),
+                "pool_clears": self.clears,
+                "max_pool_size": settings.MONGO_MAX_POOL_SIZE,
+            }
+
+    def connection_created(self, event):
+        with self._lock:
+            self.open += 1
+            self.created += 1
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.open -= 1
+            self.closed += 1
+
+    def connection_checked_out(self, event):
+        # `duration` is how long the request waited for a connection, in
+        # seconds; it grows when the pool is exhausted or cold.
+        waited_ms = (getattr(event, "duration", None) or 0) * 1000
+        with self._lock:
+            self.in_use += 1
+            self.checkouts += 1
+            self._total_checkout_ms += waited_ms
+            self.max_checkout_ms = max(self.max_checkout_ms, waited_ms)
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.in_use -= 1
+
+    def connection_check_out_failed(self, event):
+        # reason is "timeout" when waitQueueTimeoutMS was exceeded
+        with self._lock:
+            self.checkout_failures[event.reason] = self.checkout_failures.get(event.reason, 0) + 1
+
+    def pool_cleared(self, event):
+        with self._lock:
+            self.clears += 1
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+
+class ReadMode(str, Enum):
+    # Reads that must see the caller's own writes (ownership checks, "my" lists)
+    PRIMARY = "primary"
+    # Public data where a bounded lag is fine
+    PUBLIC = "public"
+
+
+_READ_PREFERENCES = {
+    "primaryPreferred": read_preferences.PrimaryPreferred,
+    "secondary": read_preferences.Secondary,
+    "secondaryPreferred": read_preferences.SecondaryPreferred,
+    "nearest": read_preferences.Nearest,
+}
+
+
+def read_preference_for(mode: ReadMode):
+    """Driver read preference for a ReadMode, from MONGO_PUBLIC_READ_PREFERENCE."""
+    if mode == ReadMode.PRIMARY or settings.MONGO_PUBLIC_READ_PREFERENCE == "primary":
+        return ReadPreference.PRIMARY
+    # Settings only accepts known names
+    preference = _READ_PREFERENCES[settings.MONGO_PUBLIC_READ_PREFERENCE]
+    return preference(max_staleness=settings.MONGO_MAX_STALENESS_SECONDS)
+
+
+def _redacted_url() -> str:
+    # Redact credentials in log output for security
+    return settings.MONGO_DB_URL.split('@')[-1] if '@' in settings.MONGO_DB_URL else settings.MONGO_DB_URL
+
+
 class Database:
     client: AsyncIOMotorClient = None
+    pool_stats: PoolStats = PoolStats()
 
     def connect(self):
+        # Creating the client does not open any connection; see warm_up
         try:
-            self.client = AsyncIOMotorClient(settings.MONGO_DB_URL)
-            # Redact credentials in log output for security
-            log_url = settings.MONGO_DB_URL.split('@')[-1] if '@' in settings.MONGO_DB_URL else settings.MONGO_DB_URL
-            print(f"Connected to MongoDB at {log_url}")
+            self.client = AsyncIOMotorClient(
+                settings.MONGO_DB_URL,
+                maxPoolSize=settings.MONGO_MAX_POOL_SIZE,
+                minPoolSize=settings.MONGO_MIN_POOL_SIZE,
+                waitQueueTimeoutMS=settings.MONGO_WAIT_QUEUE_TIMEOUT_MS,
+                serverSelectionTimeoutMS=settings.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+                compressors=settings.MONGO_COMPRESSORS or None,
+                event_listeners=[self.pool_stats],
+            )
+            print(f"MongoDB client configured for {_redacted_url()}")
         except Exception as e:
-            print(f"Failed to connect to MongoDB: {e}")
+            print(f"Failed to configure MongoDB client: {e}")
             raise
 
+    async def warm_up(self):
+        """
+        Verify the server is reachable and open minPoolSize connections now,
+        so the first requests after startup do not pay for the handshakes.
+        """
+        started = time.perf_counter()
+        # Concurrent pings each check out their own connection
+        await asyncio.gather(*[
+            self.client.admin.command("ping") for _ in range(max(settings.MONGO_MIN_POOL_SIZE, 1))
+        ])
+        elapsed = (time.perf_counter() - started) * 1000
+        print(
+            f"Connected to MongoDB at {_redacted_url()} "
+            f"({self.pool_stats.snapshot()['open']} connections ready in {elapsed:.0f} ms)"
+        )
+
     def close(self):
         if self.client:
             self.client.close()
@@ -0,0 +1,196 @@
+import asyncio
+from typing import Callable, Dict, List, NamedTuple, Optional
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo.errors import OperationFailure, PyMongoError
+
+# Server errors after which the stream cannot be resumed from the last token
+_HISTORY_LOST_CODES = {
+    280,  # ChangeStreamFatalError
+    286,  # ChangeStreamHistoryLost: the token fell off the oplog
+}
+# $changeStream is only supported on replica sets and sharded clusters
+_NOT_SUPPORTED_CODES = {40573}
+
+
+class ChangeEvent(NamedTuple):
+    collection: str
+    # "insert", "update", "replace", "delete", or "reset" when changes may
+    # have been missed and everything cached for the collection is suspect
+    operation: str
+    document_id: Optional[str] = None
+    # Current state of the document; None for deletes and resets, or when
+    # it was deleted again before it could be looked up
+    document: Optional[dict] = None
+    # For updates, the dotted paths that were set (or had arrays truncated)
+    # and removed; None when any field may have changed
+    updated_fields: Optional[List[str]] = None
+    removed_fields: Optional[List[str]] = None
+
+    def touches(self, *fields: str) -> bool:
+        """Whether any of the top-level `fields` may have changed."""
+        if self.operation != "update" or self.updated_fields is None:
+            return True
+        paths = self.updated_fields + (self.removed_fields or [])
+        return any(path.split(".", 1)[0] in fields for path in paths)
+
+
+class InvalidationBus:
+    """
+    In-process publish/subscribe for document changes. Caches subscribe to
+    the collections they mirror; the change stream listener publishes every
+    write, whichever process or script made it.
+    """
+
+    def __init__(self):
+        self._subscribers: Dict[str, List[Callable[[ChangeEvent], None]]] = {}
+
+    def subscribe(self, collection: str, callback: Callable[[ChangeEvent], None]):
+        self._subscribers.setdefault(collection, []).append(callback)
+
+    @property
+    def collections(self) -> List[str]:
+        return list(self._subscribers)
+
+    def publish(self, event: ChangeEvent):
+        for callback in self._subscribers.get(event.collection, []):
+            try:
+                callback(event)
+            except Exception as e:
+                # One broken cache must not stop the others from hearing about it
+                print(f"Invalidation handler {callback.__qualname__} failed for {event}: {e}")
+
+    def reset(self, collection: str):
+        self.publish(ChangeEvent(collection, "reset"))
+
+
+invalidation_bus = InvalidationBus()
+
+
+def _changed_fields(description: dict) -> dict:
+    updated = list(description.get("updatedFields") or {})
+    updated += [truncated["field"] for truncated in description.get("truncatedArrays") or []]
+    return {"updated_fields": updated, "removed_fields": list(description.get("removedFields") or [])}
+
+
+class ChangeStreamListener:
+    """
+    Tails a change stream over the bus's collections and publishes each
+    change. A dropped connection resumes from the last token seen by this
+    listener; if that is too old to resume from, the stream restarts from
+    now and subscribers get a "reset" event.
+
+    The token is only kept in memory: the caches it keeps fresh live in
+    this process too and are filled anew on every start.
+    """
+
+    def __init__(
+        self,
+        database: AsyncIOMotorDatabase,
+        bus: InvalidationBus = invalidation_bus,
+        retry_delay: float = 1.0,
+        max_await_ms: int = 1000
+    ):
+        self.database = database
+        self.bus = bus
+        self.retry_delay = retry_delay
+        self.max_await_ms = max_await_ms
+        self._start_at = None
+        self._resume_token: Optional[dict] = None
+        self._task: Optional[asyncio.Task] = None
+        self.events = 0
+
+    async def start(self) -> bool:
+        """
+        Start tailing in the background. Call before caches are first filled:
+        changes made after this point are delivered even if the stream is
+        only opened later. Returns False (and does nothing) on a standalone
+        server, which has no change streams.
+        """
+        hello = await self.database.client.admin.command("hello")
+        if "setName" not in hello and hello.get("msg") != "isdbgrid":
+            print("Change streams need a replica set; cross-process cache invalidation is off")
+            return False
+        self._start_at = hello.get("operationTime")
+        self._task = asyncio.create_task(self.run())
+        return True
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def run(self):
+        delay = self.retry_delay
+        while True:
+            try:
+                await self._tail()
+            except asyncio.CancelledError:
+                raise
+            except OperationFailure as e:
+                if e.code in _NOT_SUPPORTED_CODES:
+                    print(f"Change streams are not supported here, invalidation stopped: {e}")
+                    return
+                if e.code in _HISTORY_LOST_CODES:
+                    print(f"Change stream cannot resume, restarting from now: {e}")
+                    self._restart_from_now(self.bus.collections)
+                else:
+                    print(f"Change stream failed, retrying in {delay:.0f}s: {e}")
+                    await asyncio.sleep(delay)
+                    delay = min(delay * 2, 30)
+            except PyMongoError as e:
+                print(f"Change stream interrupted, retrying in {delay:.0f}s: {e}")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30)
+            else:
+                delay = self.retry_delay
+
+    def _restart_from_now(self, collections: List[str]):
+        self._resume_token, self._start_at = None, None
+        for collection in collections:
+            self.bus.reset(collection)
+
+    async def _tail(self):
+        pipeline = [
+            {"$match": {"$or": [
+                {
+                    "ns.coll": {"$in": self.bus.collections},
+                    "operationType": {"$in": ["insert", "update", "replace", "delete", "drop", "rename"]},
+                },
+                {"operationType": "dropDatabase"},
+            ]}},
+        ]
+        options = {"full_document": "updateLookup", "max_await_time_ms": self.max_await_ms}
+        if self._resume_token:
+            options["resume_after"] = self._resume_token
+        elif self._start_at:
+            options["start_at_operation_time"] = self._start_at
+
+        async with self.database.watch(pipeline, **options) as stream:
+            while stream.alive:
+                change = await stream.try_next()
+                if change is not None:
+                    self.events += 1
+                    operation = change["operationType"]
+                    if operation == "dropDatabase":
+                        # The stream is invalidated right after this event
+                        self._restart_from_now(self.bus.collections)
+                        return
+                    if operation in ("drop", "rename"):
+                        self.bus.reset(change["ns"]["coll"])
+                    else:
+                        description = change.get("updateDescription")
+                        self.bus.publish(ChangeEvent(
+                            collection=change["ns"]["coll"],
+                            operation=operation,
+                            document_id=str(change["documentKey"]["_id"]),
+                            document=change.get("fullDocument"),
+                            **_changed_fields(description) if description else {},
+                        ))
+                # Advances on idle batches too, so a quiet stream does not
+                # leave an old token behind
+                if stream.resume_token:
+                    self._resume_token = stream.resume_token
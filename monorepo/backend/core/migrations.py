@@ -0,0 +1,397 @@
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import IndexModel, ASCENDING, DESCENDING, TEXT, UpdateOne
+from pymongo.errors import DuplicateKeyError, OperationFailure, PyMongoError
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, NamedTuple, Optional
+from core.schema import DocumentSchema, upgrade_collection
+from repository.recipe_repository import RECIPE_SCHEMA, build_search_fields
+from repository.user_repository import USER_SCHEMA
+
+# Declared indexes per collection. Every index is named explicitly so that
+# drift (changed keys or options) can be detected and repaired by name.
+INDEXES: Dict[str, List[IndexModel]] = {
+    "users": [
+        # UserRepository.get_by_email (login and every authenticated request)
+        IndexModel([("email", ASCENDING)], name="users_email", unique=True),
+        # TokenRevocations.load - only users whose tokens were ever revoked
+        IndexModel(
+            [("token_version", ASCENDING)],
+            name="users_token_version",
+            partialFilterExpression={"token_version": {"$gt": 0}},
+        ),
+    ],
+    "recipes": [
+        # The get_all indexes end in (created_at, _id) so that both the sort
+        # and keyset pagination (core/pagination.py) are served by the index.
+        # RecipeRepository.get_all(public_only=True) - public feed
+        IndexModel(
+            [("visibility", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+            name="recipes_visibility_created",
+        ),
+        # RecipeRepository.get_all(public_only=True, tags=[...])
+        IndexModel(
+            [("visibility", ASCENDING), ("tags", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+            name="recipes_visibility_tags_created",
+        ),
+        # RecipeRepository.get_all(author_id=...) - "my recipes"
+        IndexModel(
+            [("author_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+            name="recipes_author_created",
+        ),
+        # RecipeRepository.insert_many - skips recipes imported before
+        IndexModel([("import_hash", ASCENDING)], name="recipes_import_hash", unique=True, sparse=True),
+        # RecipeRepository.get_random - seek to a random point
+        IndexModel([("visibility", ASCENDING), ("random_key", ASCENDING)], name="recipes_visibility_random"),
+        # RecipeRepository.get_all(search_query=...) - ranked full-text search
+        # over the stemmed copies in "search.*"; stemming is done in Python
+        # (core/text.py), so the index itself uses no language.
+        IndexModel(
+            [("search.title", TEXT), ("search.tags", TEXT), ("search.description", TEXT)],
+            name="recipes_search",
+            weights={"search.title": 10, "search.tags": 5, "search.description": 1},
+            default_language="none",
+        ),
+    ],
+    "favorites": [
+        # One favorite per user and recipe; FavoriteRepository.toggle's upsert relies on it
+        IndexModel([("user_id", ASCENDING), ("recipe_id", ASCENDING)], name="favorites_user_recipe", unique=True),
+        # FavoriteRepository.get_by_user - "my favorites", keyset paginated
+        IndexModel(
+            [("user_id", ASCENDING), ("active", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+            name="favorites_user_created",
+        ),
+        # FavoriteRepository.delete_by_recipe and favorite_count recounts
+        IndexModel([("recipe_id", ASCENDING)], name="favorites_recipe"),
+    ],
+    "shopping_carts": [
+        # One cart per user; ShoppingCartRepository upserts rely on it
+        IndexModel([("user_id", ASCENDING)], name="shopping_carts_user", unique=True),
+    ],
+}
+
+# Indexes that used to be declared above; dropped by ensure_indexes if present.
+OBSOLETE_INDEXES: Dict[str, List[str]] = {
+    # favorite_by moved to the favorites collection
+    "recipes": ["recipes_favorite_by_created"],
+}
+
+# Server refusals to build an index next to the existing ones, e.g. a
+# second text index on the collection
+_CONFLICT_CODES = {67, 85, 86}
+
+# Name suffix (and extra key) of the copy a changed index is built as
+# before the old one is dropped
+_REBUILD_SUFFIX = "_rebuild"
+
+# Index options compared when looking for drift.
+_COMPARED_OPTIONS = ("unique", "sparse", "partialFilterExpression", "expireAfterSeconds", "weights", "default_language")
+
+MIGRATIONS_COLLECTION = "schema_migrations"
+
+
+class Migration(NamedTuple):
+    version: int
+    description: str
+    apply: Callable[[AsyncIOMotorDatabase], Awaitable[None]]
+
+
+BATCH_SIZE = 500
+
+
+async def _backfill_recipe_search(database: AsyncIOMotorDatabase) -> None:
+    collection = database.recipes
+    cursor = collection.find(
+        {"search": {"$exists": False}},
+        {"title": 1, "description": 1, "tags": 1}
+    ).batch_size(BATCH_SIZE)
+
+    batch = []
+    async for doc in cursor:
+        batch.append(UpdateOne({"_id": doc["_id"]}, {"$set": build_search_fields(doc)}))
+        if len(batch) >= BATCH_SIZE:
+            await collection.bulk_write(batch, ordered=False)
+            batch = []
+    if batch:
+        await collection.bulk_write(batch, ordered=False)
+
+
+async def _activate_favorites(database: AsyncIOMotorDatabase) -> None:
+    # Favorites written before toggling became a flag were all active
+    await database.favorites.update_many({"active": {"$exists": False}}, {"$set": {"active": True}})
+
+
+async def _merge_duplicate_carts(database: AsyncIOMotorDatabase) -> None:
+    # The old check-then-insert create() could leave several carts per user;
+    # fold them into the oldest one so the unique index can be built.
+    collection = database.shopping_carts
+    pipeline = [
+        {"$sort": {"created_at": 1, "_id": 1}},
+        {"$group": {"_id": "$user_id", "ids": {"$push": "$_id"}, "count": {"$sum": 1}}},
+        {"$match": {"count": {"$gt": 1}}},
+    ]
+    async for group in collection.aggregate(pipeline, allowDiskUse=True):
+        keep_id, *duplicate_ids = group["ids"]
+        items, seen = [], set()
+        async for cart in collection.find({"_id": {"$in": group["ids"]}}).sort([("created_at", 1), ("_id", 1)]):
+            for item in cart.get("items") or []:
+                if item.get("id") not in seen:
+                    seen.add(item.get("id"))
+                    items.append(item)
+        await collection.update_one(
+            {"_id": keep_id},
+            {"$set": {"items": items, "updated_at": datetime.utcnow()}}
+        )
+        await collection.delete_many({"_id": {"$in": duplicate_ids}})
+
+
+async def _report_duplicate_emails(database: AsyncIOMotorDatabase) -> None:
+    # The old check-then-insert register_user could create two users with
+    # one email, which keeps the unique users_email index from being built.
+    # Which account to keep (and whose recipes to move) is not for a
+    # migration to decide, so they are only listed.
+    pipeline = [
+        {"$group": {"_id": "$email", "ids": {"$push": "$_id"}, "count": {"$sum": 1}}},
+        {"$match": {"count": {"$gt": 1}}},
+    ]
+    async for group in database.users.aggregate(pipeline, allowDiskUse=True):
+        print(
+            f"Users {[str(user_id) for user_id in group['ids']]} share the email '{group['_id']}'; "
+            "merge or delete all but one of them so that users_email can be built"
+        )
+
+
+async def _backfill_random_key(database: AsyncIOMotorDatabase) -> None:
+    # Server-side, so existing recipes get a key without a round trip each
+    await database.recipes.update_many(
+        {"random_key": {"$exists": False}},
+        [{"$set": {"random_key": {"$rand": {}}}}]
+    )
+
+
+async def _drop_change_stream_tokens(database: AsyncIOMotorDatabase) -> None:
+    # Resume tokens were saved there by every worker but never read back
+    await database.drop_collection("change_stream_tokens")
+
+
+# Ordered data migrations. Each one must be idempotent: if two workers start
+# at the same time both may run it, only one of them records it as applied.
+MIGRATIONS: List[Migration] = [
+    Migration(1, "Backfill stemmed search fields on recipes", _backfill_recipe_search),
+    Migration(2, "Mark existing favorites as active", _activate_favorites),
+    Migration(3, "Merge duplicate shopping carts per user", _merge_duplicate_carts),
+    Migration(4, "Backfill random_key on recipes", _backfill_random_key),
+    Migration(5, "Drop saved change stream resume tokens", _drop_change_stream_tokens),
+    Migration(6, "Report users sharing an email", _report_duplicate_emails),
+]
+
+
+# Versioned document shapes, upgraded lazily on read and in bulk by
+# upgrade_documents (not a migration: it may take long and is safe to
+# interrupt and repeat)
+DOCUMENT_SCHEMAS: Dict[str, DocumentSchema] = {
+    "recipes": RECIPE_SCHEMA,
+    "users": USER_SCHEMA,
+}
+
+
+async def upgrade_documents(
+    database: AsyncIOMotorDatabase,
+    batch_size: int = BATCH_SIZE,
+    pause: float = 0
+) -> Dict[str, int]:
+    """Move outdated documents to the current schema version. Returns counts per collection."""
+    upgraded = {}
+    for collection_name, schema in DOCUMENT_SCHEMAS.items():
+        upgraded[collection_name] = await upgrade_collection(database[collection_name], schema, batch_size, pause)
+        if upgraded[collection_name]:
+            print(f"Upgraded {upgraded[collection_name]} '{collection_name}' documents to schema version {schema.version}")
+    return upgraded
+
+
+def _normalize_keys(keys) -> List[tuple]:
+    return [(field, int(direction) if isinstance(direction, (int, float)) else direction) for field, direction in keys]
+
+
+def diff_indexes(
+    declared: List[IndexModel],
+    existing: Dict[str, dict],
+    obsolete: Optional[List[str]] = None
+) -> Dict[str, List[str]]:
+    """
+    Compare declared indexes with `collection.index_information()` output.
+    Returns index names grouped as missing, changed, obsolete and unmanaged.
+    """
+    drift = {"missing": [], "changed": [], "unmanaged": []}
+    declared_names = set()
+
+    for model in declared:
+        spec = model.document
+        name = spec["name"]
+        declared_names.add(name)
+
+        current = existing.get(name)
+        if current is None:
+            drift["missing"].append(name)
+            continue
+
+        declared_key = _normalize_keys(spec["key"].items())
+        current_key = _normalize_keys(current["key"])
+        if any(direction == TEXT for _, direction in declared_key):
+            # Text indexes are stored as _fts/_ftsx; their fields live in "weights"
+            declared_key = [k for k in declared_key if k[1] != TEXT]
+            current_key = [k for k in current_key if k[0] not in ("_fts", "_ftsx")]
+
+        if declared_key != current_key:
+            drift["changed"].append(name)
+            continue
+
+        for option in _COMPARED_OPTIONS:
+            if spec.get(option) != current.get(option):
+                drift["changed"].append(name)
+                break
+
+    # Including copies left by a rebuild that was interrupted
+    obsolete = (obsolete or []) + [name + _REBUILD_SUFFIX for name in declared_names]
+    drift["obsolete"] = [name for name in obsolete if name in existing]
+    for name in existing:
+        if name != "_id_" and name not in declared_names and name not in obsolete:
+            drift["unmanaged"].append(name)
+
+    return drift
+
+
+async def check_indexes(database: AsyncIOMotorDatabase) -> Dict[str, Dict[str, List[str]]]:
+    """Report index drift for every managed collection."""
+    report = {}
+    for collection_name, declared in INDEXES.items():
+        existing = await database[collection_name].index_information()
+        report[collection_name] = diff_indexes(declared, existing, OBSOLETE_INDEXES.get(collection_name))
+    return report
+
+
+async def _rebuild_index(collection, model: IndexModel) -> None:
+    """
+    Replace a changed index without a window where queries have none. A
+    copy with the new options and one more (never set) trailing key is
+    built first: it serves the same queries and enforces the same
+    uniqueness, yet MongoDB does not consider it equivalent to the old or
+    the new index. The old index is only dropped once the copy is built,
+    so a build that fails (e.g. unique over duplicates) keeps it.
+    """
+    spec = dict(model.document)
+    name = spec["name"]
+    keys = list(spec.pop("key").items())
+    copy = IndexModel(keys + [(_REBUILD_SUFFIX, ASCENDING)], **{**spec, "name": name + _REBUILD_SUFFIX})
+    try:
+        await collection.create_indexes([copy])
+    except OperationFailure as e:
+        if e.code not in _CONFLICT_CODES:
+            raise
+        # Cannot stand next to the old one (e.g. a second text index);
+        # replace it in place
+        await collection.drop_index(name)
+        await collection.create_indexes([model])
+        return
+    await collection.drop_index(name)
+    await collection.create_indexes([model])
+    await collection.drop_index(copy.document["name"])
+
+
+async def _ensure_collection_indexes(collection, declared: List[IndexModel], drift: Dict[str, List[str]]) -> None:
+    failed = drift["failed"]
+
+    for name in drift["obsolete"]:
+        try:
+            await collection.drop_index(name)
+        except PyMongoError as e:
+            print(f"Failed to drop index '{name}' on '{collection.name}': {e}")
+            failed.append(name)
+
+    for model in declared:
+        name = model.document["name"]
+        if name in drift["changed"]:
+            try:
+                await _rebuild_index(collection, model)
+            except PyMongoError as e:
+                print(f"Failed to rebuild index '{name}' on '{collection.name}': {e}")
+                failed.append(name)
+
+    missing = [m for m in declared if m.document["name"] in drift["missing"]]
+    if not missing:
+        return
+    try:
+        # One pass over the collection for all of them
+        await collection.create_indexes(missing)
+    except PyMongoError:
+        # Build them one by one, so one failure does not hold up the others
+        for model in missing:
+            try:
+                await collection.create_indexes([model])
+            except PyMongoError as e:
+                print(f"Failed to build index '{model.document['name']}' on '{collection.name}': {e}")
+                failed.append(model.document["name"])
+
+
+async def ensure_indexes(database: AsyncIOMotorDatabase) -> Dict[str, Dict[str, List[str]]]:
+    """
+    Build missing indexes and rebuild changed ones. Safe to call repeatedly;
+    returns the drift that was found before repairing it. An index that
+    cannot be built (e.g. a unique one over duplicates) is listed under
+    "failed" and does not stop the others.
+    """
+    report = await check_indexes(database)
+    for collection_name, declared in INDEXES.items():
+        drift = report[collection_name]
+        drift["failed"] = []
+        await _ensure_collection_indexes(database[collection_name], declared, drift)
+    return report
+
+
+async def get_applied_versions(database: AsyncIOMotorDatabase) -> List[int]:
+    cursor = database[MIGRATIONS_COLLECTION].find({}, {"_id": 1})
+    return sorted([doc["_id"] async for doc in cursor])
+
+
+async def apply_migrations(database: AsyncIOMotorDatabase) -> List[int]:
+    """Run data migrations that have not been recorded yet. Returns applied versions."""
+    applied = set(await get_applied_versions(database))
+    newly_applied = []
+
+    for migration in sorted(MIGRATIONS, key=lambda m: m.version):
+        if migration.version in applied:
+            continue
+        print(f"Applying migration {migration.version}: {migration.description}")
+        await migration.apply(database)
+        try:
+            await database[MIGRATIONS_COLLECTION].insert_one({
+                "_id": migration.version,
+                "description": migration.description,
+                "applied_at": datetime.utcnow()
+            })
+        except DuplicateKeyError:
+            # Another worker finished the same migration first
+            pass
+        newly_applied.append(migration.version)
+
+    return newly_applied
+
+
+async def run_migrations(database: AsyncIOMotorDatabase) -> Dict[str, Dict[str, List[str]]]:
+    """Apply pending data migrations, then bring indexes in line with INDEXES."""
+    await apply_migrations(database)
+    report = await ensure_indexes(database)
+
+    for collection_name, drift in report.items():
+        if drift["missing"] or drift["changed"] or drift["obsolete"]:
+            failed = drift["failed"]
+            print(
+                f"Indexes on '{collection_name}': "
+                f"created {[name for name in drift['missing'] if name not in failed]}, "
+                f"rebuilt {[name for name in drift['changed'] if name not in failed]}, "
+                f"dropped {[name for name in drift['obsolete'] if name not in failed]}"
+            )
+        if drift["failed"]:
+            print(f"Indexes on '{collection_name}' that could not be built or dropped: {drift['failed']}")
+        if drift["unmanaged"]:
+            print(f"Unmanaged indexes on '{collection_name}': {drift['unmanaged']}")
+    return report
@@ -0,0 +1,38 @@
+import base64
+import json
+from datetime import datetime
+from bson import ObjectId
+from bson.errors import InvalidId
+from typing import Optional, Sequence, Tuple
+
+# Response header carrying the opaque token for the next page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(item_id: str, created_at: Optional[datetime] = None) -> str:
+    """Encode the sort key of the last item on a page into an opaque token."""
+    payload = {"id": item_id}
+    if created_at is not None:
+        payload["t"] = created_at.isoformat()
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[ObjectId, Optional[datetime]]:
+    """Decode a token produced by `encode_cursor`. Raises ValueError if malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        item_id = ObjectId(payload["id"])
+        created_at = datetime.fromisoformat(payload["t"]) if "t" in payload else None
+    except (ValueError, KeyError, TypeError, InvalidId) as e:
+        raise ValueError("Invalid cursor") from e
+    return item_id, created_at
+
+
+def next_cursor(items: Sequence, limit: int, with_created_at: bool = True) -> Optional[str]:
+    """Token for the page after `items`, or None if this was the last page."""
+    if not items or len(items) < limit:
+        return None
+    last = items[-1]
+    return encode_cursor(last.id, last.created_at if with_created_at else None)
@@ -0,0 +1,110 @@
+import asyncio
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Set
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo import UpdateOne
+
+_MISSING = object()
+
+# An upgrade step looks at a document of the previous version and returns
+# the fields to set; it must not modify the document itself.
+Upgrade = Callable[[dict], Dict[str, Any]]
+
+
+class DocumentSchema:
+    """
+    Versioned shape of one collection's documents. Version N is reached by
+    applying the first N upgrade steps; documents without "schema_version"
+    are version 0. Repositories upgrade old documents as they read them and
+    write the result back lazily; upgrade_collection does the rest in bulk.
+    """
+
+    def __init__(self, upgrades: List[Upgrade]):
+        self.upgrades = upgrades
+
+    @property
+    def version(self) -> int:
+        return len(self.upgrades)
+
+    def outdated_query(self) -> dict:
+        return {"schema_version": {"$not": {"$gte": self.version}}}
+
+    def upgrade(self, doc: dict) -> Optional[UpdateOne]:
+        """
+        Bring `doc` up to date in place. Returns the write that stores the
+        upgrade, or None if it was current. The write only applies if the
+        changed fields still hold what was read, so it never overwrites a
+        concurrent update.
+        """
+        version = doc.get("schema_version", 0)
+        if version >= self.version:
+            return None
+
+        original: Dict[str, Any] = {}
+        changes: Dict[str, Any] = {}
+        for upgrade in self.upgrades[version:]:
+            for field, value in upgrade(doc).items():
+                if field not in original:
+                    original[field] = doc.get(field, _MISSING)
+                doc[field] = value
+                changes[field] = value
+        doc["schema_version"] = self.version
+
+        guard = {"_id": doc["_id"], "schema_version": version if version else {"$exists": False}}
+        for field, value in original.items():
+            guard[field] = {"$exists": False} if value is _MISSING else {"$eq": value}
+        return UpdateOne(guard, {"$set": {**changes, "schema_version": self.version}})
+
+
+def created_at_from_id(doc: dict) -> datetime:
+    """Creation time embedded in an ObjectId _id (to the second), for documents that lack one."""
+    if isinstance(doc.get("_id"), ObjectId):
+        return doc["_id"].generation_time.replace(tzinfo=None)
+    return datetime.utcnow()
+
+
+# Keeps write-back tasks referenced until they finish
+_pending_writes: Set[asyncio.Task] = set()
+
+
+def write_back(collection: AsyncIOMotorCollection, updates: List[Optional[UpdateOne]]):
+    """Store upgraded documents in the background; failures are only logged."""
+    updates = [update for update in updates if update]
+    if not updates:
+        return
+
+    async def write():
+        try:
+            await collection.bulk_write(updates, ordered=False)
+        except Exception as e:
+            print(f"Failed to write back {len(updates)} upgraded {collection.name} documents: {e}")
+
+    task = asyncio.create_task(write())
+    _pending_writes.add(task)
+    task.add_done_callback(_pending_writes.discard)
+
+
+async def upgrade_collection(
+    collection: AsyncIOMotorCollection,
+    schema: DocumentSchema,
+    batch_size: int = 1000,
+    pause: float = 0
+) -> int:
+    """
+    Upgrade every outdated document, one bulk_write per batch. Safe to run
+    while the app is serving. Returns the number of documents written.
+    """
+    upgraded = 0
+    batch = []
+    cursor = collection.find(schema.outdated_query()).batch_size(batch_size)
+    async for doc in cursor:
+        batch.append(schema.upgrade(doc))
+        if len(batch) >= batch_size:
+            upgraded += (await collection.bulk_write(batch, ordered=False)).modified_count
+            batch = []
+            if pause:
+                await asyncio.sleep(pause)
+    if batch:
+        upgraded += (await collection.bulk_write(batch, ordered=False)).modified_count
+    return upgraded
@@ -0,0 +1,123 @@
+import json
+from typing import AsyncIterator, Iterator, List, Optional, TextIO, Tuple
+
+_WHITESPACE = " \t\r\n"
+# Longest record JsonRecordParser buffers before giving up; the same bound
+# as api/recipes.BULK_MAX_LINE_BYTES puts on NDJSON lines
+MAX_RECORD_CHARS = 1 << 20
+
+
+class JsonRecordParser:
+    """
+    Incremental parser for a stream of JSON objects, given either as one JSON
+    array or as NDJSON (one object per line). Feed text as it arrives and get
+    back the objects completed so far; only the unfinished tail is buffered,
+    up to `max_record_chars`: a longer record, or a malformed one that keeps
+    swallowing the rest of the stream, raises ValueError.
+    """
+
+    def __init__(self, max_record_chars: int = MAX_RECORD_CHARS):
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._in_array = None
+        self._closed_array = False
+        self._incomplete = False
+        self.max_record_chars = max_record_chars
+
+    def feed(self, text: str) -> List[dict]:
+        self._buffer += text
+        if self._incomplete and "}" not in text:
+            # An object cannot have been completed; don't decode it again
+            self._check_size()
+            return []
+        self._incomplete = False
+        records = []
+        pos = 0
+        while True:
+            pos = self._skip_separators(pos)
+            if pos >= len(self._buffer):
+                break
+            if self._in_array is None:
+                self._in_array = self._buffer[pos] == "["
+                if self._in_array:
+                    pos += 1
+                    continue
+            if self._closed_array:
+                raise ValueError("Unexpected data after the end of the JSON array")
+            if self._in_array and self._buffer[pos] == "]":
+                self._closed_array = True
+                pos += 1
+                continue
+            try:
+                record, pos = self._decoder.raw_decode(self._buffer, pos)
+            except json.JSONDecodeError:
+                # Most likely an object cut in half; wait for more text
+                self._incomplete = True
+                break
+            if not isinstance(record, dict):
+                raise ValueError(f"Expected a JSON object, got {type(record).__name__}")
+            records.append(record)
+        self._buffer = self._buffer[pos:]
+        self._check_size()
+        return records
+
+    def _check_size(self):
+        if len(self._buffer) > self.max_record_chars:
+            raise ValueError(
+                f"Invalid JSON: record longer than {self.max_record_chars} characters, or malformed"
+            )
+
+    def close(self):
+        """Raise ValueError if the stream ended in the middle of a record or array."""
+        if self._buffer.strip(_WHITESPACE + ","):
+            try:
+                self._decoder.raw_decode(self._buffer.lstrip(_WHITESPACE + ","))
+            except json.JSONDecodeError as e:
+                raise ValueError(f"Invalid JSON: {e}") from e
+            raise ValueError("Invalid JSON: trailing data")
+        if self._in_array and not self._closed_array:
+            raise ValueError("Invalid JSON: unterminated array")
+
+    def _skip_separators(self, pos: int) -> int:
+        separators = _WHITESPACE + "," if self._in_array else _WHITESPACE
+        while pos < len(self._buffer) and self._buffer[pos] in separators:
+            pos += 1
+        return pos
+
+
+def iter_json_records(stream: TextIO, chunk_size: int = 1 << 16) -> Iterator[dict]:
+    """Yield the objects of a JSON array or NDJSON file without loading it whole."""
+    parser = JsonRecordParser()
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        yield from parser.feed(chunk)
+    parser.close()
+
+
+async def iter_ndjson_lines(
+    chunks: AsyncIterator[bytes],
+    max_line_bytes: int
+) -> AsyncIterator[Tuple[int, Optional[bytes]]]:
+    """
+    Split a byte stream into (line number, line) pairs, 1-based. A line longer
+    than `max_line_bytes` is discarded as it arrives and yielded as None, so
+    memory stays bounded whatever the input.
+    """
+    buffer = b""
+    line_no = 0
+    skipping = False
+    async for chunk in chunks:
+        *lines, buffer = (buffer + chunk).split(b"\n")
+        for line in lines:
+            line_no += 1
+            yield line_no, None if skipping or len(line) > max_line_bytes else line
+            skipping = False
+        if skipping:
+            buffer = b""
+        elif len(buffer) > max_line_bytes:
+            buffer = b""
+            skipping = True
+    if buffer or skipping:
+        yield line_no + 1, None if skipping else buffer
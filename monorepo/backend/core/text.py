@@ -0,0 +1,53 @@
+import re
+import unicodedata
+from typing import List
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Case endings of the Czech light stemmer (Dolamic & Savoy), written without
+# diacritics because stemming runs on folded text. Grouped by the minimum
+# word length the ending may be stripped from.
+_CASE_SUFFIXES = [
+    (7, ("atech",)),
+    (6, ("etem", "atum")),
+    (5, ("ech", "ich", "eho", "emi", "emu", "ete", "eti", "iho", "imi", "imu",
+         "ach", "ata", "aty", "ych", "ama", "ami", "ove", "ovi", "ymi")),
+    (4, ("em", "es", "im", "um", "at", "am", "os", "us", "ym", "mi", "ou")),
+    (3, ("a", "e", "i", "o", "u", "y")),
+]
+_POSSESSIVE_SUFFIXES = ("ov", "in", "uv")
+
+
+def fold(text: str) -> str:
+    """Lowercase and strip diacritics ("Česneková" -> "cesnekova")."""
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).lower()
+
+
+def tokenize(text: str) -> List[str]:
+    """Split folded text into alphanumeric tokens."""
+    return _TOKEN_RE.findall(fold(text))
+
+
+def stem(token: str) -> str:
+    """Strip Czech case and possessive endings from a folded token."""
+    for min_length, suffixes in _CASE_SUFFIXES:
+        if len(token) > min_length:
+            for suffix in suffixes:
+                if token.endswith(suffix):
+                    token = token[:-len(suffix)]
+                    break
+            else:
+                continue
+            break
+
+    if len(token) > 5:
+        for suffix in _POSSESSIVE_SUFFIXES:
+            if token.endswith(suffix):
+                return token[:-len(suffix)]
+    return token
+
+
+def search_terms(text: str) -> List[str]:
+    """Folded, stemmed terms used both for indexing and for queries."""
+    return [stem(token) for token in tokenize(text)]
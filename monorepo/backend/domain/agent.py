@@ -1,5 +1,6 @@
 from pydantic import BaseModel, Field, conlist
 from typing import Optional, List, Literal
+from domain.recipe import IngredientMatch
 
 class ChatMessage(BaseModel):
     role: Literal["user", "assistant"]
@@ -13,6 +14,10 @@ class ChatRequest(BaseModel):
 
 class ChatResponse(BaseModel):
     response: str
+    # Catalog recipes the answer is based on, when it did not come from the AI
+    recipes: List[IngredientMatch] = []
 
 class IngredientsRequest(BaseModel):
     ingredients: List[str]
+    # Set to False to always ask the AI for a new recipe
+    use_catalog: bool = True
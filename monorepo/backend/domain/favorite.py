@@ -0,0 +1,13 @@
+from pydantic import BaseModel, Field
+from typing import Optional
+from datetime import datetime
+
+class FavoriteInDB(BaseModel):
+    id: Optional[str] = Field(None, alias="_id")
+    user_id: str
+    recipe_id: str
+    active: bool = True
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+    class Config:
+        populate_by_name = True
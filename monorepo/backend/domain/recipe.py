@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, field_validator
-from typing import List, Optional, Any
+from typing import Dict, List, Optional, Any, Set
 from datetime import datetime
 from enum import Enum
 
@@ -7,6 +7,14 @@ class Visibility(str, Enum):
     PRIVATE = "private"
     PUBLIC = "public"
 
+class SearchMode(str, Enum):
+    TEXT = "text"
+    REGEX = "regex"
+
+class ExportFormat(str, Enum):
+    NDJSON = "ndjson"
+    JSON = "json"
+
 class Ingredient(BaseModel):
     name: str
     amount: Optional[str] = ""
@@ -47,7 +55,8 @@ class RecipeUpdate(BaseModel):
 class RecipeInDB(RecipeBase):
     id: Optional[str] = Field(None, alias="_id")
     author_id: str
-    favorite_by: List[str] = []
+    # Denormalized number of entries in the favorites collection
+    favorite_count: int = 0
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
@@ -56,3 +65,86 @@ class RecipeInDB(RecipeBase):
 
 class RecipeResponse(RecipeInDB):
     is_favorite: bool = False
+
+class RecipeSummary(BaseModel):
+    """A recipe loaded with a projection: only the requested fields are set."""
+    id: Optional[str] = Field(None, alias="_id")
+    title: Optional[str] = None
+    description: Optional[str] = None
+    steps: Optional[List[str]] = None
+    ingredients: Optional[List[Ingredient]] = None
+    tags: Optional[List[str]] = None
+    visibility: Optional[Visibility] = None
+    video_url: Optional[str] = None
+    image_url: Optional[str] = None
+    web_url: Optional[str] = None
+    author_id: Optional[str] = None
+    favorite_count: Optional[int] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    is_favorite: Optional[bool] = None
+
+    class Config:
+        populate_by_name = True
+
+class TagCount(BaseModel):
+    tag: str
+    count: int
+
+class RecipeFacets(BaseModel):
+    # Recipes matching the filter that the caller can see
+    total: int
+    visibility: Dict[Visibility, int] = {}
+    tags: List[TagCount] = []
+    # True when counts were extrapolated from a sample of a large collection
+    estimated: bool = False
+
+class TitleSuggestion(BaseModel):
+    id: str = Field(alias="_id")
+    title: str
+
+    class Config:
+        populate_by_name = True
+
+class RecipeSuggestions(BaseModel):
+    titles: List[TitleSuggestion] = []
+    # Tags with their number of public recipes
+    tags: List[TagCount] = []
+
+class IngredientMatch(BaseModel):
+    id: str = Field(alias="_id")
+    title: str
+    # How many of the recipe's ingredients the user has
+    matched: int
+    # Ingredients the user still needs (staples such as salt are assumed)
+    missing: List[str] = []
+
+    class Config:
+        populate_by_name = True
+
+# Fields a client may select with `fields=`
+RECIPE_FIELDS = set(RecipeResponse.model_fields) - {"id"}
+
+# Named field sets usable in `fields=`
+RECIPE_FIELD_PROFILES = {
+    "summary": {"title", "image_url", "tags", "is_favorite"},
+}
+
+def parse_recipe_fields(fields: Optional[str]) -> Optional[Set[str]]:
+    """
+    Parse a `fields=` value such as "summary" or "title,tags,summary".
+    Returns None for "all fields" and raises ValueError on unknown names.
+    """
+    if not fields:
+        return None
+    selected = set()
+    for name in (f.strip() for f in fields.split(",")):
+        if not name:
+            continue
+        if name in RECIPE_FIELD_PROFILES:
+            selected |= RECIPE_FIELD_PROFILES[name]
+        elif name in RECIPE_FIELDS:
+            selected.add(name)
+        else:
+            raise ValueError(f"Unknown field '{name}'")
+    return selected or None
@@ -5,6 +5,10 @@ from datetime import datetime
 class ShoppingItem(BaseModel):
     id: str
     value: str
+    # Set for items built from recipe ingredients; `amount` is in `unit`
+    name: Optional[str] = None
+    amount: Optional[float] = None
+    unit: Optional[str] = None
 
 class ShoppingCartBase(BaseModel):
     items: List[ShoppingItem] = []
@@ -23,3 +27,7 @@ class ShoppingCartInDB(ShoppingCartBase):
 
     class Config:
         populate_by_name = True
+
+class ShoppingListRequest(BaseModel):
+    # A recipe listed twice has its ingredients added twice
+    recipe_ids: List[str] = Field(..., min_length=1, max_length=100)
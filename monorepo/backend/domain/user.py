@@ -23,7 +23,9 @@ class UserUpdate(BaseModel):
 class UserInDB(UserBase):
     id: str = Field(alias="_id")
     hashed_password: str
-    created_at: datetime = datetime.utcnow()
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    # Bumped to revoke every token issued before
+    token_version: int = 0
 
     class Config:
         populate_by_name = True
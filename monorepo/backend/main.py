@@ -1,8 +1,18 @@
+import asyncio
 from fastapi import FastAPI
 from contextlib import asynccontextmanager
 from core.config import get_settings
 from core.database import db
+from core.migrations import run_migrations, upgrade_documents
+from core.invalidation import ChangeStreamListener
+from core.pagination import NEXT_CURSOR_HEADER
+from repository.recipe_repository import RecipeRepository
+from services.suggest_index import load_suggest_index
+from services.ingredient_index import load_ingredient_index
 from api import auth, users, recipes, agent, shopping_cart
+from api.deps import user_cache
+from services.recipe_service import recipe_cache
+from auth.revocation import token_revocations
 from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
 from slowapi.middleware import SlowAPIMiddleware
@@ -11,12 +21,48 @@ from fastapi.middleware.cors import CORSMiddleware
 
 settings = get_settings()
 
+def _report_upgrade_failure(task: asyncio.Task):
+    if not task.cancelled() and task.exception():
+        print(f"Failed to upgrade documents: {task.exception()}")
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
     db.connect()
+    try:
+        await db.warm_up()
+    except Exception as e:
+        print(f"Failed to connect to MongoDB: {e}")
+    upgrader = None
+    if settings.AUTO_MIGRATE:
+        try:
+            await run_migrations(db.get_db())
+        except Exception as e:
+            print(f"Failed to run migrations: {e}")
+        # Outdated documents are also upgraded on read; this catches the rest
+        # without holding up startup
+        upgrader = asyncio.create_task(upgrade_documents(db.get_db(), pause=0.05))
+        upgrader.add_done_callback(_report_upgrade_failure)
+    listener = ChangeStreamListener(db.get_db())
+    if settings.CHANGE_STREAMS_ENABLED:
+        # Before the indexes below are filled, so no write falls in between
+        try:
+            await listener.start()
+        except Exception as e:
+            print(f"Failed to start change stream listener: {e}")
+    if settings.STATELESS_TOKENS:
+        await token_revocations.start(db.get_db())
+    try:
+        await load_suggest_index(RecipeRepository(db.get_db()))
+        await load_ingredient_index(RecipeRepository(db.get_db()))
+    except Exception as e:
+        print(f"Failed to build in-memory indexes: {e}")
     yield
     # Shutdown
+    if upgrader:
+        upgrader.cancel()
+    await listener.stop()
+    await token_revocations.stop()
     db.close()
 
 app = FastAPI(
@@ -37,6 +83,7 @@ if settings.BACKEND_CORS_ORIGINS:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=[NEXT_CURSOR_HEADER],
     )
 
 app.include_router(auth.router, prefix=f"{settings.API_V1_STR}/auth", tags=["auth"])
@@ -49,6 +96,20 @@ app.include_router(shopping_cart.router, prefix=f"{settings.API_V1_STR}/shopping
 async def health_check():
     return {"status": "ok"}
 
+@app.get("/health/db")
+async def database_health_check():
+    """Connection pool statistics, to spot cold starts and pool exhaustion."""
+    return {"pool": db.pool_stats.snapshot()}
+
+@app.get("/health/cache")
+async def cache_health_check():
+    """Hit rates of this worker's user and recipe caches, and the size of its token revocation list."""
+    return {
+        "users": user_cache.stats(),
+        "recipes": recipe_cache.stats(),
+        "revoked_tokens": len(token_revocations),
+    }
+
 @app.get("/")
 async def root():
     return {"message": "Welcome to Recipe App API"}
@@ -0,0 +1,100 @@
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from bson import ObjectId
+from typing import Optional, List, Set, Tuple
+from datetime import datetime
+from domain.favorite import FavoriteInDB
+
+# Flips `active` (a missing field counts as inactive, which is what a fresh
+# upsert looks like) and moves re-favorited entries to the top of the list.
+_TOGGLE_PIPELINE = [
+    {"$set": {"active": {"$not": [{"$eq": ["$active", True]}]}}},
+    {"$set": {"created_at": {"$cond": ["$active", "$$NOW", "$created_at"]}}},
+]
+
+
+class FavoriteRepository:
+    """
+    One document per (user_id, recipe_id), unique - see core/migrations.py.
+    Un-favoriting keeps the document with active=False so that a toggle is
+    a single atomic update of that one document.
+    """
+
+    def __init__(self, db: AsyncIOMotorDatabase):
+        self.collection = db.favorites
+
+    async def toggle(self, user_id: str, recipe_id: str, upsert: bool = True) -> Optional[bool]:
+        """
+        Atomically flip the favorite in one round trip. Returns the new
+        state, or None if there was nothing to flip and `upsert` is off.
+        """
+        flipped = await self.flip(user_id, recipe_id, upsert)
+        return flipped[0] if flipped else None
+
+    async def flip(self, user_id: str, recipe_id: str, upsert: bool = True) -> Optional[Tuple[bool, bool]]:
+        """toggle() that also tells whether the flip created the document: (new state, created)."""
+        for attempt in range(2):
+            try:
+                before = await self.collection.find_one_and_update(
+                    {"user_id": user_id, "recipe_id": recipe_id},
+                    _TOGGLE_PIPELINE,
+                    upsert=upsert,
+                    return_document=ReturnDocument.BEFORE
+                )
+            except DuplicateKeyError:
+                # Two first-time toggles raced on the upsert; the loser retries
+                # as a plain update of the document the winner inserted.
+                if attempt:
+                    raise
+                continue
+            if before is None:
+                # Upserted as active, or nothing to flip
+                return (True, True) if upsert else None
+            return before.get("active") is not True, False
+
+    async def delete(self, user_id: str, recipe_id: str) -> bool:
+        result = await self.collection.delete_one({"user_id": user_id, "recipe_id": recipe_id})
+        return result.deleted_count > 0
+
+    async def delete_by_recipe(self, recipe_id: str) -> int:
+        result = await self.collection.delete_many({"recipe_id": recipe_id})
+        return result.deleted_count
+
+    async def is_favorite(self, user_id: str, recipe_id: str) -> bool:
+        doc = await self.collection.find_one({"user_id": user_id, "recipe_id": recipe_id, "active": True}, {"_id": 1})
+        return doc is not None
+
+    async def get_favorited_ids(self, user_id: str, recipe_ids: List[str]) -> Set[str]:
+        """Which of `recipe_ids` the user has favorited, in one query."""
+        if not recipe_ids:
+            return set()
+        cursor = self.collection.find(
+            {"user_id": user_id, "recipe_id": {"$in": recipe_ids}, "active": True},
+            {"recipe_id": 1, "_id": 0}
+        )
+        return {doc["recipe_id"] async for doc in cursor}
+
+    async def get_by_user(
+        self,
+        user_id: str,
+        skip: int = 0,
+        limit: int = 100,
+        after: Optional[Tuple[ObjectId, datetime]] = None
+    ) -> List[FavoriteInDB]:
+        """Most recently favorited first, with the same keyset rules as RecipeRepository.get_all."""
+        query = {"user_id": user_id, "active": True}
+        if after:
+            after_id, after_created_at = after
+            query["$or"] = [
+                {"created_at": {"$lt": after_created_at}},
+                {"created_at": after_created_at, "_id": {"$lt": after_id}}
+            ]
+            skip = 0
+
+        favorites = []
+        cursor = self.collection.find(query).sort([("created_at", -1), ("_id", -1)]).skip(skip).limit(limit)
+        async for doc in cursor:
+            doc["_id"] = str(doc["_id"])
+            favorites.append(FavoriteInDB(**doc))
+        return favorites
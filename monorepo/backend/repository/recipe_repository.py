@@ -1,20 +1,194 @@
+import asyncio
+import hashlib
+import random
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from bson import ObjectId, Regex
-from typing import Optional, List
-from domain.recipe import RecipeInDB, RecipeCreate, RecipeUpdate
+from pymongo import ReturnDocument
+from pymongo.errors import BulkWriteError
+from typing import AsyncIterator, Dict, Optional, List, Tuple, Set, Union
+from datetime import datetime
+from domain.recipe import RecipeInDB, RecipeCreate, RecipeUpdate, RecipeSummary, SearchMode
+from core.text import fold, search_terms
+from core.database import ReadMode, read_preference_for
+from core.schema import DocumentSchema, created_at_from_id, write_back
+
+# Source field -> stemmed copy used by the "recipes_search" text index
+SEARCH_FIELDS = {
+    "title": "search.title",
+    "description": "search.description",
+    "tags": "search.tags",
+}
+
+
+def build_search_fields(data: dict) -> dict:
+    """
+    Return the dotted "search.*" values for whichever searchable fields are
+    present in `data`, so partial updates only touch their own terms.
+    """
+    fields = {}
+    for source, target in SEARCH_FIELDS.items():
+        if source not in data:
+            continue
+        value = data[source] or ""
+        if isinstance(value, list):
+            value = " ".join(value)
+        fields[target] = " ".join(search_terms(value))
+    return fields
+
+def _upgrade_recipe_v1(doc: dict) -> dict:
+    """
+    Shapes written by older versions: numeric or null ingredient amounts,
+    no favorite_count (recipes predating the favorites collection), no
+    visibility or timestamps.
+    """
+    changes = {}
+    ingredients = doc.get("ingredients") or []
+    if any(not isinstance(i.get("amount"), str) for i in ingredients):
+        changes["ingredients"] = [
+            {**i, "amount": "" if i.get("amount") is None else str(i["amount"])}
+            for i in ingredients
+        ]
+    if "favorite_count" not in doc:
+        # What scripts/migrate_favorites.py will count for it
+        changes["favorite_count"] = len(doc.get("favorite_by") or [])
+    if "visibility" not in doc:
+        changes["visibility"] = "private"
+    if not doc.get("created_at"):
+        changes["created_at"] = created_at_from_id(doc)
+    if not doc.get("updated_at"):
+        changes["updated_at"] = doc.get("created_at") or changes["created_at"]
+    return changes
+
+
+RECIPE_SCHEMA = DocumentSchema([_upgrade_recipe_v1])
+
+
+def build_projection(fields: Set[str]) -> dict:
+    """Translate selected API fields into a find() or $project projection."""
+    # is_favorite is resolved from the favorites collection
+    projection = {field: 1 for field in fields if field != "is_favorite"}
+    # Always needed to build the next-page cursor
+    projection["created_at"] = 1
+    return projection
+
+
+def build_import_hash(author_id: str, title: str, web_url: Optional[str] = None) -> str:
+    """
+    Identity of an imported recipe for duplicate detection: its source URL if
+    it has one, otherwise its title, scoped to the importing author.
+    """
+    source = web_url.strip() if web_url else " ".join(fold(title).split())
+    return hashlib.sha1(f"{author_id}\n{source}".encode()).hexdigest()
+
+
+def build_filter_query(search_query: Optional[str] = None, tags: Optional[List[str]] = None) -> Optional[dict]:
+    """
+    Filter for a text search and/or tags, as used by get_all in text mode.
+    None when the search has no usable terms and can match nothing.
+    """
+    query = {}
+    if tags:
+        query["tags"] = {"$all": tags}
+    if search_query:
+        terms = search_terms(search_query)
+        if not terms:
+            return None
+        query["$text"] = {"$search": " ".join(terms)}
+    return query
+
 
 class RecipeRepository:
     def __init__(self, db: AsyncIOMotorDatabase):
         self.collection = db.recipes
-        # Create indexes (this should ideally be in a migration script or startup, but here for vibe coding)
-        # self.collection.create_index([("title", "text"), ("description", "text"), ("tags", "text")])
+        self._readers = {
+            mode: self.collection.with_options(read_preference=read_preference_for(mode))
+            for mode in ReadMode
+        }
+        # Indexes are declared in core/migrations.py and built on startup
 
-    async def create(self, recipe: RecipeInDB) -> RecipeInDB:
+    def _to_document(self, recipe: RecipeInDB) -> dict:
         recipe_dict = recipe.model_dump(by_alias=True, exclude={"id"})
-        result = await self.collection.insert_one(recipe_dict)
+        recipe_dict["search"] = {
+            key.split(".", 1)[1]: value for key, value in build_search_fields(recipe_dict).items()
+        }
+        # Uniform in [0, 1); get_random seeks the "recipes_visibility_random" index by it
+        recipe_dict["random_key"] = random.random()
+        # Written from a validated model, so already in the current shape
+        recipe_dict["schema_version"] = RECIPE_SCHEMA.version
+        return recipe_dict
+
+    def _to_models(
+        self,
+        docs: List[dict],
+        fields: Optional[Set[str]]
+    ) -> Union[List[RecipeInDB], List[RecipeSummary]]:
+        if not fields:
+            return self._to_recipes(docs)
+        # Projections are partial documents; they are validated as they are
+        # and left for a full read or upgrade_collection to upgrade
+        summaries = []
+        for doc in docs:
+            doc["_id"] = str(doc["_id"])
+            summaries.append(RecipeSummary(**doc))
+        return summaries
+
+    def _to_recipes(self, docs: List[dict]) -> List[RecipeInDB]:
+        """
+        Build models from full documents. Outdated ones are upgraded first
+        and the upgrade is stored in the background, so each legacy document
+        is only fixed up on read once.
+        """
+        write_back(self.collection, [RECIPE_SCHEMA.upgrade(doc) for doc in docs])
+        recipes = []
+        for doc in docs:
+            doc["_id"] = str(doc["_id"])
+            recipes.append(RecipeInDB(**doc))
+        return recipes
+
+    async def create(self, recipe: RecipeInDB) -> RecipeInDB:
+        result = await self.collection.insert_one(self._to_document(recipe))
         recipe.id = str(result.inserted_id)
         return recipe
 
+    async def insert_many(
+        self,
+        recipes: List[RecipeInDB],
+        errors: Optional[Dict[int, str]] = None
+    ) -> List[Optional[str]]:
+        """
+        Insert imported recipes in one unordered batch. Each one is tagged
+        with its import hash, so a recipe imported before is skipped by the
+        unique "recipes_import_hash" index. Returns the new id of each recipe,
+        in order, or None where it was skipped as a duplicate.
+
+        Other write errors raise BulkWriteError, unless `errors` is given:
+        the position of each recipe the server refused is then mapped to its
+        message there (its id is None too), and the rest of the batch stands.
+        """
+        if not recipes:
+            return []
+        docs = []
+        for recipe in recipes:
+            doc = self._to_document(recipe)
+            doc["import_hash"] = build_import_hash(recipe.author_id, recipe.title, recipe.web_url)
+            docs.append(doc)
+
+        skipped = set()
+        try:
+            await self.collection.insert_many(docs, ordered=False)
+        except BulkWriteError as e:
+            write_errors = e.details.get("writeErrors", [])
+            refused = [error for error in write_errors if error["code"] != 11000]
+            # Written but not acknowledged as asked is not something to report per recipe
+            if (refused and errors is None) or e.details.get("writeConcernErrors"):
+                raise
+            for error in refused:
+                errors[error["index"]] = error.get("errmsg", "Write failed")
+            skipped = {error["index"] for error in write_errors}
+
+        # insert_many assigns each document its _id before sending
+        return [None if i in skipped else str(doc["_id"]) for i, doc in enumerate(docs)]
+
     async def get_by_id(self, recipe_id: str) -> Optional[RecipeInDB]:
         try:
             oid = ObjectId(recipe_id)
@@ -23,8 +197,7 @@ class RecipeRepository:
             
         doc = await self.collection.find_one({"_id": oid})
         if doc:
-            doc["_id"] = str(doc["_id"])
-            return RecipeInDB(**doc)
+            return self._to_recipes([doc])[0]
         return None
 
     async def update(self, recipe_id: str, update_data: dict) -> bool:
@@ -35,33 +208,98 @@ class RecipeRepository:
 
         result = await self.collection.update_one(
             {"_id": oid},
-            {"$set": update_data}
+            {"$set": {**update_data, **build_search_fields(update_data)}}
         )
         return result.modified_count > 0
 
-    async def toggle_favorite(self, recipe_id: str, user_id: str) -> bool:
+    async def update_owned(self, recipe_id: str, author_id: str, update_data: dict) -> Optional[RecipeInDB]:
+        """
+        Update a recipe only if `author_id` owns it and return the new version
+        in the same round trip. None means "not found or not owned".
+        """
+        try:
+            oid = ObjectId(recipe_id)
+        except:
+            return None
+
+        doc = await self.collection.find_one_and_update(
+            {"_id": oid, "author_id": author_id},
+            {"$set": {**update_data, **build_search_fields(update_data)}},
+            return_document=ReturnDocument.AFTER
+        )
+        if doc:
+            return self._to_recipes([doc])[0]
+        return None
+
+    async def get_owned(self, recipe_id: str, author_id: str) -> Optional[RecipeInDB]:
+        try:
+            oid = ObjectId(recipe_id)
+        except:
+            return None
+
+        doc = await self.collection.find_one({"_id": oid, "author_id": author_id})
+        if doc:
+            return self._to_recipes([doc])[0]
+        return None
+
+    async def delete_owned(self, recipe_id: str, author_id: str) -> bool:
+        """Delete a recipe only if `author_id` owns it."""
         try:
             oid = ObjectId(recipe_id)
         except:
             return False
 
-        # Check if user already favorited
-        recipe = await self.collection.find_one({"_id": oid, "favorite_by": user_id})
-        
-        if recipe:
-            # Remove from favorites
-            result = await self.collection.update_one(
-                {"_id": oid},
-                {"$pull": {"favorite_by": user_id}}
-            )
-        else:
-            # Add to favorites
-            result = await self.collection.update_one(
-                {"_id": oid},
-                {"$addToSet": {"favorite_by": user_id}}
-            )
-        
-        return result.modified_count > 0
+        result = await self.collection.delete_one({"_id": oid, "author_id": author_id})
+        return result.deleted_count > 0
+
+    async def adjust_favorite_count(
+        self,
+        recipe_id: str,
+        delta: int,
+        visible_to: Optional[str] = None
+    ) -> Optional[RecipeInDB]:
+        """
+        Add `delta` to favorite_count and return the updated recipe. With
+        `visible_to`, private recipes of other authors are not matched, so
+        None means "not found or not visible" - callers disambiguate.
+        """
+        try:
+            oid = ObjectId(recipe_id)
+        except:
+            return None
+
+        query = {"_id": oid}
+        if visible_to:
+            query["$or"] = [{"visibility": "public"}, {"author_id": visible_to}]
+
+        doc = await self.collection.find_one_and_update(
+            query,
+            {"$inc": {"favorite_count": delta}},
+            return_document=ReturnDocument.AFTER
+        )
+        if doc:
+            return self._to_recipes([doc])[0]
+        return None
+
+    async def get_by_ids(
+        self,
+        recipe_ids: List[str],
+        fields: Optional[Set[str]] = None
+    ) -> Union[List[RecipeInDB], List[RecipeSummary]]:
+        """Fetch several recipes with one $in query. Order is not preserved."""
+        oids = []
+        for recipe_id in recipe_ids:
+            try:
+                oids.append(ObjectId(recipe_id))
+            except:
+                continue
+        if not oids:
+            return []
+
+        projection = build_projection(fields) if fields else None
+
+        docs = await self.collection.find({"_id": {"$in": oids}}, projection).to_list(length=None)
+        return self._to_models(docs, fields)
 
     async def delete(self, recipe_id: str) -> bool:
         try:
@@ -77,19 +315,29 @@ class RecipeRepository:
         skip: int = 0, 
         limit: int = 100, 
         author_id: Optional[str] = None,
-        favorited_by_user_id: Optional[str] = None,
         public_only: bool = False,
         search_query: Optional[str] = None,
-        tags: Optional[List[str]] = None
-    ) -> List[RecipeInDB]:
+        tags: Optional[List[str]] = None,
+        search_mode: SearchMode = SearchMode.TEXT,
+        after: Optional[Tuple[ObjectId, datetime]] = None,
+        fields: Optional[Set[str]] = None,
+        read_mode: Optional[ReadMode] = None
+    ) -> Union[List[RecipeInDB], List[RecipeSummary]]:
+        """
+        Newest first. `after` is the (_id, created_at) of the last recipe of the
+        previous page; when given, `skip` is ignored and the page starts right
+        after it (keyset pagination). Not combinable with text search, which
+        is ordered by relevance.
+
+        With `fields`, only those fields are loaded and RecipeSummary objects
+        are returned. `read_mode` defaults to PUBLIC for public_only listings
+        and PRIMARY otherwise.
+        """
         query = {}
         
         if author_id:
             query["author_id"] = author_id
 
-        if favorited_by_user_id:
-            query["favorite_by"] = favorited_by_user_id
-        
         if public_only:
             # If requesting public only, we filter by visibility.
             # If author_id is present (e.g. searching someone else's recipes), valid.
@@ -98,30 +346,170 @@ class RecipeRepository:
         if tags:
             query["tags"] = {"$all": tags}
 
-        if search_query:
-            # Simple regex search for "vibe" implementation instead of full text setup
+        # _id breaks ties between recipes created in the same millisecond
+        sort = [("created_at", -1), ("_id", -1)]
+        if search_query and search_mode == SearchMode.REGEX:
+            # Legacy unanchored regex search, cannot use an index
             regex = Regex(search_query, "i")
             query["$or"] = [
                 {"title": regex},
                 {"description": regex},
                 {"tags": regex}
             ]
+        elif search_query:
+            terms = search_terms(search_query)
+            if not terms:
+                return []
+            # Served by the "recipes_search" text index, ranked by relevance
+            query["$text"] = {"$search": " ".join(terms)}
+            sort = [("score", {"$meta": "textScore"})] + sort
 
-        recipes = []
-        cursor = self.collection.find(query).skip(skip).limit(limit).sort("created_at", -1)
-        async for doc in cursor:
-            doc["_id"] = str(doc["_id"])
-            recipes.append(RecipeInDB(**doc))
-        return recipes
+        if after:
+            after_id, after_created_at = after
+            keyset = {"$or": [
+                {"created_at": {"$lt": after_created_at}},
+                {"created_at": after_created_at, "_id": {"$lt": after_id}}
+            ]}
+            query = {"$and": [query, keyset]} if query else keyset
+            skip = 0
+
+        projection = build_projection(fields) if fields else None
 
-    async def get_random(self, limit: int = 5) -> List[RecipeInDB]:
-        pipeline = [
-            {"$match": {"visibility": "public"}},
-            {"$sample": {"size": limit}}
+        # Public listings tolerate replication lag; anything scoped to an
+        # author stays on the primary unless the caller says otherwise
+        if read_mode is None:
+            read_mode = ReadMode.PUBLIC if public_only and not author_id else ReadMode.PRIMARY
+        cursor = self._readers[read_mode].find(query, projection).skip(skip).limit(limit).sort(sort)
+        return self._to_models(await cursor.to_list(length=None), fields)
+
+    async def estimated_count(self) -> int:
+        """Collection size from metadata; constant time, includes every visibility."""
+        return await self.collection.estimated_document_count()
+
+    async def get_facets(
+        self,
+        query: dict,
+        tag_limit: int = 20,
+        sample_size: Optional[int] = None,
+        read_mode: ReadMode = ReadMode.PRIMARY
+    ) -> dict:
+        """
+        Count the recipes matching `query`: total, per visibility and the top
+        `tag_limit` tags, in a single $facet aggregation. With `sample_size`,
+        only a random sample of the whole collection is examined.
+        """
+        pipeline = []
+        if sample_size:
+            pipeline.append({"$sample": {"size": sample_size}})
+        pipeline += [
+            {"$match": query},
+            {"$facet": {
+                "total": [{"$count": "count"}],
+                "visibility": [{"$group": {"_id": "$visibility", "count": {"$sum": 1}}}],
+                "tags": [
+                    {"$unwind": "$tags"},
+                    {"$group": {"_id": "$tags", "count": {"$sum": 1}}},
+                    {"$sort": {"count": -1, "_id": 1}},
+                    {"$limit": tag_limit}
+                ],
+            }}
         ]
-        
-        recipes = []
-        async for doc in self.collection.aggregate(pipeline):
-            doc["_id"] = str(doc["_id"])
-            recipes.append(RecipeInDB(**doc))
-        return recipes
+        result = await self._readers[read_mode].aggregate(pipeline).to_list(length=1)
+        facets = result[0] if result else {"total": [], "visibility": [], "tags": []}
+        return {
+            "total": facets["total"][0]["count"] if facets["total"] else 0,
+            "visibility": {row["_id"]: row["count"] for row in facets["visibility"] if row["_id"]},
+            "tags": [(row["_id"], row["count"]) for row in facets["tags"]],
+        }
+
+    async def iter_by_author(self, author_id: str, batch_size: int = 500) -> AsyncIterator[RecipeInDB]:
+        """
+        All recipes of an author, newest first, read from the cursor
+        `batch_size` documents at a time so that only one batch is in memory.
+        """
+        cursor = self.collection.find(
+            {"author_id": author_id},
+            # Internal fields, not part of the recipe
+            {"search": 0, "random_key": 0, "import_hash": 0}
+        ).sort([("created_at", -1), ("_id", -1)]).batch_size(batch_size)
+        batch = []
+        async for doc in cursor:
+            batch.append(doc)
+            if len(batch) >= batch_size:
+                for recipe in self._to_recipes(batch):
+                    yield recipe
+                batch = []
+        for recipe in self._to_recipes(batch):
+            yield recipe
+
+    async def iter_public_titles(
+        self,
+        batch_size: int = 5000
+    ) -> AsyncIterator[Tuple[str, str, Optional[List[str]]]]:
+        """(id, title, tags) of every public recipe; only those fields are read."""
+        cursor = self._readers[ReadMode.PUBLIC].find(
+            {"visibility": "public"},
+            {"title": 1, "tags": 1}
+        ).batch_size(batch_size)
+        async for doc in cursor:
+            yield str(doc["_id"]), doc.get("title") or "", doc.get("tags")
+
+    async def iter_public_ingredients(
+        self,
+        batch_size: int = 5000
+    ) -> AsyncIterator[Tuple[str, str, List[str]]]:
+        """(id, title, ingredient names) of every public recipe."""
+        cursor = self._readers[ReadMode.PUBLIC].find(
+            {"visibility": "public"},
+            {"title": 1, "ingredients.name": 1}
+        ).batch_size(batch_size)
+        async for doc in cursor:
+            names = [i.get("name") for i in doc.get("ingredients") or [] if i.get("name")]
+            yield str(doc["_id"]), doc.get("title") or "", names
+
+    async def get_random(
+        self,
+        limit: int = 5,
+        fields: Optional[Set[str]] = None,
+        read_mode: ReadMode = ReadMode.PUBLIC
+    ) -> Union[List[RecipeInDB], List[RecipeSummary]]:
+        """
+        Pick `limit` distinct random public recipes. Each pick is an index seek
+        to the first random_key at or after a random point (wrapping around to
+        the start), so the cost does not grow with the collection.
+        """
+        projection = build_projection(fields) if fields else None
+
+        docs = {}
+        for _ in range(2):
+            missing = limit - len(docs)
+            picks = await asyncio.gather(*[self._seek_random(projection, read_mode) for _ in range(missing)])
+            for doc in picks:
+                if doc:
+                    docs.setdefault(doc["_id"], doc)
+            if len(docs) >= limit or not any(picks):
+                break
+
+        # Seeks collide when there are few public recipes; top up from what is
+        # left, which is cheap exactly in that case.
+        if len(docs) < limit:
+            pipeline = [
+                {"$match": {"visibility": "public", "_id": {"$nin": list(docs)}}},
+                {"$sample": {"size": limit - len(docs)}}
+            ]
+            if projection:
+                pipeline.append({"$project": projection})
+            async for doc in self._readers[read_mode].aggregate(pipeline):
+                docs.setdefault(doc["_id"], doc)
+
+        return self._to_models(list(docs.values()), fields)
+
+    async def _seek_random(self, projection: Optional[dict], read_mode: ReadMode) -> Optional[dict]:
+        point = random.random()
+        for key_filter in ({"$gte": point}, {"$lt": point}):
+            cursor = self._readers[read_mode].find(
+                {"visibility": "public", "random_key": key_filter}, projection
+            ).sort("random_key", 1).limit(1)
+            async for doc in cursor:
+                return doc
+        return None
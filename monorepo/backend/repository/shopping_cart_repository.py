@@ -1,13 +1,37 @@
 from motor.motor_asyncio import AsyncIOMotorDatabase
-from bson import ObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
 from typing import Optional, List
 from domain.shopping_cart import ShoppingCartInDB, ShoppingItem
 from datetime import datetime
 
 class ShoppingCartRepository:
+    """
+    One cart per user, enforced by the unique user_id index (see
+    core/migrations.py). Every mutation is a single upserting
+    find_one_and_update, so a missing cart is created on first use.
+    """
+
     def __init__(self, db: AsyncIOMotorDatabase):
         self.collection = db.shopping_carts
 
+    async def _upsert(self, user_id: str, update: dict) -> ShoppingCartInDB:
+        for attempt in range(2):
+            try:
+                doc = await self.collection.find_one_and_update(
+                    {"user_id": user_id},
+                    update,
+                    upsert=True,
+                    return_document=ReturnDocument.AFTER
+                )
+                doc["_id"] = str(doc["_id"])
+                return ShoppingCartInDB(**doc)
+            except DuplicateKeyError:
+                # Two first writes raced on the upsert; the loser retries as
+                # a plain update of the cart the winner inserted.
+                if attempt:
+                    raise
+
     async def get_by_user_id(self, user_id: str) -> Optional[ShoppingCartInDB]:
         doc = await self.collection.find_one({"user_id": user_id})
         if doc:
@@ -16,48 +40,50 @@ class ShoppingCartRepository:
         return None
 
     async def create(self, user_id: str) -> ShoppingCartInDB:
-        existing = await self.get_by_user_id(user_id)
-        if existing:
-            return existing
-            
-        cart = ShoppingCartInDB(user_id=user_id)
-        cart_dict = cart.model_dump(by_alias=True, exclude={"id"})
-        result = await self.collection.insert_one(cart_dict)
-        cart.id = str(result.inserted_id)
-        return cart
-
-    async def add_item(self, user_id: str, item: ShoppingItem) -> Optional[ShoppingCartInDB]:
-        result = await self.collection.update_one(
-            {"user_id": user_id},
-            {
-                "$push": {"items": item.model_dump()},
-                "$set": {"updated_at": datetime.utcnow()}
-            }
+        """Return the user's cart, creating an empty one if there is none."""
+        now = datetime.utcnow()
+        return await self._upsert(
+            user_id,
+            {"$setOnInsert": {"items": [], "created_at": now, "updated_at": now}}
         )
-        if result.modified_count > 0:
-            return await self.get_by_user_id(user_id)
-        return None
+
+    async def add_item(self, user_id: str, item: ShoppingItem) -> ShoppingCartInDB:
+        now = datetime.utcnow()
+        return await self._upsert(user_id, {
+            "$push": {"items": item.model_dump()},
+            "$set": {"updated_at": now},
+            "$setOnInsert": {"created_at": now}
+        })
+
+    async def add_items(self, user_id: str, items: List[ShoppingItem]) -> ShoppingCartInDB:
+        """Append several items in one update."""
+        now = datetime.utcnow()
+        return await self._upsert(user_id, {
+            "$push": {"items": {"$each": [item.model_dump() for item in items]}},
+            "$set": {"updated_at": now},
+            "$setOnInsert": {"created_at": now}
+        })
 
     async def remove_item(self, user_id: str, item_id: str) -> Optional[ShoppingCartInDB]:
-        result = await self.collection.update_one(
-            {"user_id": user_id},
+        """Remove an item. None if the user has no cart or no such item."""
+        # Matching on the item id keeps "not found" detectable in the same
+        # round trip; there is nothing to create when the item is missing.
+        doc = await self.collection.find_one_and_update(
+            {"user_id": user_id, "items.id": item_id},
             {
                 "$pull": {"items": {"id": item_id}},
                 "$set": {"updated_at": datetime.utcnow()}
-            }
+            },
+            return_document=ReturnDocument.AFTER
         )
-        if result.modified_count > 0:
-            return await self.get_by_user_id(user_id)
+        if doc:
+            doc["_id"] = str(doc["_id"])
+            return ShoppingCartInDB(**doc)
         return None
 
-    async def clear_cart(self, user_id: str) -> bool:
-        result = await self.collection.update_one(
-            {"user_id": user_id},
-            {
-                "$set": {
-                    "items": [],
-                    "updated_at": datetime.utcnow()
-                }
-            }
-        )
-        return result.modified_count > 0
+    async def clear_cart(self, user_id: str) -> ShoppingCartInDB:
+        now = datetime.utcnow()
+        return await self._upsert(user_id, {
+            "$set": {"items": [], "updated_at": now},
+            "$setOnInsert": {"created_at": now}
+        })
@@ -1,17 +1,50 @@
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from bson import ObjectId
+from pymongo import ReturnDocument
 from typing import Optional, List
 from domain.user import UserInDB, UserCreate, UserUpdate
+from core.invalidation import ChangeEvent, invalidation_bus
+from core.schema import DocumentSchema, created_at_from_id, write_back
+
+
+def _upgrade_user_v1(doc: dict) -> dict:
+    """
+    Users created before created_at, is_active and role were stored. Their
+    created_at used to read back as the process start time.
+    """
+    changes = {}
+    if not doc.get("created_at"):
+        changes["created_at"] = created_at_from_id(doc)
+    if "is_active" not in doc:
+        changes["is_active"] = True
+    if "role" not in doc:
+        changes["role"] = "user"
+    return changes
+
+
+USER_SCHEMA = DocumentSchema([_upgrade_user_v1])
+
+# Changing any of these revokes the user's tokens (see auth/revocation.py)
+REVOKING_FIELDS = {"is_active", "role", "hashed_password"}
+
 
 class UserRepository:
     def __init__(self, db: AsyncIOMotorDatabase):
         self.collection = db.users
 
+    def _to_users(self, docs: List[dict]) -> List[UserInDB]:
+        """Build models, upgrading outdated documents and storing that in the background."""
+        write_back(self.collection, [USER_SCHEMA.upgrade(doc) for doc in docs])
+        users = []
+        for doc in docs:
+            doc["_id"] = str(doc["_id"])
+            users.append(UserInDB(**doc))
+        return users
+
     async def get_by_email(self, email: str) -> Optional[UserInDB]:
         user_doc = await self.collection.find_one({"email": email})
         if user_doc:
-            user_doc["_id"] = str(user_doc["_id"])
-            return UserInDB(**user_doc)
+            return self._to_users([user_doc])[0]
         return None
 
     async def get_by_id(self, user_id: str) -> Optional[UserInDB]:
@@ -22,8 +55,7 @@ class UserRepository:
             
         user_doc = await self.collection.find_one({"_id": oid})
         if user_doc:
-            user_doc["_id"] = str(user_doc["_id"])
-            return UserInDB(**user_doc)
+            return self._to_users([user_doc])[0]
         return None
 
     async def create_user(self, user_data: dict) -> UserInDB:
@@ -32,12 +64,15 @@ class UserRepository:
         
         # Add created_at timestamp
         user_data["created_at"] = datetime.utcnow()
+        user_data["schema_version"] = USER_SCHEMA.version
         
         # Insert into MongoDB
         result = await self.collection.insert_one(user_data)
         
         # Convert ObjectId to string and create UserInDB object
         user_data["_id"] = str(result.inserted_id)
+        # A user re-registered under a cached email must not resolve to the old one
+        invalidation_bus.publish(ChangeEvent("users", "insert", user_data["_id"], user_data))
         return UserInDB(**user_data)
 
     async def update_user(self, user_id: str, update_data: dict) -> bool:
@@ -46,16 +81,45 @@ class UserRepository:
         except:
             return False
 
+        if REVOKING_FIELDS & update_data.keys():
+            # Tokens issued before no longer describe the user
+            user_doc = await self.collection.find_one_and_update(
+                {"_id": oid},
+                {"$set": update_data, "$inc": {"token_version": 1}},
+                projection={"email": 1, "token_version": 1},
+                return_document=ReturnDocument.AFTER
+            )
+            if user_doc is None:
+                return False
+            invalidation_bus.publish(ChangeEvent("users", "update", user_id, user_doc))
+            return True
+
         result = await self.collection.update_one(
             {"_id": oid},
             {"$set": update_data}
         )
+        if result.modified_count:
+            # Cached users (see api/deps.py) must not keep old data; the
+            # change stream tells the other workers
+            invalidation_bus.publish(ChangeEvent("users", "update", user_id))
         return result.modified_count > 0
     
-    async def get_all(self, limit: int = 100, skip: int = 0) -> List[UserInDB]:
-        users = []
-        cursor = self.collection.find().skip(skip).limit(limit)
-        async for user_doc in cursor:
-            user_doc["_id"] = str(user_doc["_id"])
-            users.append(UserInDB(**user_doc))
-        return users
+    async def replace_password_hash(self, user_id: str, old_hash: str, new_hash: str) -> bool:
+        """Store a rehash of the same password, unless the password changed meanwhile."""
+        result = await self.collection.update_one(
+            {"_id": ObjectId(user_id), "hashed_password": old_hash},
+            {"$set": {"hashed_password": new_hash}}
+        )
+        if result.modified_count:
+            invalidation_bus.publish(ChangeEvent("users", "update", user_id))
+        return result.modified_count > 0
+
+    async def get_all(self, limit: int = 100, skip: int = 0, after_id: Optional[ObjectId] = None) -> List[UserInDB]:
+        """Oldest first. With `after_id` the page starts after that user and `skip` is ignored."""
+        query = {}
+        if after_id:
+            query["_id"] = {"$gt": after_id}
+            skip = 0
+
+        cursor = self.collection.find(query).sort("_id", 1).skip(skip).limit(limit)
+        return self._to_users(await cursor.to_list(length=None))
@@ -0,0 +1,120 @@
+import asyncio
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+from datetime import datetime
+import argparse
+
+# Add parent directory to sys.path to allow importing from backend modules
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.append(str(backend_dir))
+
+from pymongo import IndexModel, ASCENDING
+from core.database import db
+from core.config import get_settings
+from core.migrations import ensure_indexes
+from domain.shopping_cart import ShoppingItem
+from repository.shopping_cart_repository import ShoppingCartRepository
+
+
+class LegacyCartFlow:
+    """The add-item endpoint as it was: update, find, then create and retry."""
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    async def _add(self, user_id: str, item: ShoppingItem):
+        result = await self.collection.update_one(
+            {"user_id": user_id},
+            {"$push": {"items": item.model_dump()}, "$set": {"updated_at": datetime.utcnow()}}
+        )
+        if result.modified_count > 0:
+            return await self.collection.find_one({"user_id": user_id})
+        return None
+
+    async def add_item(self, user_id: str, item: ShoppingItem):
+        cart = await self._add(user_id, item)
+        if not cart:
+            if not await self.collection.find_one({"user_id": user_id}):
+                now = datetime.utcnow()
+                await self.collection.insert_one({"user_id": user_id, "items": [], "created_at": now, "updated_at": now})
+            cart = await self._add(user_id, item)
+        return cart
+
+
+async def _run(add_item, users: int, items: int, concurrency: int) -> list:
+    semaphore = asyncio.Semaphore(concurrency)
+    timings = []
+
+    async def one(user_id: str, n: int):
+        async with semaphore:
+            started = time.perf_counter()
+            await add_item(user_id, ShoppingItem(id=str(n), value=f"item {n}"))
+            timings.append((time.perf_counter() - started) * 1000)
+
+    # Every user starts without a cart and all of their adds run concurrently,
+    # which is exactly when the legacy create path races.
+    user_ids = [f"bench-{uuid.uuid4().hex}" for _ in range(users)]
+    await asyncio.gather(*[one(user_id, n) for n in range(items) for user_id in user_ids])
+    return timings
+
+
+def _report(label: str, timings: list, elapsed: float, duplicates: int):
+    timings.sort()
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(
+        f"  {label:>7}: {len(timings) / elapsed:8.0f} ops/s  p50 {statistics.median(timings):6.1f} ms"
+        f"  p95 {p95:6.1f} ms  duplicate carts {duplicates}"
+    )
+
+
+async def _duplicates(collection) -> int:
+    pipeline = [
+        {"$group": {"_id": "$user_id", "count": {"$sum": 1}}},
+        {"$match": {"count": {"$gt": 1}}},
+        {"$count": "users"},
+    ]
+    rows = await collection.aggregate(pipeline).to_list(length=1)
+    return rows[0]["users"] if rows else 0
+
+
+async def benchmark(users: int, items: int, concurrency: int):
+    settings = get_settings()
+    db.connect()
+    database = db.client[f"{settings.DATABASE_NAME}_bench"]
+
+    try:
+        # The legacy flow ran against a non-unique index
+        legacy = database.shopping_carts_legacy
+        await legacy.drop()
+        await legacy.create_indexes([IndexModel([("user_id", ASCENDING)], name="shopping_carts_user")])
+        await database.shopping_carts.drop()
+        await ensure_indexes(database)
+
+        print(f"{users} new users adding {items} items each, {concurrency} requests in flight:")
+
+        started = time.perf_counter()
+        timings = await _run(LegacyCartFlow(legacy).add_item, users, items, concurrency)
+        _report("legacy", timings, time.perf_counter() - started, await _duplicates(legacy))
+
+        repo = ShoppingCartRepository(database)
+        started = time.perf_counter()
+        timings = await _run(repo.add_item, users, items, concurrency)
+        _report("upsert", timings, time.perf_counter() - started, await _duplicates(database.shopping_carts))
+    finally:
+        await database.shopping_carts_legacy.drop()
+        await database.shopping_carts.drop()
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test adding items to shopping carts: legacy flow against single upserts.")
+    parser.add_argument("--users", type=int, default=500, help="Users without a cart at the start")
+    parser.add_argument("--items", type=int, default=10, help="Items added per user")
+    parser.add_argument("--concurrency", type=int, default=100, help="Requests in flight at once")
+
+    args = parser.parse_args()
+
+    asyncio.run(benchmark(args.users, args.items, args.concurrency))
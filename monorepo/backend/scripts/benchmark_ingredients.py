@@ -0,0 +1,61 @@
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+import argparse
+
+# Add parent directory to sys.path to allow importing from backend modules
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.append(str(backend_dir))
+
+from services.ingredient_index import IngredientIndex
+
+INGREDIENTS = [
+    "vejce", "mléko", "mouka", "máslo", "cukr", "brambory", "cibule", "česnek", "mrkev", "celer",
+    "rajčata", "paprika", "kuřecí maso", "hovězí maso", "vepřové maso", "smetana", "sýr", "rýže",
+    "těstoviny", "zelí", "houby", "špek", "petržel", "citron", "jablka", "tvaroh", "droždí", "kmín",
+    "čočka", "fazole", "okurka", "cuketa", "dýně", "šunka", "klobása", "kapr", "losos", "špenát",
+]
+PANTRIES = [
+    ["vejce", "mléko", "mouka"],
+    ["brambory", "cibule", "špek", "vejce"],
+    ["kuřecí maso", "rýže", "paprika", "smetana", "cibule"],
+    ["rajčata"],
+    ["těstoviny", "sýr", "česnek", "špenát", "smetana", "citron"],
+]
+
+
+def benchmark(sizes: list, rounds: int):
+    for size in sorted(sizes):
+        recipes = [
+            (f"{i:024x}", f"Recipe {i}", random.sample(INGREDIENTS, random.randint(3, 12)))
+            for i in range(size)
+        ]
+        index = IngredientIndex()
+        started = time.perf_counter()
+        index.build(recipes)
+        build_ms = (time.perf_counter() - started) * 1000
+
+        timings = []
+        for _ in range(rounds):
+            for pantry in PANTRIES:
+                started = time.perf_counter()
+                index.match(pantry, limit=20)
+                timings.append((time.perf_counter() - started) * 1000)
+        timings.sort()
+        p95 = timings[int(len(timings) * 0.95) - 1]
+        print(
+            f"{size:>9} recipes: build {build_ms:8.0f} ms  "
+            f"match p50 {statistics.median(timings):.2f} ms  p95 {p95:.2f} ms  max {timings[-1]:.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure /recipes/by-ingredients ranking over the in-memory ingredient index.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000], help="Public recipes in the index")
+    parser.add_argument("--rounds", type=int, default=20, help="How many times to run the pantry set")
+
+    args = parser.parse_args()
+
+    benchmark(args.sizes, args.rounds)
@@ -0,0 +1,121 @@
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+import argparse
+
+# Add parent directory to sys.path to allow importing from backend modules
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.append(str(backend_dir))
+
+import httpx
+from fastapi import FastAPI, HTTPException
+from auth import security
+from auth.security import get_password_hash
+from domain.user import UserInDB
+import services.auth_service as auth_service
+from services.auth_service import AuthService
+
+PASSWORD = "benchmark-password"
+
+
+class _StaticUserRepo:
+    """One user, no database: only password hashing costs anything."""
+
+    def __init__(self):
+        self.user = UserInDB(_id="0" * 24, email="storm@example.com", hashed_password=get_password_hash(PASSWORD))
+
+    async def get_by_email(self, email):
+        return self.user.model_copy()
+
+    async def replace_password_hash(self, user_id, old_hash, new_hash):
+        return True
+
+
+async def verify_on_loop(plain_password: str, hashed_password: str):
+    """What authenticate_user did before: bcrypt on the event loop."""
+    return security.pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+def make_app() -> FastAPI:
+    app = FastAPI()
+    repo = _StaticUserRepo()
+
+    @app.post("/login")
+    async def login():
+        if not await AuthService(repo).authenticate_user("storm@example.com", PASSWORD):
+            raise HTTPException(status_code=401)
+        return {}
+
+    @app.get("/health")
+    async def health():
+        return {"status": "ok"}
+
+    return app
+
+
+async def measure(app: FastAPI, logins: int, duration: float) -> tuple:
+    """
+    Latencies (ms) of /health requests due every 10 ms while `logins`
+    clients keep logging in, and the number of logins completed.
+    """
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        stop = time.perf_counter() + duration
+        completed = [0]
+
+        async def login_client():
+            while time.perf_counter() < stop:
+                assert (await client.post("/login")).status_code == 200
+                completed[0] += 1
+
+        async def probe():
+            # Measured from when the request was due, so time spent waiting
+            # for a blocked event loop counts
+            latencies = []
+            due = time.perf_counter()
+            while due < stop:
+                await asyncio.sleep(max(0, due - time.perf_counter()))
+                await client.get("/health")
+                latencies.append((time.perf_counter() - due) * 1000)
+                due = max(due + 0.01, time.perf_counter())
+            return latencies
+
+        results = await asyncio.gather(probe(), *(login_client() for _ in range(logins)))
+        return results[0], completed[0]
+
+
+def report(label: str, latencies: list, logins: int, duration: float):
+    latencies.sort()
+    p99 = latencies[max(0, int(len(latencies) * 0.99) - 1)]
+    print(
+        f"  {label:<22} /health p50 {statistics.median(latencies):7.1f} ms  p99 {p99:7.1f} ms  "
+        f"max {latencies[-1]:7.1f} ms   logins {logins / duration:5.1f}/s"
+    )
+
+
+async def benchmark(concurrency: list, duration: float):
+    app = make_app()
+    print(f"bcrypt rounds {security.settings.BCRYPT_ROUNDS}, {security.settings.PASSWORD_HASH_WORKERS} hashing threads")
+    latencies, _ = await measure(app, 0, duration)
+    report("no logins", latencies, 0, duration)
+    for logins in concurrency:
+        print(f"{logins} concurrent login clients:")
+        original = security.verify_and_update_password
+        auth_service.verify_and_update_password = verify_on_loop
+        latencies, completed = await measure(app, logins, duration)
+        report("bcrypt on event loop", latencies, completed, duration)
+        auth_service.verify_and_update_password = original
+        latencies, completed = await measure(app, logins, duration)
+        report("bcrypt in thread pool", latencies, completed, duration)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Latency of an unrelated endpoint during a login storm, bcrypt on vs. off the event loop.")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16], help="Concurrent clients logging in")
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds per measurement")
+
+    args = parser.parse_args()
+
+    asyncio.run(benchmark(args.concurrency, args.duration))
@@ -0,0 +1,73 @@
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+import argparse
+
+# Add parent directory to sys.path to allow importing from backend modules
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.append(str(backend_dir))
+
+from core.database import db
+from core.config import get_settings
+from core.migrations import ensure_indexes
+from repository.recipe_repository import RecipeRepository
+from benchmark_search import _populate
+
+
+async def _sample(repo: RecipeRepository, limit: int):
+    # The previous implementation of RecipeRepository.get_random
+    pipeline = [{"$match": {"visibility": "public"}}, {"$sample": {"size": limit}}]
+    return await repo.collection.aggregate(pipeline).to_list(length=limit)
+
+
+async def _time(pick, rounds: int) -> list:
+    timings = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        await pick()
+        timings.append((time.perf_counter() - started) * 1000)
+    return sorted(timings)
+
+
+async def benchmark(sizes: list, rounds: int, limit: int):
+    settings = get_settings()
+    db.connect()
+    database = db.client[f"{settings.DATABASE_NAME}_bench"]
+
+    try:
+        await database.recipes.drop()
+        await ensure_indexes(database)
+        repo = RecipeRepository(database)
+
+        for size in sorted(sizes):
+            print(f"Populating {size} recipes...")
+            await _populate(database, size)
+
+            print(f"Results for {size} recipes ({rounds} calls of limit={limit}):")
+            modes = {
+                "sample": lambda: _sample(repo, limit),
+                "seek": lambda: repo.get_random(limit=limit),
+            }
+            for label, pick in modes.items():
+                timings = await _time(pick, rounds)
+                p95 = timings[int(len(timings) * 0.95) - 1]
+                print(
+                    f"  {label:>6}: p50 {statistics.median(timings):8.1f} ms"
+                    f"  p95 {p95:8.1f} ms  max {timings[-1]:8.1f} ms"
+                )
+    finally:
+        await database.recipes.drop()
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare random-key seeks against $sample for /recipes/random.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000], help="Collection sizes to benchmark")
+    parser.add_argument("--rounds", type=int, default=200, help="Calls per mode and size")
+    parser.add_argument("--limit", type=int, default=5, help="Recipes per call, as on the landing page")
+
+    args = parser.parse_args()
+
+    asyncio.run(benchmark(args.sizes, args.rounds, args.limit))
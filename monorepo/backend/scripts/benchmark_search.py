@@ -0,0 +1,108 @@
+import asyncio
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+from datetime import datetime, timedelta
+import argparse
+
+# Add parent directory to sys.path to allow importing from backend modules
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.append(str(backend_dir))
+
+from core.database import db
+from core.config import get_settings
+from core.migrations import ensure_indexes
+from repository.recipe_repository import RecipeRepository, RECIPE_SCHEMA, build_search_fields
+from domain.recipe import SearchMode
+
+WORDS = [
+    "kuřecí", "hovězí", "vepřové", "česneková", "polévka", "knedlíky", "zelí", "brambory",
+    "bramborová", "houbová", "omáčka", "svíčková", "guláš", "řízek", "salát", "rajčatová",
+    "těstoviny", "rizoto", "koláč", "buchty", "palačinky", "štrúdl", "dýňová", "čočka",
+    "fazolová", "smetanová", "pečené", "dušené", "grilované", "babiččin", "rychlý", "domácí",
+    "chocolate", "vanilla", "pasta", "curry", "lemon", "garlic", "bread", "pancakes",
+]
+TAGS = ["dezert", "polévka", "hlavní jídlo", "vegetarian", "rychlé", "pečení", "snídaně", "salát"]
+QUERIES = ["česnek", "polévky", "bramborová", "svíčková", "koláč", "chocolate", "guláš houbový", "rizoto"]
+
+
+def _fake_recipe(i: int, now: datetime) -> dict:
+    title = " ".join(random.sample(WORDS, 3))
+    doc = {
+        "title": title,
+        "description": " ".join(random.choices(WORDS, k=25)),
+        "steps": [],
+        "ingredients": [],
+        "tags": random.sample(TAGS, 2),
+        "visibility": "public" if i % 4 else "private",
+        "author_id": f"bench-author-{i % 1000}",
+        "favorite_by": [],
+        "created_at": now - timedelta(seconds=i),
+        "updated_at": now,
+        "random_key": random.random(),
+        "schema_version": RECIPE_SCHEMA.version,
+    }
+    doc["search"] = {
+        key.split(".", 1)[1]: value for key, value in build_search_fields(doc).items()
+    }
+    return doc
+
+
+async def _populate(database, size: int, batch_size: int = 5000):
+    collection = database.recipes
+    existing = await collection.estimated_document_count()
+    now = datetime.utcnow()
+    for start in range(existing, size, batch_size):
+        end = min(start + batch_size, size)
+        await collection.insert_many([_fake_recipe(i, now) for i in range(start, end)], ordered=False)
+        print(f"  inserted {end}/{size}", end="\r")
+    print()
+
+
+async def _time_mode(repo: RecipeRepository, mode: SearchMode, rounds: int) -> list:
+    timings = []
+    for _ in range(rounds):
+        for query in QUERIES:
+            started = time.perf_counter()
+            await repo.get_all(limit=20, public_only=True, search_query=query, search_mode=mode)
+            timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+async def benchmark(sizes: list, rounds: int):
+    settings = get_settings()
+    db.connect()
+    database = db.client[f"{settings.DATABASE_NAME}_bench"]
+
+    try:
+        await database.recipes.drop()
+        await ensure_indexes(database)
+        repo = RecipeRepository(database)
+
+        for size in sorted(sizes):
+            print(f"Populating {size} recipes...")
+            await _populate(database, size)
+
+            print(f"Results for {size} recipes ({rounds * len(QUERIES)} queries per mode):")
+            for mode in (SearchMode.REGEX, SearchMode.TEXT):
+                timings = sorted(await _time_mode(repo, mode, rounds))
+                p95 = timings[int(len(timings) * 0.95) - 1]
+                print(
+                    f"  {mode.value:>5}: p50 {statistics.median(timings):8.1f} ms"
+                    f"  p95 {p95:8.1f} ms  max {timings[-1]:8.1f} ms"
+                )
+    finally:
+        await database.recipes.drop()
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare text-index search against the legacy regex search.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000], help="Collection sizes to benchmark")
+    parser.add_argument("--rounds", type=int, default=5, help="How many times to run the query set per mode")
+
+    args = parser.parse_args()
+
+    asyncio.run(benchmark(args.sizes, args.rounds))
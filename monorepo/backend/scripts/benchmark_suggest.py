@@ -0,0 +1,57 @@
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+import argparse
+
+# Add parent directory to sys.path to allow importing from backend modules
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.append(str(backend_dir))
+
+from benchmark_search import WORDS, TAGS
+from services.suggest_index import SuggestIndex
+
+PREFIXES = ["p", "po", "pol", "česn", "bram", "svíčk", "gu", "chocolate", "dýňová pol", "xyz"]
+
+
+def benchmark(sizes: list, rounds: int):
+    for size in sorted(sizes):
+        recipes = [
+            (f"{i:024x}", " ".join(random.sample(WORDS, 3)), random.sample(TAGS, 2))
+            for i in range(size)
+        ]
+        index = SuggestIndex()
+        started = time.perf_counter()
+        index.build(recipes)
+        build_ms = (time.perf_counter() - started) * 1000
+
+        timings = []
+        for _ in range(rounds):
+            for prefix in PREFIXES:
+                started = time.perf_counter()
+                index.suggest(prefix)
+                timings.append((time.perf_counter() - started) * 1000)
+        timings.sort()
+        p95 = timings[int(len(timings) * 0.95) - 1]
+
+        started = time.perf_counter()
+        index.put("f" * 24, "Nová polévka", ["polévka"])
+        index.remove("f" * 24)
+        update_ms = (time.perf_counter() - started) * 1000
+
+        print(
+            f"{size:>9} recipes: build {build_ms:8.0f} ms  "
+            f"suggest p50 {statistics.median(timings):.3f} ms  p95 {p95:.3f} ms  max {timings[-1]:.3f} ms  "
+            f"put+remove {update_ms:.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure /recipes/suggest lookups against the in-memory prefix index.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000], help="Public recipes in the index")
+    parser.add_argument("--rounds", type=int, default=100, help="How many times to run the prefix set")
+
+    args = parser.parse_args()
+
+    benchmark(args.sizes, args.rounds)
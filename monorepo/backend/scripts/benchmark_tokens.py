@@ -0,0 +1,100 @@
+import asyncio
+import sys
+import time
+from pathlib import Path
+import argparse
+
+# Add parent directory to sys.path to allow importing from backend modules
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.append(str(backend_dir))
+
+import httpx
+from fastapi import Depends, FastAPI
+from jose import jwt
+from api import deps
+from auth.jwt import TokenVerifier, create_access_token, user_claims
+from core.config import get_settings
+from domain.user import UserInDB
+
+settings = get_settings()
+
+
+def jose_decode(token: str) -> dict:
+    """What get_current_user did before TokenVerifier."""
+    return jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+
+
+def make_tokens(count: int) -> list:
+    return [
+        create_access_token(user_claims(UserInDB(
+            _id=f"{i:024x}", email=f"user{i}@example.com", hashed_password=""
+        )))
+        for i in range(count)
+    ]
+
+
+def per_second(decode, tokens: list, rounds: int) -> float:
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for token in tokens:
+            decode(token)
+    return rounds * len(tokens) / (time.perf_counter() - started)
+
+
+def benchmark_decode(rounds: int, users: int):
+    tokens = make_tokens(users)
+    # Fresh verifiers so the cache starts empty
+    uncached = TokenVerifier({None: settings.SECRET_KEY}, settings.ALGORITHM, cache_size=0)
+    cached = TokenVerifier({None: settings.SECRET_KEY}, settings.ALGORITHM, cache_size=users)
+    print(f"Token verification, {users} users, one core:")
+    print(f"  jose.jwt.decode           {per_second(jose_decode, tokens, rounds):>10,.0f} tokens/s")
+    print(f"  TokenVerifier, no cache   {per_second(uncached.decode, tokens, rounds):>10,.0f} tokens/s")
+    print(f"  TokenVerifier, cached     {per_second(cached.decode, tokens, rounds):>10,.0f} tokens/s")
+
+
+async def requests_per_second(app: FastAPI, tokens: list, rounds: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        started = time.perf_counter()
+        for _ in range(rounds):
+            for token in tokens:
+                response = await client.get("/whoami", headers={"Authorization": f"Bearer {token}"})
+                assert response.status_code == 200, response.text
+        return rounds * len(tokens) / (time.perf_counter() - started)
+
+
+async def benchmark_requests(rounds: int, users: int):
+    """An authenticated endpoint that does nothing else, in stateless mode (no user lookup)."""
+    app = FastAPI()
+
+    @app.get("/whoami")
+    async def whoami(user: UserInDB = Depends(deps.get_current_active_user)):
+        return {"id": user.id}
+
+    async def no_user_repo():
+        return None
+
+    app.dependency_overrides[deps.get_user_repo] = no_user_repo
+    settings.STATELESS_TOKENS = True
+    deps.token_revocations.ready = True
+    tokens = make_tokens(users)
+
+    original = deps.decode_token
+    deps.decode_token = jose_decode
+    before = await requests_per_second(app, tokens, rounds)
+    deps.decode_token = original
+    after = await requests_per_second(app, tokens, rounds)
+    print(f"GET /whoami in-process, {users} users, one core:")
+    print(f"  jose.jwt.decode           {before:>10,.0f} requests/s")
+    print(f"  TokenVerifier, cached     {after:>10,.0f} requests/s  ({after / before:.2f}x)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure access token verification before and after TokenVerifier.")
+    parser.add_argument("--rounds", type=int, default=200, help="Times each token is verified")
+    parser.add_argument("--users", type=int, default=100, help="Distinct tokens in rotation")
+
+    args = parser.parse_args()
+
+    benchmark_decode(args.rounds, args.users)
+    asyncio.run(benchmark_requests(max(1, args.rounds // 10), args.users))
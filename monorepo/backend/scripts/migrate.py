@@ -0,0 +1,58 @@
+import asyncio
+import sys
+from pathlib import Path
+import argparse
+
+# Add parent directory to sys.path to allow importing from backend modules
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.append(str(backend_dir))
+
+from core.database import db
+from core.migrations import MIGRATIONS, check_indexes, get_applied_versions, run_migrations
+
+
+async def migrate(check_only: bool) -> int:
+    print("Connecting to MongoDB...")
+    db.connect()
+    database = db.get_db()
+
+    try:
+        if check_only:
+            applied = set(await get_applied_versions(database))
+            pending = [m for m in MIGRATIONS if m.version not in applied]
+            for m in pending:
+                print(f"Pending migration {m.version}: {m.description}")
+
+            report = await check_indexes(database)
+            has_drift = bool(pending)
+            for collection_name, drift in report.items():
+                for kind in ("missing", "changed", "obsolete", "unmanaged"):
+                    for name in drift[kind]:
+                        print(f"{collection_name}: {kind} index '{name}'")
+                has_drift = has_drift or bool(drift["missing"] or drift["changed"] or drift["obsolete"])
+
+            if not has_drift:
+                print("Database is up to date.")
+            return 1 if has_drift else 0
+
+        report = await run_migrations(database)
+        if any(drift["failed"] for drift in report.values()):
+            print("Migrations complete, but some indexes could not be built; see above.")
+            return 1
+        print("Migrations complete.")
+        return 0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Apply data migrations and build MongoDB indexes.")
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Only report pending migrations and index drift; exit with 1 if anything needs applying"
+    )
+
+    args = parser.parse_args()
+
+    sys.exit(asyncio.run(migrate(args.check)))
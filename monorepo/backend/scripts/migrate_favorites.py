@@ -0,0 +1,101 @@
+import asyncio
+import sys
+import time
+from pathlib import Path
+from datetime import datetime
+import argparse
+
+# Add parent directory to sys.path to allow importing from backend modules
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.append(str(backend_dir))
+
+from pymongo import UpdateOne
+from core.database import db
+from core.migrations import ensure_indexes
+
+
+async def migrate_batch(database, recipes: list) -> int:
+    """Move the favorite_by arrays of `recipes` into the favorites collection."""
+    now = datetime.utcnow()
+    upserts = []
+    for recipe in recipes:
+        recipe_id = str(recipe["_id"])
+        for user_id in recipe.get("favorite_by") or []:
+            upserts.append(UpdateOne(
+                {"user_id": user_id, "recipe_id": recipe_id},
+                {"$setOnInsert": {"created_at": recipe.get("created_at") or now, "active": True}},
+                upsert=True
+            ))
+    if upserts:
+        await database.favorites.bulk_write(upserts, ordered=False)
+
+    # Drop the legacy arrays only after their entries exist in favorites, so
+    # re-running after a crash never loses a favorite.
+    recipe_ids = [recipe["_id"] for recipe in recipes]
+    await database.recipes.update_many({"_id": {"$in": recipe_ids}}, {"$unset": {"favorite_by": ""}})
+
+    # Recount from the favorites collection; this also absorbs toggles that
+    # happened while the migration was running.
+    counts = {str(oid): 0 for oid in recipe_ids}
+    pipeline = [
+        {"$match": {"recipe_id": {"$in": list(counts)}, "active": True}},
+        {"$group": {"_id": "$recipe_id", "count": {"$sum": 1}}}
+    ]
+    async for row in database.favorites.aggregate(pipeline):
+        counts[row["_id"]] = row["count"]
+    await database.recipes.bulk_write([
+        UpdateOne({"_id": oid}, {"$set": {"favorite_count": counts[str(oid)]}})
+        for oid in recipe_ids
+    ], ordered=False)
+
+    return len(upserts)
+
+
+async def migrate_favorites(batch_size: int, pause: float):
+    print("Connecting to MongoDB...")
+    db.connect()
+    database = db.get_db()
+
+    try:
+        # The unique (user_id, recipe_id) index must exist before upserting
+        await ensure_indexes(database)
+
+        query = {"favorite_by": {"$exists": True}}
+        total = await database.recipes.count_documents(query)
+        print(f"Recipes with legacy favorites: {total}")
+
+        migrated_recipes = 0
+        migrated_favorites = 0
+        started = time.perf_counter()
+
+        while True:
+            # Processed recipes lose favorite_by, so always take the next batch from the top
+            cursor = database.recipes.find(query, {"favorite_by": 1, "created_at": 1}).limit(batch_size)
+            batch = await cursor.to_list(length=batch_size)
+            if not batch:
+                break
+
+            migrated_favorites += await migrate_batch(database, batch)
+            migrated_recipes += len(batch)
+            print(f"  {migrated_recipes}/{total} recipes, {migrated_favorites} favorites", end="\r")
+
+            # Leave room for live traffic between batches
+            if pause:
+                await asyncio.sleep(pause)
+
+        elapsed = time.perf_counter() - started
+        print(f"\nMigrated {migrated_favorites} favorites from {migrated_recipes} recipes in {elapsed:.1f}s.")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Move recipes.favorite_by arrays into the favorites collection. Safe to run while the app is serving and to re-run."
+    )
+    parser.add_argument("--batch-size", type=int, default=500, help="Recipes processed per batch")
+    parser.add_argument("--pause", type=float, default=0.05, help="Seconds to sleep between batches")
+
+    args = parser.parse_args()
+
+    asyncio.run(migrate_favorites(args.batch_size, args.pause))
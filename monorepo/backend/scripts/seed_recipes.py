@@ -2,6 +2,7 @@ import asyncio
 import json
 import os
 import sys
+import time
 from pathlib import Path
 from datetime import datetime
 import argparse
@@ -12,74 +13,197 @@ sys.path.append(str(backend_dir))
 
 from core.database import db
 from core.config import get_settings
+from core.migrations import ensure_indexes
+from core.streaming import iter_json_records
 from repository.user_repository import UserRepository
 from repository.recipe_repository import RecipeRepository
 from domain.recipe import RecipeInDB, Visibility, Ingredient
 
-async def seed_recipes(file_path: str, author_email: str):
+
+def build_recipe(data: dict, author_id: str) -> RecipeInDB:
+    now = datetime.utcnow()
+    return RecipeInDB(
+        title=data['title'],
+        description=data.get('description'),
+        steps=data.get('steps', []),
+        ingredients=[Ingredient(**i) for i in data.get('ingredients', [])],
+        tags=data.get('tags', []),
+        visibility=Visibility(data.get('visibility', 'private')),
+        web_url=data.get('web_url'),
+        image_url=data.get('image_url'),
+        video_url=data.get('video_url'),
+        author_id=author_id,
+        created_at=now,
+        updated_at=now
+    )
+
+
+class Checkpoint:
+    """
+    Number of input records already written, saved next to the input file.
+    Batches finish out of order, so it only advances past batches whose
+    predecessors are all done.
+    """
+
+    def __init__(self, path: str, source: str):
+        self.path = path
+        self.source = source
+        self.records = 0
+        self._finished = {}
+
+    def load(self) -> int:
+        if os.path.exists(self.path):
+            with open(self.path, 'r') as f:
+                state = json.load(f)
+            if state.get("source") == self.source:
+                self.records = state["records"]
+        return self.records
+
+    def finish(self, start: int, size: int):
+        self._finished[start] = size
+        advanced = False
+        while self.records in self._finished:
+            self.records += self._finished.pop(self.records)
+            advanced = True
+        if advanced:
+            with open(self.path, 'w') as f:
+                json.dump({"source": self.source, "records": self.records}, f)
+
+    def clear(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class Stats:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.inserted = 0
+        self.duplicates = 0
+        self.invalid = 0
+
+    def report(self, end: str = "\r"):
+        elapsed = time.perf_counter() - self.started
+        rate = self.inserted / elapsed if elapsed else 0
+        print(
+            f"  {self.inserted} inserted, {self.duplicates} duplicates, {self.invalid} invalid"
+            f" - {rate:.0f} recipes/s",
+            end=end
+        )
+
+
+async def seed_recipes(
+    file_path: str,
+    author_email: str,
+    batch_size: int,
+    concurrency: int,
+    checkpoint_path: str = None
+):
     settings = get_settings()
-    
+
     print(f"Connecting to MongoDB...")
     db.connect()
     database = db.get_db()
-    
+
     user_repo = UserRepository(database)
     recipe_repo = RecipeRepository(database)
-    
-    print(f"Looking for author with email: {author_email}")
-    author = await user_repo.get_by_email(author_email)
-    
-    if not author:
-        print(f"Error: User with email '{author_email}' not found.")
-        print("Please create the user first or provide a valid email.")
-        db.close()
-        return
 
-    print(f"Author found: {author.email} (ID: {author.id})")
-    
     try:
-        with open(file_path, 'r') as f:
-            recipes_data = json.load(f)
-    except FileNotFoundError:
-        print(f"Error: File '{file_path}' not found.")
-        db.close()
-        return
-    except json.JSONDecodeError:
-        print(f"Error: Failed to decode JSON from '{file_path}'.")
-        db.close()
-        return
+        print(f"Looking for author with email: {author_email}")
+        author = await user_repo.get_by_email(author_email)
+
+        if not author:
+            print(f"Error: User with email '{author_email}' not found.")
+            print("Please create the user first or provide a valid email.")
+            return
+
+        print(f"Author found: {author.email} (ID: {author.id})")
+
+        # Duplicate detection relies on the unique import_hash index
+        await ensure_indexes(database)
+
+        checkpoint = Checkpoint(checkpoint_path or f"{file_path}.checkpoint", os.path.abspath(file_path))
+        resume_from = checkpoint.load()
+        if resume_from:
+            print(f"Resuming after {resume_from} records (checkpoint {checkpoint.path})")
+
+        stats = Stats()
+        slots = asyncio.Semaphore(concurrency)
+        pending = set()
+        failed = []
+
+        async def write_batch(start: int, records: list):
+            try:
+                recipes = []
+                for data in records:
+                    try:
+                        recipes.append(build_recipe(data, author.id))
+                    except Exception as e:
+                        stats.invalid += 1
+                        print(f"\nSkipping invalid recipe '{data.get('title', 'Unknown')}': {e}")
+                ids = await recipe_repo.insert_many(recipes)
+                inserted = sum(1 for recipe_id in ids if recipe_id)
+                stats.inserted += inserted
+                stats.duplicates += len(ids) - inserted
+                checkpoint.finish(start, len(records))
+                stats.report()
+            except Exception as e:
+                failed.append(e)
+            finally:
+                slots.release()
 
-    count = 0
-    for data in recipes_data:
         try:
-            # Prepare recipe object
-            recipe_in_db = RecipeInDB(
-                _id="", # Will be set by repository after insertion
-                title=data['title'],
-                description=data.get('description'),
-                steps=data.get('steps', []),
-                ingredients=[Ingredient(**i) for i in data.get('ingredients', [])],
-                tags=data.get('tags', []),
-                visibility=Visibility(data.get('visibility', 'private')),
-                author_id=author.id,
-                created_at=datetime.utcnow(),
-                updated_at=datetime.utcnow()
-            )
-            
-            await recipe_repo.create(recipe_in_db)
-            print(f"Imported: {recipe_in_db.title}")
-            count += 1
-        except Exception as e:
-            print(f"Failed to import recipe '{data.get('title', 'Unknown')}': {str(e)}")
-
-    print(f"\nSuccessfully seeded {count} recipes.")
-    db.close()
+            with open(file_path, 'r') as f:
+                batch, start = [], 0
+                for index, data in enumerate(iter_json_records(f)):
+                    if index < resume_from:
+                        continue
+                    if not batch:
+                        start = index
+                    batch.append(data)
+                    if len(batch) >= batch_size:
+                        # Waits while `concurrency` batches are in flight
+                        await slots.acquire()
+                        if failed:
+                            break
+                        task = asyncio.create_task(write_batch(start, batch))
+                        pending.add(task)
+                        task.add_done_callback(pending.discard)
+                        batch = []
+                else:
+                    if batch:
+                        await slots.acquire()
+                        await write_batch(start, batch)
+        except FileNotFoundError:
+            print(f"Error: File '{file_path}' not found.")
+            return
+        except ValueError as e:
+            failed.append(e)
+            print(f"\nError: Failed to decode JSON from '{file_path}': {e}")
+        finally:
+            if pending:
+                await asyncio.gather(*pending)
+
+        stats.report(end="\n")
+        if failed:
+            print(f"Error: import stopped early: {failed[0]}")
+            print("Fix the cause and re-run the same command to resume from the last completed batch.")
+            return
+
+        checkpoint.clear()
+        print(f"\nSuccessfully seeded {stats.inserted} recipes.")
+    finally:
+        db.close()
 
 if __name__ == "__main__":
-    parser = argparse.ArgumentParser(description="Seed database with recipes from a JSON file.")
-    parser.add_argument("--file", default="data/recipes_seed.json", help="Path to the JSON seed file")
+    parser = argparse.ArgumentParser(
+        description="Seed database with recipes from a JSON array or NDJSON file. Re-running resumes and skips recipes already imported."
+    )
+    parser.add_argument("--file", default="data/recipes_seed.json", help="Path to the JSON or NDJSON seed file")
     parser.add_argument("--author", required=True, help="Email of the user who will be the author of these recipes")
-    
+    parser.add_argument("--batch-size", type=int, default=1000, help="Recipes per insert_many")
+    parser.add_argument("--concurrency", type=int, default=4, help="Batches written in parallel")
+    parser.add_argument("--checkpoint", help="Checkpoint file (default: <file>.checkpoint)")
+
     args = parser.parse_args()
-    
-    asyncio.run(seed_recipes(args.file, args.author))
+
+    asyncio.run(seed_recipes(args.file, args.author, args.batch_size, args.concurrency, args.checkpoint))
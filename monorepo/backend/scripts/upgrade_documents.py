@@ -0,0 +1,44 @@
+import asyncio
+import sys
+import time
+from pathlib import Path
+import argparse
+
+# Add parent directory to sys.path to allow importing from backend modules
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.append(str(backend_dir))
+
+from core.database import db
+from core.migrations import DOCUMENT_SCHEMAS, upgrade_documents
+
+
+async def main(batch_size: int, pause: float, check: bool):
+    print("Connecting to MongoDB...")
+    db.connect()
+    database = db.get_db()
+
+    try:
+        for collection_name, schema in DOCUMENT_SCHEMAS.items():
+            outdated = await database[collection_name].count_documents(schema.outdated_query())
+            print(f"'{collection_name}': {outdated} documents below schema version {schema.version}")
+        if check:
+            return
+
+        started = time.perf_counter()
+        upgraded = await upgrade_documents(database, batch_size, pause)
+        print(f"Upgraded {sum(upgraded.values())} documents in {time.perf_counter() - started:.1f}s.")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Upgrade recipes and users to the current schema version. Safe to run while the app is serving and to re-run."
+    )
+    parser.add_argument("--batch-size", type=int, default=500, help="Documents per bulk_write")
+    parser.add_argument("--pause", type=float, default=0, help="Seconds to sleep between batches to limit load")
+    parser.add_argument("--check", action="store_true", help="Only count outdated documents")
+
+    args = parser.parse_args()
+
+    asyncio.run(main(args.batch_size, args.pause, args.check))
@@ -1,8 +1,9 @@
 from fastapi import HTTPException, status
+from pymongo.errors import DuplicateKeyError
 from repository.user_repository import UserRepository
 from domain.user import UserCreate, UserInDB, UserResponse
-from auth.security import get_password_hash, verify_password
-from auth.jwt import create_access_token, create_refresh_token
+from auth.security import hash_password, verify_and_update_password
+from auth.jwt import create_access_token, create_refresh_token, user_claims
 
 class AuthService:
     def __init__(self, user_repo: UserRepository):
@@ -16,7 +17,7 @@ class AuthService:
                 detail="Email already registered"
             )
 
-        hashed_pw = get_password_hash(user_create.password)
+        hashed_pw = await hash_password(user_create.password)
         
         # Create user data without the id - MongoDB will generate it
         user_data = {
@@ -26,20 +27,35 @@ class AuthService:
             "is_active": user_create.is_active
         }
 
-        created_user = await self.user_repo.create_user(user_data)
+        try:
+            created_user = await self.user_repo.create_user(user_data)
+        except DuplicateKeyError:
+            # Registered concurrently after the check above; the unique email
+            # index lets only one of them in
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Email already registered"
+            )
         return UserResponse(**created_user.model_dump(by_alias=True))
 
     async def authenticate_user(self, email: str, password: str):
         user = await self.user_repo.get_by_email(email)
         if not user:
             return None
-        if not verify_password(password, user.hashed_password):
+        valid, new_hash = await verify_and_update_password(password, user.hashed_password)
+        if not valid:
             return None
+        if new_hash:
+            # Hashed with an older BCRYPT_ROUNDS; not a password change, so
+            # the user's tokens stay valid
+            await self.user_repo.replace_password_hash(user.id, user.hashed_password, new_hash)
+            user.hashed_password = new_hash
         return user
 
     def create_tokens(self, user: UserInDB):
-        access_token = create_access_token(data={"sub": user.email, "role": user.role})
-        refresh_token = create_refresh_token(data={"sub": user.email})
+        claims = user_claims(user)
+        access_token = create_access_token(data=claims)
+        refresh_token = create_refresh_token(data={"sub": user.email, "ver": user.token_version})
         return {
             "access_token": access_token,
             "refresh_token": refresh_token,
@@ -0,0 +1,192 @@
+import asyncio
+import time
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+import numpy as np
+from core.text import search_terms
+from repository.recipe_repository import RecipeRepository
+
+# Assumed to be in every kitchen; never counted as missing
+STAPLES = ["sůl", "pepř", "olej", "voda", "salt", "pepper", "oil", "water"]
+_STAPLE_TERMS = {term for word in STAPLES + ["a", "and"] for term in search_terms(word)}
+
+
+@lru_cache(maxsize=65536)
+def ingredient_key(name: str) -> str:
+    """Folded, stemmed ingredient name ("Rajčata" and "rajčat" share a key)."""
+    return " ".join(search_terms(name))
+
+
+def is_staple(key: str) -> bool:
+    return bool(key) and set(key.split(" ")) <= _STAPLE_TERMS
+
+
+class IngredientIndex:
+    """
+    Inverted index from normalized ingredient names to the public recipes
+    using them, for "what can I cook from what I have".
+
+    Every recipe gets a slot number; each ingredient key maps to a numpy
+    array of slots. A query concatenates the arrays of the keys the user has
+    and counts hits per slot with one bincount, so ranking the whole catalog
+    is a handful of vector operations. Removed recipes leave dead slots,
+    which are compacted away once they make up a quarter of the index.
+    """
+
+    def __init__(self):
+        self._reset()
+        self.ready = False
+
+    def _reset(self):
+        self._ids: List[Optional[str]] = []
+        self._titles: List[Optional[str]] = []
+        # Per slot: ingredient key -> name as written in the recipe
+        self._ingredients: List[Dict[str, str]] = []
+        self._slots: Dict[str, int] = {}
+        # Non-staple ingredients per slot; 0 marks a dead slot
+        self._totals = np.zeros(1024, dtype=np.int32)
+        self._postings: Dict[str, np.ndarray] = {}
+        # Term -> keys containing it, so "kuře" matches "kuře celé"
+        self._term_keys: Dict[str, Set[str]] = {}
+        self._dead = 0
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def build(self, recipes: Iterable[Tuple[str, str, List[str]]]):
+        """Replace the contents with (recipe_id, title, ingredient names) of all public recipes."""
+        self._reset()
+        self.put_many(recipes)
+        self.ready = True
+
+    def put(self, recipe_id: str, title: str, ingredient_names: List[str]):
+        """Add a public recipe, or replace its title and ingredients."""
+        self.put_many([(recipe_id, title, ingredient_names)])
+
+    def put_many(self, recipes: Iterable[Tuple[str, str, List[str]]]):
+        pending: Dict[str, List[int]] = {}
+        for recipe_id, title, ingredient_names in recipes:
+            self._discard(recipe_id)
+            ingredients = {}
+            for name in ingredient_names or []:
+                key = ingredient_key(name or "")
+                if key and not is_staple(key):
+                    ingredients.setdefault(key, name.strip())
+            if not ingredients:
+                # Nothing to match on
+                continue
+
+            slot = len(self._ids)
+            self._ids.append(recipe_id)
+            self._titles.append(title)
+            self._ingredients.append(ingredients)
+            self._slots[recipe_id] = slot
+            if slot >= len(self._totals):
+                self._totals = np.concatenate([self._totals, np.zeros_like(self._totals)])
+            self._totals[slot] = len(ingredients)
+            for key in ingredients:
+                pending.setdefault(key, []).append(slot)
+
+        for key, slots in pending.items():
+            new = np.array(slots, dtype=np.int32)
+            if key in self._postings:
+                self._postings[key] = np.concatenate([self._postings[key], new])
+            else:
+                self._postings[key] = new
+                for term in key.split(" "):
+                    self._term_keys.setdefault(term, set()).add(key)
+        self._maybe_compact()
+
+    def remove(self, recipe_id: str):
+        """Drop a recipe (deleted, or no longer public). Unknown ids are ignored."""
+        self._discard(recipe_id)
+        self._maybe_compact()
+
+    def _discard(self, recipe_id: str):
+        slot = self._slots.pop(recipe_id, None)
+        if slot is None:
+            return
+        self._ids[slot] = None
+        self._titles[slot] = None
+        self._ingredients[slot] = {}
+        self._totals[slot] = 0
+        self._dead += 1
+
+    def match(
+        self,
+        ingredient_names: List[str],
+        limit: int = 20,
+        max_missing: Optional[int] = None
+    ) -> List[Tuple[str, str, int, List[str]]]:
+        """
+        Recipes using at least one of `ingredient_names`, fewest missing
+        ingredients first, then most matched. Returns (recipe_id, title,
+        matched count, names of missing ingredients). Staples never count
+        as missing.
+        """
+        keys = set()
+        for name in ingredient_names:
+            terms = search_terms(name)
+            if terms:
+                keys |= set.intersection(*(self._term_keys.get(term, set()) for term in terms))
+        keys = [key for key in keys if key in self._postings]
+        if not keys:
+            return []
+
+        size = len(self._ids)
+        hits = np.bincount(np.concatenate([self._postings[key] for key in keys]), minlength=size)
+        totals = self._totals[:size]
+        missing = totals - hits
+        # Postings of dead slots still count hits; their total of 0 rules them out
+        candidates = np.flatnonzero((totals > 0) & (hits > 0))
+        if max_missing is not None:
+            candidates = candidates[missing[candidates] <= max_missing]
+        # Fewest missing, then most matched, then oldest slot; packed into one
+        # int64 so the top `limit` can be picked without sorting everything
+        score = (
+            (missing[candidates].astype(np.int64) << 48)
+            - (hits[candidates].astype(np.int64) << 32)
+            + candidates
+        )
+        if len(score) > limit:
+            top = np.argpartition(score, limit - 1)[:limit]
+            candidates, score = candidates[top], score[top]
+        order = candidates[np.argsort(score)]
+
+        have = set(keys)
+        return [
+            (
+                self._ids[slot],
+                self._titles[slot],
+                int(hits[slot]),
+                [name for key, name in self._ingredients[slot].items() if key not in have],
+            )
+            for slot in order
+        ]
+
+    def _maybe_compact(self):
+        if self._dead <= max(1000, len(self._ids) // 4):
+            return
+        live = [
+            (recipe_id, self._titles[slot], list(self._ingredients[slot].values()))
+            for slot, recipe_id in enumerate(self._ids) if recipe_id is not None
+        ]
+        self._reset()
+        self.put_many(live)
+
+
+ingredient_index = IngredientIndex()
+
+_load_lock = asyncio.Lock()
+
+
+async def load_ingredient_index(recipe_repo: RecipeRepository, index: IngredientIndex = ingredient_index):
+    """Build `index` from all public recipes. Concurrent callers wait for one load."""
+    async with _load_lock:
+        if index.ready:
+            return
+        started = time.perf_counter()
+        recipes = [recipe async for recipe in recipe_repo.iter_public_ingredients()]
+        index.build(recipes)
+        elapsed = (time.perf_counter() - started) * 1000
+        print(f"Ingredient index built from {len(index)} public recipes in {elapsed:.0f} ms")
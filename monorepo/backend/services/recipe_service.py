@@ -1,21 +1,121 @@
-from typing import List, Optional, Dict, Any
+from typing import AsyncIterator, List, Optional, Dict, Any, Set, Tuple, Union
 from datetime import datetime
 from fastapi import HTTPException, status
-from repository.recipe_repository import RecipeRepository
-from domain.recipe import RecipeCreate, RecipeUpdate, RecipeInDB, RecipeResponse, Visibility, Ingredient
+from pydantic import ValidationError
+from bson import ObjectId
+from pymongo.errors import PyMongoError
+from repository.recipe_repository import RecipeRepository, RECIPE_SCHEMA, build_filter_query
+from repository.favorite_repository import FavoriteRepository
+from domain.recipe import RecipeCreate, RecipeUpdate, RecipeInDB, RecipeResponse, RecipeSummary, Visibility, Ingredient, SearchMode, ExportFormat, RecipeFacets, TagCount, RecipeSuggestions, TitleSuggestion, IngredientMatch
 from services.scraping_service import ScrapingService
 from services.ai_service import AIService
+from services.suggest_index import suggest_index, load_suggest_index
+from services.ingredient_index import ingredient_index, load_ingredient_index
+from core.pagination import decode_cursor, next_cursor
+from core.cache import ReadThroughCache, TTLCache
+from core.config import get_settings
+from core.database import ReadMode
+from core.invalidation import ChangeEvent, invalidation_bus
+
+settings = get_settings()
+
+# Above this many documents the unfiltered facets are extrapolated from a
+# random sample instead of scanning every public recipe
+FACETS_SAMPLE_THRESHOLD = 200_000
+FACETS_SAMPLE_SIZE = 20_000
+
+# Unfiltered public facets, shared by all callers of this process
+_public_facets_cache = TTLCache(ttl=settings.FACETS_CACHE_SECONDS, maxsize=32)
+# Single recipes as RecipeResponse with is_favorite=False, shared by all
+# readers; access control and is_favorite are applied per request
+recipe_cache = ReadThroughCache(ttl=settings.RECIPE_CACHE_SECONDS, maxsize=settings.RECIPE_CACHE_SIZE)
+
+
+def merge_facets(first: dict, second: dict, tag_limit: int) -> dict:
+    """Add up two get_facets results and keep the top `tag_limit` tags."""
+    visibility = dict(first["visibility"])
+    for key, count in second["visibility"].items():
+        visibility[key] = visibility.get(key, 0) + count
+    tags = dict(first["tags"])
+    for tag, count in second["tags"]:
+        tags[tag] = tags.get(tag, 0) + count
+    return {
+        "total": first["total"] + second["total"],
+        "visibility": visibility,
+        "tags": sorted(tags.items(), key=lambda item: (-item[1], item[0]))[:tag_limit],
+        "estimated": first.get("estimated", False) or second.get("estimated", False),
+    }
+
+
+def scale_facets(facets: dict, factor: float) -> dict:
+    """Extrapolate counts taken from a sample to the whole collection."""
+    return {
+        "total": round(facets["total"] * factor),
+        "visibility": {key: round(count * factor) for key, count in facets["visibility"].items()},
+        "tags": [(tag, round(count * factor)) for tag, count in facets["tags"]],
+        "estimated": True,
+    }
+
+
+def index_recipe(recipe: RecipeInDB):
+    """Keep the in-memory suggest and ingredient indexes in step with public recipes."""
+    if recipe.visibility == Visibility.PUBLIC:
+        suggest_index.put(recipe.id, recipe.title, recipe.tags)
+        ingredient_index.put(recipe.id, recipe.title, [i.name for i in recipe.ingredients or []])
+    else:
+        unindex_recipe(recipe.id)
+
+
+def unindex_recipe(recipe_id: str):
+    suggest_index.remove(recipe_id)
+    ingredient_index.remove(recipe_id)
+
+
+# Recipe fields the in-memory indexes and the facets are built from. Other
+# updates (favorite_count on every toggle, schema upgrades of other fields)
+# leave them alone
+_INDEXED_FIELDS = ("title", "tags", "ingredients", "visibility")
+_FACET_FIELDS = ("tags", "visibility")
+
+
+def _on_recipe_change(event: ChangeEvent):
+    # Writes by other workers and scripts, delivered by the change stream
+    # listener; our own writes arrive here too, which is harmless
+    if event.touches(*_FACET_FIELDS):
+        _public_facets_cache.clear()
+    if event.operation == "reset":
+        recipe_cache.clear()
+        # Rebuilt from the database on next use
+        suggest_index.ready = False
+        ingredient_index.ready = False
+        return
+    recipe_cache.invalidate(event.document_id)
+    if not event.touches(*_INDEXED_FIELDS):
+        return
+    if event.document:
+        document = {"_id": event.document_id, **event.document}
+        # Documents written by older code are indexed in their current shape
+        RECIPE_SCHEMA.upgrade(document)
+        index_recipe(RecipeInDB(**{**document, "_id": event.document_id}))
+    else:
+        unindex_recipe(event.document_id)
+
+
+invalidation_bus.subscribe("recipes", _on_recipe_change)
+
 
 class RecipeService:
     def __init__(
         self, 
         recipe_repo: RecipeRepository,
         scraping_service: Optional[ScrapingService] = None,
-        ai_service: Optional[AIService] = None
+        ai_service: Optional[AIService] = None,
+        favorite_repo: Optional[FavoriteRepository] = None
     ):
         self.recipe_repo = recipe_repo
         self.scraping_service = scraping_service
         self.ai_service = ai_service
+        self.favorite_repo = favorite_repo
 
     async def create_recipe(self, recipe_in: RecipeCreate, author_id: str) -> RecipeResponse:
         # If should_scrape is True and web_url is provided, use the scraping flow
@@ -29,16 +129,59 @@ class RecipeService:
             author_id=author_id
         )
         created_recipe = await self.recipe_repo.create(new_recipe)
-        return self._prepare_recipe_response(created_recipe, author_id)
+        index_recipe(created_recipe)
+        return self._prepare_recipe_response(created_recipe)
 
-    def _prepare_recipe_response(self, recipe: RecipeInDB, current_user_id: Optional[str]) -> RecipeResponse:
-        response = RecipeResponse(**recipe.model_dump(by_alias=True))
-        if current_user_id and hasattr(recipe, 'favorite_by'):
-            response.is_favorite = current_user_id in recipe.favorite_by
-        return response
+    def _decode_cursor(
+        self,
+        cursor: Optional[str],
+        search_query: Optional[str] = None,
+        search_mode: SearchMode = SearchMode.TEXT
+    ):
+        if not cursor:
+            return None
+        if search_query and search_mode == SearchMode.TEXT:
+            raise HTTPException(status_code=400, detail="Cursor pagination is not supported for ranked search, use skip")
+        try:
+            item_id, created_at = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        if created_at is None:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        return item_id, created_at
 
-    async def get_recipe(self, recipe_id: str, current_user_id: Optional[str] = None) -> RecipeResponse:
+    def _prepare_recipe_response(self, recipe: RecipeInDB, is_favorite: bool = False) -> RecipeResponse:
+        return RecipeResponse(**recipe.model_dump(by_alias=True), is_favorite=is_favorite)
+
+    async def _is_favorite(self, recipe_id: str, current_user_id: Optional[str]) -> bool:
+        if not current_user_id or not self.favorite_repo:
+            return False
+        return await self.favorite_repo.is_favorite(current_user_id, recipe_id)
+
+    async def _prepare_recipe_list(
+        self,
+        recipes: Union[List[RecipeInDB], List[RecipeSummary]],
+        current_user_id: Optional[str],
+        fields: Optional[Set[str]] = None
+    ) -> Union[List[RecipeResponse], List[RecipeSummary]]:
+        favorited = set()
+        if current_user_id and self.favorite_repo and (not fields or "is_favorite" in fields):
+            # One $in query for the whole page
+            favorited = await self.favorite_repo.get_favorited_ids(current_user_id, [r.id for r in recipes])
+
+        if not fields:
+            return [self._prepare_recipe_response(r, r.id in favorited) for r in recipes]
+        if "is_favorite" in fields:
+            for summary in recipes:
+                summary.is_favorite = summary.id in favorited
+        return recipes
+
+    async def _load_recipe_response(self, recipe_id: str) -> Optional[RecipeResponse]:
         recipe = await self.recipe_repo.get_by_id(recipe_id)
+        return self._prepare_recipe_response(recipe) if recipe else None
+
+    async def get_recipe(self, recipe_id: str, current_user_id: Optional[str] = None) -> RecipeResponse:
+        recipe = await recipe_cache.get(recipe_id, lambda: self._load_recipe_response(recipe_id))
         if not recipe:
             raise HTTPException(status_code=404, detail="Recipe not found")
         
@@ -46,49 +189,66 @@ class RecipeService:
         if recipe.visibility == Visibility.PRIVATE and recipe.author_id != current_user_id:
             raise HTTPException(status_code=403, detail="Not authorized to view this recipe")
             
-        return self._prepare_recipe_response(recipe, current_user_id)
+        # The cached response is shared; each caller gets its own copy
+        return recipe.model_copy(update={"is_favorite": await self._is_favorite(recipe_id, current_user_id)})
 
-    async def update_recipe(self, recipe_id: str, update_in: RecipeUpdate, current_user_id: str) -> RecipeResponse:
-        recipe = await self.recipe_repo.get_by_id(recipe_id)
-        if not recipe:
+    async def _raise_missing_or_forbidden(self, recipe_id: str, action: str):
+        """Called after an owner-filtered write or a visibility check matched nothing."""
+        if not await self.recipe_repo.get_by_id(recipe_id):
             raise HTTPException(status_code=404, detail="Recipe not found")
-            
-        if recipe.author_id != current_user_id:
-             raise HTTPException(status_code=403, detail="Not authorized to update this recipe")
-        
+        raise HTTPException(status_code=403, detail=f"Not authorized to {action} this recipe")
+
+    async def update_recipe(self, recipe_id: str, update_in: RecipeUpdate, current_user_id: str) -> RecipeResponse:
         update_data = update_in.model_dump(exclude_unset=True)
-        if not update_data:
-            return RecipeResponse(**recipe.model_dump(by_alias=True))
-            
-        update_data["updated_at"] = datetime.utcnow()
-        await self.recipe_repo.update(recipe_id, update_data)
-        
-        updated_recipe = await self.recipe_repo.get_by_id(recipe_id)
-        return self._prepare_recipe_response(updated_recipe, current_user_id)
+        if update_data:
+            update_data["updated_at"] = datetime.utcnow()
+            # Ownership is part of the write filter: one round trip on success
+            recipe = await self.recipe_repo.update_owned(recipe_id, current_user_id, update_data)
+        else:
+            recipe = await self.recipe_repo.get_owned(recipe_id, current_user_id)
 
-    async def toggle_favorite(self, recipe_id: str, current_user_id: str) -> RecipeResponse:
-        recipe = await self.recipe_repo.get_by_id(recipe_id)
         if not recipe:
-            raise HTTPException(status_code=404, detail="Recipe not found")
-        
-        # Check if user can see it
-        if recipe.visibility == Visibility.PRIVATE and recipe.author_id != current_user_id:
-            raise HTTPException(status_code=403, detail="Not authorized to view this recipe")
+            await self._raise_missing_or_forbidden(recipe_id, "update")
+        recipe_cache.invalidate(recipe_id)
+        index_recipe(recipe)
 
-        await self.recipe_repo.toggle_favorite(recipe_id, current_user_id)
-        
-        updated_recipe = await self.recipe_repo.get_by_id(recipe_id)
-        return self._prepare_recipe_response(updated_recipe, current_user_id)
+        return self._prepare_recipe_response(recipe, await self._is_favorite(recipe_id, current_user_id))
+
+    async def toggle_favorite(self, recipe_id: str, current_user_id: str) -> RecipeResponse:
+        # One atomic flip of the favorite document, then one counter update
+        # whose filter enforces visibility: two round trips, and parallel
+        # toggles (double clicks) serialize instead of cancelling each
+        # other out.
+        if not self.favorite_repo:
+            raise RuntimeError("toggle_favorite needs a FavoriteRepository")
+        is_favorite, created = await self.favorite_repo.flip(current_user_id, recipe_id)
+        delta = 1 if is_favorite else -1
+
+        recipe = await self.recipe_repo.adjust_favorite_count(recipe_id, delta, visible_to=current_user_id)
+        if recipe:
+            # favorite_count changed
+            recipe_cache.invalidate(recipe_id)
+            return self._prepare_recipe_response(recipe, is_favorite)
+
+        # Missing or not visible to this user: undo the flip. A document the
+        # flip created is removed rather than left behind inactive; flipping
+        # back never re-creates a favorite removed meanwhile
+        if created:
+            await self.favorite_repo.delete(current_user_id, recipe_id)
+        else:
+            await self.favorite_repo.toggle(current_user_id, recipe_id, upsert=False)
+        await self._raise_missing_or_forbidden(recipe_id, "view")
 
     async def delete_recipe(self, recipe_id: str, current_user_id: str) -> bool:
-        recipe = await self.recipe_repo.get_by_id(recipe_id)
-        if not recipe:
-            raise HTTPException(status_code=404, detail="Recipe not found")
-            
-        if recipe.author_id != current_user_id:
-            raise HTTPException(status_code=403, detail="Not authorized to delete this recipe")
-            
-        return await self.recipe_repo.delete(recipe_id)
+        deleted = await self.recipe_repo.delete_owned(recipe_id, current_user_id)
+        if not deleted:
+            await self._raise_missing_or_forbidden(recipe_id, "delete")
+        recipe_cache.invalidate(recipe_id)
+        unindex_recipe(recipe_id)
+
+        if self.favorite_repo:
+            await self.favorite_repo.delete_by_recipe(recipe_id)
+        return deleted
 
     async def list_recipes(
         self, 
@@ -96,8 +256,11 @@ class RecipeService:
         skip: int = 0,
         limit: int = 100,
         search_query: Optional[str] = None,
-        tags: Optional[List[str]] = None
-    ) -> List[RecipeResponse]:
+        tags: Optional[List[str]] = None,
+        search_mode: SearchMode = SearchMode.TEXT,
+        cursor: Optional[str] = None,
+        fields: Optional[Set[str]] = None
+    ) -> Union[List[RecipeResponse], List[RecipeSummary]]:
         # Logic: 
         # 1. If searching public recipes (no user logged in), return only public.
         # 2. If user logged in, return public + their private ones.
@@ -125,42 +288,258 @@ class RecipeService:
             limit=limit, 
             public_only=True,
             search_query=search_query,
-            tags=tags
+            tags=tags,
+            search_mode=search_mode,
+            after=self._decode_cursor(cursor, search_query, search_mode),
+            fields=fields
         )
         
-        return [self._prepare_recipe_response(r, current_user_id) for r in public_recipes]
+        return await self._prepare_recipe_list(public_recipes, current_user_id, fields)
+
+    async def get_facets(
+        self,
+        current_user_id: Optional[str] = None,
+        search_query: Optional[str] = None,
+        tags: Optional[List[str]] = None,
+        tag_limit: int = 20
+    ) -> RecipeFacets:
+        """
+        Total, per-visibility and top tag counts over the recipes the caller
+        can see: public ones plus their own private ones.
+        """
+        if search_query or tags:
+            query = build_filter_query(search_query, tags)
+            if query is None:
+                return RecipeFacets(total=0)
+            if current_user_id:
+                query["$or"] = [{"visibility": Visibility.PUBLIC.value}, {"author_id": current_user_id}]
+                read_mode = ReadMode.PRIMARY
+            else:
+                query["visibility"] = Visibility.PUBLIC.value
+                read_mode = ReadMode.PUBLIC
+            facets = await self.recipe_repo.get_facets(query, tag_limit, read_mode=read_mode)
+        else:
+            facets = await self._public_facets(tag_limit)
+            if current_user_id:
+                own = await self.recipe_repo.get_facets(
+                    {"author_id": current_user_id, "visibility": Visibility.PRIVATE.value}, tag_limit
+                )
+                facets = merge_facets(facets, own, tag_limit)
+        return self._facets_response(facets)
+
+    async def _public_facets(self, tag_limit: int) -> dict:
+        facets = _public_facets_cache.get(tag_limit)
+        if facets is not None:
+            return facets
+
+        estimated_total = await self.recipe_repo.estimated_count()
+        if estimated_total > FACETS_SAMPLE_THRESHOLD:
+            # The sample spans every visibility, so scale by the share of the
+            # whole collection it covers
+            facets = await self.recipe_repo.get_facets(
+                {"visibility": Visibility.PUBLIC.value},
+                tag_limit,
+                sample_size=FACETS_SAMPLE_SIZE,
+                read_mode=ReadMode.PUBLIC
+            )
+            facets = scale_facets(facets, estimated_total / FACETS_SAMPLE_SIZE)
+        else:
+            facets = await self.recipe_repo.get_facets(
+                {"visibility": Visibility.PUBLIC.value}, tag_limit, read_mode=ReadMode.PUBLIC
+            )
+        _public_facets_cache.set(tag_limit, facets)
+        return facets
+
+    def _facets_response(self, facets: dict) -> RecipeFacets:
+        return RecipeFacets(
+            total=facets["total"],
+            visibility=facets["visibility"],
+            tags=[TagCount(tag=tag, count=count) for tag, count in facets["tags"]],
+            estimated=facets.get("estimated", False)
+        )
+
+    async def suggest(self, query: str, limit: int = 10) -> RecipeSuggestions:
+        """Public titles and tags starting with `query`, from the in-memory index."""
+        if not suggest_index.ready:
+            # Startup could not reach the database; build on first use instead
+            await load_suggest_index(self.recipe_repo)
+        titles, tags = suggest_index.suggest(query, limit)
+        return RecipeSuggestions(
+            titles=[TitleSuggestion(id=recipe_id, title=title) for recipe_id, title in titles],
+            tags=[TagCount(tag=tag, count=count) for tag, count in tags]
+        )
+
+    async def match_ingredients(
+        self,
+        ingredients: List[str],
+        limit: int = 20,
+        max_missing: Optional[int] = None
+    ) -> List[IngredientMatch]:
+        """Public recipes that can be cooked from `ingredients`, fewest missing first."""
+        if not ingredient_index.ready:
+            await load_ingredient_index(self.recipe_repo)
+        return [
+            IngredientMatch(id=recipe_id, title=title, matched=matched, missing=missing)
+            for recipe_id, title, matched, missing in ingredient_index.match(ingredients, limit, max_missing)
+        ]
 
     async def list_my_recipes(
         self,
         current_user_id: str,
         skip: int = 0,
         limit: int = 100,
-        search_query: Optional[str] = None
-    ) -> List[RecipeResponse]:
+        search_query: Optional[str] = None,
+        search_mode: SearchMode = SearchMode.TEXT,
+        cursor: Optional[str] = None,
+        fields: Optional[Set[str]] = None
+    ) -> Union[List[RecipeResponse], List[RecipeSummary]]:
         my_recipes = await self.recipe_repo.get_all(
             skip=skip,
             limit=limit,
             author_id=current_user_id,
-            search_query=search_query
+            search_query=search_query,
+            search_mode=search_mode,
+            after=self._decode_cursor(cursor, search_query, search_mode),
+            fields=fields
         )
-        return [self._prepare_recipe_response(r, current_user_id) for r in my_recipes]
+        return await self._prepare_recipe_list(my_recipes, current_user_id, fields)
+
+    async def export_my_recipes(
+        self,
+        current_user_id: str,
+        export_format: ExportFormat = ExportFormat.NDJSON,
+        chunk_size: int = 1 << 16
+    ) -> AsyncIterator[bytes]:
+        """
+        Encode the user's whole library one recipe at a time, as NDJSON (which
+        POST /recipes/bulk accepts back) or as a single JSON array. Output is
+        sent in chunks of about `chunk_size` bytes.
+        """
+        ndjson = export_format == ExportFormat.NDJSON
+        separator = b"\n" if ndjson else b",\n"
+        buffer = bytearray() if ndjson else bytearray(b"[")
+        first = True
+        async for recipe in self.recipe_repo.iter_by_author(current_user_id):
+            if not ndjson and not first:
+                buffer += separator
+            buffer += recipe.model_dump_json(by_alias=True).encode()
+            if ndjson:
+                buffer += separator
+            first = False
+            if len(buffer) >= chunk_size:
+                yield bytes(buffer)
+                buffer.clear()
+        if not ndjson:
+            buffer += b"]\n"
+        if buffer:
+            yield bytes(buffer)
 
     async def list_favorite_recipes(
         self,
         current_user_id: str,
         skip: int = 0,
-        limit: int = 100
-    ) -> List[RecipeResponse]:
-        favorite_recipes = await self.recipe_repo.get_all(
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        fields: Optional[Set[str]] = None
+    ) -> Tuple[Union[List[RecipeResponse], List[RecipeSummary]], Optional[str]]:
+        """
+        Most recently favorited first. Pages over the favorites collection, so
+        the returned next-page cursor refers to favorites, not recipes.
+        """
+        favorites = await self.favorite_repo.get_by_user(
+            current_user_id,
             skip=skip,
             limit=limit,
-            favorited_by_user_id=current_user_id
+            after=self._decode_cursor(cursor)
+        )
+        recipes = await self.recipe_repo.get_by_ids([f.recipe_id for f in favorites], fields=fields)
+
+        by_id = {r.id: r for r in recipes}
+        ordered = [by_id[f.recipe_id] for f in favorites if f.recipe_id in by_id]
+        if fields:
+            if "is_favorite" in fields:
+                for summary in ordered:
+                    summary.is_favorite = True
+        else:
+            ordered = [self._prepare_recipe_response(r, True) for r in ordered]
+        return ordered, next_cursor(favorites, limit)
+
+    async def get_random_recipes(
+        self,
+        limit: int = 5,
+        current_user_id: Optional[str] = None,
+        fields: Optional[Set[str]] = None
+    ) -> Union[List[RecipeResponse], List[RecipeSummary]]:
+        random_recipes = await self.recipe_repo.get_random(
+            limit=limit,
+            fields=fields
         )
-        return [self._prepare_recipe_response(r, current_user_id) for r in favorite_recipes]
+        return await self._prepare_recipe_list(random_recipes, current_user_id, fields)
+
+    async def bulk_create_recipes(
+        self,
+        lines: AsyncIterator[Tuple[int, Optional[bytes]]],
+        author_id: str,
+        batch_size: int = 500
+    ) -> AsyncIterator[dict]:
+        """
+        Create recipes from numbered NDJSON lines (see core.streaming.iter_ndjson_lines),
+        inserting them in batches. Yields one result per non-empty line:
+        status "created" with the new _id, "duplicate" for a recipe imported
+        before, or "error" with the validation details.
+        """
+        batch: List[Tuple[int, RecipeInDB]] = []
+        async for line_no, line in lines:
+            if line is None:
+                yield {"line": line_no, "status": "error", "detail": "Line too long"}
+                continue
+            if not line.strip():
+                continue
+            try:
+                recipe_in = RecipeCreate.model_validate_json(line)
+            except ValidationError as e:
+                detail = e.errors(include_url=False, include_context=False, include_input=False)
+                yield {"line": line_no, "status": "error", "detail": detail}
+                continue
+
+            # Scraping is per-recipe work; bulk input is taken as given
+            batch.append((line_no, RecipeInDB(
+                **recipe_in.model_dump(exclude={"should_scrape"}),
+                author_id=author_id
+            )))
+            if len(batch) >= batch_size:
+                for result in await self._insert_batch(batch):
+                    yield result
+                batch = []
 
-    async def get_random_recipes(self, limit: int = 5, current_user_id: Optional[str] = None) -> List[RecipeResponse]:
-        random_recipes = await self.recipe_repo.get_random(limit=limit)
-        return [self._prepare_recipe_response(r, current_user_id) for r in random_recipes]
+        if batch:
+            for result in await self._insert_batch(batch):
+                yield result
+
+    async def _insert_batch(self, batch: List[Tuple[int, RecipeInDB]]) -> List[dict]:
+        errors: Dict[int, str] = {}
+        try:
+            ids = await self.recipe_repo.insert_many([recipe for _, recipe in batch], errors)
+        except PyMongoError as e:
+            # Earlier batches stand and are reported; of this one, any part
+            # may have been written. Sending its lines again is safe, as
+            # recipes imported before come back as duplicates
+            detail = f"Batch not confirmed, send this recipe again: {e}"
+            return [{"line": line_no, "status": "error", "detail": detail} for line_no, _ in batch]
+        created = [
+            (recipe_id, recipe) for (_, recipe), recipe_id in zip(batch, ids)
+            if recipe_id and recipe.visibility == Visibility.PUBLIC
+        ]
+        suggest_index.put_many((recipe_id, r.title, r.tags) for recipe_id, r in created)
+        ingredient_index.put_many(
+            (recipe_id, r.title, [i.name for i in r.ingredients or []]) for recipe_id, r in created
+        )
+        return [
+            {"line": line_no, "status": "created", "_id": recipe_id} if recipe_id
+            else {"line": line_no, "status": "error", "detail": errors[i]} if i in errors
+            else {"line": line_no, "status": "duplicate"}
+            for i, ((line_no, _), recipe_id) in enumerate(zip(batch, ids))
+        ]
 
     async def create_recipe_from_url(self, url: str, author_id: str) -> RecipeResponse:
         """
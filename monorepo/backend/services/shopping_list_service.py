@@ -0,0 +1,173 @@
+import re
+import uuid
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+from fastapi import HTTPException
+from core.text import fold
+from domain.recipe import Ingredient, Visibility
+from domain.shopping_cart import ShoppingCartInDB, ShoppingItem
+from repository.recipe_repository import RecipeRepository
+from repository.shopping_cart_repository import ShoppingCartRepository
+
+# Folded unit spelling -> (base unit, factor to the base unit). Amounts are
+# merged in grams, millilitres or pieces; anything else merges only with the
+# exact same unit.
+UNITS: Dict[str, Tuple[str, float]] = {
+    "mg": ("g", 0.001),
+    "g": ("g", 1), "gr": ("g", 1), "gram": ("g", 1), "gramy": ("g", 1), "gramu": ("g", 1),
+    "dkg": ("g", 10), "dag": ("g", 10),
+    "kg": ("g", 1000), "kilo": ("g", 1000),
+    "ml": ("ml", 1), "cl": ("ml", 10), "dl": ("ml", 100), "l": ("ml", 1000), "litr": ("ml", 1000),
+    "tsp": ("ml", 5), "teaspoon": ("ml", 5), "lzicka": ("ml", 5), "lzicky": ("ml", 5), "lz": ("ml", 5),
+    "tbsp": ("ml", 15), "tablespoon": ("ml", 15), "lzice": ("ml", 15), "pl": ("ml", 15),
+    "cup": ("ml", 240), "cups": ("ml", 240), "hrnek": ("ml", 240), "hrnky": ("ml", 240), "hrnku": ("ml", 240),
+    "ks": ("ks", 1), "kus": ("ks", 1), "kusy": ("ks", 1), "kusu": ("ks", 1),
+    "pc": ("ks", 1), "pcs": ("ks", 1), "piece": ("ks", 1), "pieces": ("ks", 1),
+}
+
+# Base unit -> (larger unit, factor) used when displaying merged amounts
+_DISPLAY_UNITS = {"g": ("kg", 1000), "ml": ("l", 1000)}
+
+_FRACTIONS = {"½": " 1/2", "⅓": " 1/3", "⅔": " 2/3", "¼": " 1/4", "¾": " 3/4"}
+
+_NUMBER = r"\d+(?:[.,]\d+)?"
+_AMOUNT_RE = re.compile(
+    rf"^\s*(?:(?P<whole>\d+)\s+)?(?P<num>{_NUMBER})(?:\s*/\s*(?P<den>\d+))?"
+    rf"(?:\s*[-–]\s*(?P<upper>{_NUMBER}))?\s*(?P<rest>.*)$"
+)
+
+
+def parse_amount(amount: Optional[str]) -> Tuple[Optional[float], str]:
+    """
+    Parse "0,5", "1/2", "1 1/2", "½" or "2-3" into a number (ranges take the
+    upper bound). Returns the number, or None, and any text left after it,
+    e.g. ("200g") -> (200.0, "g").
+    """
+    if not amount:
+        return None, ""
+    for fraction, spelled in _FRACTIONS.items():
+        amount = amount.replace(fraction, spelled)
+    text = fold(amount)
+    match = _AMOUNT_RE.match(text)
+    if not match:
+        return None, text.strip()
+
+    value = float(match["num"].replace(",", "."))
+    if match["den"]:
+        if int(match["den"]) == 0:
+            return None, text.strip()
+        value /= int(match["den"])
+    if match["whole"]:
+        value += int(match["whole"])
+    if match["upper"]:
+        value = max(value, float(match["upper"].replace(",", ".")))
+    return value, match["rest"].strip()
+
+
+def normalize_unit(unit: Optional[str]) -> Tuple[Optional[str], float]:
+    """Map a unit to its base unit and conversion factor. Unknown units are kept as folded."""
+    if not unit:
+        return None, 1
+    key = fold(unit).strip().rstrip(".")
+    if key in UNITS:
+        return UNITS[key]
+    return key or None, 1
+
+
+def _normalize_name(name: str) -> str:
+    return " ".join(fold(name).split())
+
+
+def _format_amount(amount: float, unit: Optional[str]) -> Tuple[float, Optional[str]]:
+    if unit in _DISPLAY_UNITS:
+        larger, factor = _DISPLAY_UNITS[unit]
+        if amount >= factor:
+            return amount / factor, larger
+    return amount, unit
+
+
+def _format_value(name: str, amount: Optional[float], unit: Optional[str]) -> str:
+    # Same shape as items added one by one from the recipe detail page
+    if amount is None:
+        return name
+    number = f"{round(amount, 2):g}"
+    return f"{name} ({number} {unit or ''})".replace(" )", ")")
+
+
+def merge_ingredients(ingredients: Iterable[Ingredient]) -> List[ShoppingItem]:
+    """
+    Merge ingredients by name and unit, e.g. 200 g + 0.3 kg of flour becomes
+    "Flour (500 g)". Unmeasured entries ("salt, to taste") are dropped when
+    the same ingredient also appears with an amount. Order of first
+    appearance is kept.
+    """
+    totals: Dict[Tuple[str, Optional[str]], Optional[float]] = {}
+    names: Dict[str, str] = {}
+
+    for ingredient in ingredients:
+        if not ingredient.name or not ingredient.name.strip():
+            continue
+        key_name = _normalize_name(ingredient.name)
+        names.setdefault(key_name, ingredient.name.strip())
+
+        amount, rest = parse_amount(ingredient.amount)
+        base_unit, factor = normalize_unit(ingredient.unit or rest)
+        if amount is None:
+            totals.setdefault((key_name, None), None)
+            continue
+
+        key = (key_name, base_unit)
+        totals[key] = (totals.get(key) or 0) + amount * factor
+
+    measured = {name for (name, unit), amount in totals.items() if amount is not None}
+    items = []
+    for (key_name, unit), amount in totals.items():
+        if amount is None and key_name in measured:
+            continue
+        if amount is not None:
+            amount, unit = _format_amount(amount, unit)
+            amount = round(amount, 3)
+        items.append(ShoppingItem(
+            id=uuid.uuid4().hex,
+            value=_format_value(names[key_name], amount, unit),
+            name=names[key_name],
+            amount=amount,
+            unit=unit
+        ))
+    return items
+
+
+class ShoppingListService:
+    def __init__(self, recipe_repo: RecipeRepository, cart_repo: ShoppingCartRepository):
+        self.recipe_repo = recipe_repo
+        self.cart_repo = cart_repo
+
+    async def add_recipes_to_cart(self, recipe_ids: List[str], current_user_id: str) -> ShoppingCartInDB:
+        """
+        Add the merged ingredients of `recipe_ids` to the user's cart. A recipe
+        listed twice (cooked twice that week) counts twice.
+        """
+        occurrences = Counter(recipe_ids)
+        recipes = await self.recipe_repo.get_by_ids(
+            list(occurrences), fields={"ingredients", "author_id", "visibility"}
+        )
+        recipes = [
+            r for r in recipes
+            if r.visibility == Visibility.PUBLIC or r.author_id == current_user_id
+        ]
+        if len(recipes) != len(occurrences):
+            # Private recipes of other users are reported as missing, not forbidden
+            found = {r.id for r in recipes}
+            missing = [recipe_id for recipe_id in occurrences if recipe_id not in found]
+            raise HTTPException(status_code=404, detail=f"Recipes not found: {', '.join(missing)}")
+
+        # get_by_ids does not keep order; list items in the order requested
+        order = {recipe_id: i for i, recipe_id in enumerate(occurrences)}
+        recipes.sort(key=lambda r: order[r.id])
+        ingredients = [
+            ingredient
+            for recipe in recipes
+            for _ in range(occurrences[recipe.id])
+            for ingredient in recipe.ingredients or []
+        ]
+        return await self.cart_repo.add_items(current_user_id, merge_ingredients(ingredients))
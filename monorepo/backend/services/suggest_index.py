@@ -0,0 +1,175 @@
+import asyncio
+import time
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Optional, Tuple
+from core.text import tokenize
+from repository.recipe_repository import RecipeRepository
+
+# Keys are cut to this many characters; longer prefixes still match, only
+# less precisely, and memory stays bounded for long titles
+MAX_KEY_LENGTH = 40
+# A title is findable from each of its first MAX_TITLE_WORDS words
+MAX_TITLE_WORDS = 6
+# Entries examined per query, so a one-letter prefix costs the same as a long one
+MAX_SCAN = 200
+
+
+def normalize(text: str) -> str:
+    """Folded words joined by single spaces ("Česneková  polévka!" -> "cesnekova polevka")."""
+    return " ".join(tokenize(text))
+
+
+def _title_keys(title: str) -> List[Tuple[str, int]]:
+    """(key, word position) for each word a title can be found from."""
+    words = normalize(title).split(" ")
+    return [
+        (" ".join(words[i:])[:MAX_KEY_LENGTH], i)
+        for i in range(min(len(words), MAX_TITLE_WORDS))
+        if words[i]
+    ]
+
+
+class SuggestIndex:
+    """
+    In-memory prefix index over public recipe titles and tags, for
+    search-as-you-type. Keys are kept in sorted lists and looked up with
+    bisect, so a query costs O(log n) and never touches MongoDB.
+
+    Titles are indexed from the start of each word, so "pol" finds both
+    "Polévka" and "Česneková polévka". Lookups are diacritic- and
+    case-insensitive. Each worker process holds its own copy.
+    """
+
+    def __init__(self):
+        self._reset()
+        self.ready = False
+
+    def _reset(self):
+        # (key, word position, recipe_id), sorted
+        self._title_keys: List[Tuple[str, int, str]] = []
+        self._titles: Dict[str, str] = {}
+        # Folded tags, sorted; counts and display spelling by folded tag
+        self._tag_keys: List[str] = []
+        self._tag_counts: Dict[str, int] = {}
+        self._tag_names: Dict[str, str] = {}
+        self._recipe_tags: Dict[str, List[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._titles)
+
+    def build(self, recipes: Iterable[Tuple[str, str, Optional[List[str]]]]):
+        """Replace the contents with (recipe_id, title, tags) of all public recipes."""
+        self._reset()
+        for recipe_id, title, tags in recipes:
+            self._add(recipe_id, title, tags, sort=False)
+        self._title_keys.sort()
+        self._tag_keys.sort()
+        self.ready = True
+
+    def put(self, recipe_id: str, title: str, tags: Optional[List[str]] = None):
+        """Add a public recipe, or replace its title and tags."""
+        self.remove(recipe_id)
+        self._add(recipe_id, title, tags, sort=True)
+
+    def put_many(self, recipes: Iterable[Tuple[str, str, Optional[List[str]]]]):
+        """Add or replace public recipes with one re-sort instead of one insort each."""
+        # Last one wins if an id repeats
+        batch = {recipe_id: (title, tags) for recipe_id, title, tags in recipes}
+        # remove() bisects, so it must run while the lists are still sorted
+        for recipe_id in batch:
+            self.remove(recipe_id)
+        for recipe_id, (title, tags) in batch.items():
+            self._add(recipe_id, title, tags, sort=False)
+        # Timsort merges the appended run in linear time
+        self._title_keys.sort()
+        self._tag_keys.sort()
+
+    def remove(self, recipe_id: str):
+        """Drop a recipe (deleted, or no longer public). Unknown ids are ignored."""
+        title = self._titles.pop(recipe_id, None)
+        if title is None:
+            return
+        for key, position in _title_keys(title):
+            entry = (key, position, recipe_id)
+            i = bisect_left(self._title_keys, entry)
+            if i < len(self._title_keys) and self._title_keys[i] == entry:
+                del self._title_keys[i]
+        for key in self._recipe_tags.pop(recipe_id, []):
+            self._tag_counts[key] -= 1
+            if not self._tag_counts[key]:
+                del self._tag_counts[key]
+                del self._tag_names[key]
+                del self._tag_keys[bisect_left(self._tag_keys, key)]
+
+    def suggest(self, query: str, limit: int = 10) -> Tuple[List[Tuple[str, str]], List[Tuple[str, int]]]:
+        """
+        Titles as (recipe_id, title) and tags as (tag, public recipe count)
+        starting with `query`. Titles starting with it rank before titles
+        where only a later word does, then shorter first; tags by count.
+        """
+        prefix = normalize(query)[:MAX_KEY_LENGTH]
+        if not prefix:
+            return [], []
+
+        # Lowest matching word position per recipe
+        matches = {}
+        for _, position, recipe_id in self._scan(self._title_keys, (prefix,), prefix, key=lambda e: e[0]):
+            matches[recipe_id] = min(position, matches.get(recipe_id, position))
+        titles = sorted(
+            matches,
+            key=lambda recipe_id: (matches[recipe_id], len(self._titles[recipe_id]), self._titles[recipe_id])
+        )[:limit]
+
+        tags = sorted(
+            self._scan(self._tag_keys, prefix, prefix),
+            key=lambda key: (-self._tag_counts[key], key)
+        )[:limit]
+        return (
+            [(recipe_id, self._titles[recipe_id]) for recipe_id in titles],
+            [(self._tag_names[key], self._tag_counts[key]) for key in tags],
+        )
+
+    def _scan(self, entries: list, start, prefix: str, key=lambda e: e) -> list:
+        i = bisect_left(entries, start)
+        end = min(i + MAX_SCAN, len(entries))
+        found = []
+        while i < end and key(entries[i]).startswith(prefix):
+            found.append(entries[i])
+            i += 1
+        return found
+
+    def _add(self, recipe_id: str, title: str, tags: Optional[List[str]], sort: bool):
+        self._titles[recipe_id] = title
+        add = insort if sort else list.append
+        for key, position in _title_keys(title):
+            add(self._title_keys, (key, position, recipe_id))
+
+        folded_tags = []
+        for tag in tags or []:
+            key = normalize(tag)[:MAX_KEY_LENGTH]
+            if not key or key in folded_tags:
+                continue
+            folded_tags.append(key)
+            if key not in self._tag_counts:
+                self._tag_counts[key] = 0
+                self._tag_names[key] = tag
+                add(self._tag_keys, key)
+            self._tag_counts[key] += 1
+        self._recipe_tags[recipe_id] = folded_tags
+
+
+suggest_index = SuggestIndex()
+
+_load_lock = asyncio.Lock()
+
+
+async def load_suggest_index(recipe_repo: RecipeRepository, index: SuggestIndex = suggest_index):
+    """Build `index` from all public recipes. Concurrent callers wait for one load."""
+    async with _load_lock:
+        if index.ready:
+            return
+        started = time.perf_counter()
+        recipes = [recipe async for recipe in recipe_repo.iter_public_titles()]
+        index.build(recipes)
+        elapsed = (time.perf_counter() - started) * 1000
+        print(f"Suggest index built from {len(index)} public recipes in {elapsed:.0f} ms")
@@ -15,6 +15,8 @@ import asyncio
 from main import app
 from core.config import get_settings
 from core.database import Database, get_database
+from core.migrations import ensure_indexes
+from api.deps import user_cache
 
 settings = get_settings()
 
@@ -40,6 +42,11 @@ async def test_db():
     collection_names = await db.list_collection_names()
     for collection_name in collection_names:
         await db[collection_name].delete_many({})
+
+    # Build the same indexes the app creates on startup
+    await ensure_indexes(db)
+    # Users cached by an earlier test no longer exist
+    user_cache.clear()
     
     yield db
     
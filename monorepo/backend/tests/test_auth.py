@@ -1,5 +1,18 @@
+import time
 import pytest
+from fastapi import HTTPException
 from fastapi.testclient import TestClient
+from pymongo.errors import DuplicateKeyError
+from api import deps
+from jose import jwt
+from jose.exceptions import ExpiredSignatureError, JWTError
+from auth.jwt import TokenVerifier, parse_keys, user_claims
+from auth.revocation import TokenRevocations
+from auth.security import pwd_context, verify_and_update_password
+from passlib.context import CryptContext
+from services.auth_service import AuthService
+from core.invalidation import ChangeEvent
+from domain.user import UserCreate, UserInDB
 from tests.utils import create_test_user_data, create_test_admin_data
 
 
@@ -132,3 +145,159 @@ def test_register_with_invalid_email(client: TestClient, clean_db):
     response = client.post("/api/v1/auth/register", json=user_data)
     
     assert response.status_code == 422  # Validation error
+
+
+def test_token_revocations_follow_user_changes():
+    """Test tokens older than the user's token_version, or of deleted users, are revoked."""
+    revocations = TokenRevocations()
+    assert not revocations.is_revoked("u1", 0)
+
+    revocations.on_user_change(ChangeEvent("users", "update", "u1", {"email": "a@example.com", "token_version": 2}))
+    assert revocations.is_revoked("u1", 1)
+    assert not revocations.is_revoked("u1", 2)
+    # An older version arriving late does not undo a revocation
+    revocations.on_user_change(ChangeEvent("users", "update", "u1", {"token_version": 1}))
+    assert revocations.is_revoked("u1", 1)
+
+    revocations.on_user_change(ChangeEvent("users", "delete", "u2"))
+    assert revocations.is_revoked("u2", 0)
+
+
+class _NoLookups:
+    async def get_by_email(self, email):
+        raise AssertionError("stateless tokens must not look the user up")
+
+
+async def test_stateless_token_claims_stand_in_for_the_user(monkeypatch):
+    """Test access token claims are trusted in stateless mode unless revoked."""
+    revocations = TokenRevocations()
+    revocations.ready = True
+    monkeypatch.setattr(deps, "token_revocations", revocations)
+    monkeypatch.setattr(deps.settings, "STATELESS_TOKENS", True)
+    user = UserInDB(_id="u1", email="cook@example.com", hashed_password="x", role="admin", token_version=3)
+    payload = user_claims(user)
+
+    resolved = await deps._resolve_user(payload, _NoLookups())
+    assert (resolved.id, resolved.email, resolved.role, resolved.is_active) == ("u1", "cook@example.com", "admin", True)
+
+    revocations.on_user_change(ChangeEvent("users", "update", "u1", {"token_version": 4}))
+    assert await deps._resolve_user(payload, _NoLookups()) is None
+
+
+def test_token_verifier_checks_signature_algorithm_and_expiry():
+    """Test the HMAC fast path accepts what jose signs and rejects tampered, foreign or expired tokens."""
+    verifier = TokenVerifier({None: "secret"}, "HS256")
+    exp = int(time.time()) + 60
+    token = jwt.encode({"sub": "a@example.com", "exp": exp}, "secret", algorithm="HS256")
+
+    assert verifier.decode(token) == {"sub": "a@example.com", "exp": exp}
+    header, payload, signature = token.split(".")
+    forged = jwt.encode({"sub": "admin@example.com", "exp": exp}, "secret", algorithm="HS256").split(".")[1]
+    for bad in [
+        f"{header}.{forged}.{signature}",
+        jwt.encode({"sub": "a@example.com", "exp": exp}, "other", algorithm="HS256"),
+        jwt.encode({"sub": "a@example.com", "exp": exp}, "secret", algorithm="HS512"),
+        "not-a-token",
+    ]:
+        with pytest.raises(JWTError):
+            verifier.decode(bad)
+    with pytest.raises(ExpiredSignatureError):
+        verifier.decode(jwt.encode({"sub": "a@example.com", "exp": int(time.time()) - 1}, "secret", algorithm="HS256"))
+
+
+def test_token_verifier_caches_claims_until_expiry(monkeypatch):
+    """Test a token is verified once and its cached claims expire with it."""
+    verifier = TokenVerifier({None: "secret"}, "HS256")
+    token = jwt.encode({"sub": "a@example.com", "exp": int(time.time()) + 60}, "secret", algorithm="HS256")
+    verified = []
+    original = verifier._verify
+    monkeypatch.setattr(verifier, "_verify", lambda t: verified.append(t) or original(t))
+
+    verifier.decode(token)
+    verifier.decode(token)
+    assert len(verified) == 1
+
+    wall, monotonic = time.time(), time.monotonic()
+    monkeypatch.setattr(time, "time", lambda: wall + 61)
+    monkeypatch.setattr(time, "monotonic", lambda: monotonic + 61)
+    with pytest.raises(ExpiredSignatureError):
+        verifier.decode(token)
+
+
+def test_token_verifier_accepts_every_listed_key():
+    """Test rotation: tokens signed with any listed kid, or with SECRET_KEY and no kid, verify."""
+    keys = parse_keys("legacy", "k1:first, k2:second")
+    assert keys == {None: "legacy", "k1": "first", "k2": "second"}
+    verifier = TokenVerifier(keys, "HS256")
+    claims = {"sub": "a@example.com", "exp": int(time.time()) + 60}
+
+    assert verifier.decode(jwt.encode(claims, "legacy", algorithm="HS256"))["sub"] == "a@example.com"
+    assert verifier.decode(jwt.encode(claims, "second", algorithm="HS256", headers={"kid": "k2"}))
+    with pytest.raises(JWTError):
+        verifier.decode(jwt.encode(claims, "first", algorithm="HS256", headers={"kid": "k2"}))
+    with pytest.raises(JWTError):
+        verifier.decode(jwt.encode(claims, "first", algorithm="HS256", headers={"kid": "retired"}))
+
+
+class _PasswordUserRepo:
+    def __init__(self, user):
+        self.user = user
+        self.replaced = []
+
+    async def get_by_email(self, email):
+        return self.user
+
+    async def replace_password_hash(self, user_id, old_hash, new_hash):
+        self.replaced.append((user_id, old_hash, new_hash))
+        return True
+
+
+async def test_login_rehashes_password_with_stale_cost():
+    """Test a valid password hashed with another cost is rehashed, and a wrong one is refused."""
+    stale_hash = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4).hash("secret123")
+    repo = _PasswordUserRepo(UserInDB(_id="u1", email="cook@example.com", hashed_password=stale_hash))
+    auth_service = AuthService(repo)
+
+    assert await auth_service.authenticate_user("cook@example.com", "wrong") is None
+    assert repo.replaced == []
+
+    user = await auth_service.authenticate_user("cook@example.com", "secret123")
+    assert user is not None
+    [(user_id, old_hash, new_hash)] = repo.replaced
+    assert (user_id, old_hash) == ("u1", stale_hash)
+    assert user.hashed_password == new_hash
+    assert not pwd_context.needs_update(new_hash)
+    # Current hashes are left alone
+    assert await verify_and_update_password("secret123", new_hash) == (True, None)
+
+
+@pytest.mark.parametrize("kid", [["k1"], {"id": "k1"}, 1])
+@pytest.mark.parametrize("algorithm", ["HS256", "RS256"])
+def test_token_verifier_refuses_malformed_kid(kid, algorithm):
+    """Test a non-string kid is an invalid token, not a server error, on both verification paths."""
+    verifier = TokenVerifier({None: "secret", "k1": "first"}, algorithm)
+    claims = {"sub": "a@example.com", "exp": int(time.time()) + 60}
+    # With RS256 the key is looked up for jose before anything is verified
+    token = jwt.encode(claims, "first", algorithm="HS256", headers={"kid": kid})
+
+    with pytest.raises(JWTError):
+        verifier.decode(token)
+
+
+class _RacedUserRepo:
+    """The email is free when checked but taken by the time of the insert."""
+
+    async def get_by_email(self, email):
+        return None
+
+    async def create_user(self, user_data):
+        raise DuplicateKeyError("E11000 duplicate key error collection: users index: email_1")
+
+
+async def test_register_racing_duplicate_email_is_refused():
+    """Test losing a registration race gets the duplicate email error, not a 500."""
+    with pytest.raises(HTTPException) as exc_info:
+        await AuthService(_RacedUserRepo()).register_user(UserCreate(**create_test_user_data()))
+
+    assert exc_info.value.status_code == 400
+    assert exc_info.value.detail == "Email already registered"
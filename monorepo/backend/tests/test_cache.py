@@ -0,0 +1,111 @@
+import asyncio
+import time
+import pytest
+
+from core.cache import ReadThroughCache, TTLCache
+
+
+def test_entries_expire():
+    cache = TTLCache(ttl=60)
+    cache.set("fresh", 1)
+    cache.set("stale", 2, ttl=0)
+
+    assert cache.get("fresh") == 1
+    assert cache.get("stale") is None
+    assert cache.get("stale", "default") == "default"
+    assert len(cache) == 1
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = TTLCache(ttl=60, maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+def test_falsy_values_are_cached():
+    cache = TTLCache(ttl=60)
+    cache.set("empty", [])
+
+    assert cache.get("empty", "missing") == []
+    assert cache.pop("empty") == []
+    assert cache.pop("empty", "missing") == "missing"
+
+
+def test_expiry_uses_ttl_at_set_time(monkeypatch):
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now)
+    cache = TTLCache(ttl=10)
+    cache.set("key", "value")
+
+    monkeypatch.setattr(time, "monotonic", lambda: now + 9)
+    assert cache.get("key") == "value"
+    monkeypatch.setattr(time, "monotonic", lambda: now + 10)
+    assert cache.get("key") is None
+
+
+def test_pop_matching_and_stats():
+    cache = TTLCache(ttl=60, maxsize=10)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.get("missing")
+
+    assert cache.pop_matching(lambda value: value == 2) == 1
+    assert cache.stats() == {"size": 1, "maxsize": 10, "hits": 1, "misses": 1, "hit_rate": 0.5}
+
+
+async def test_read_through_cache_coalesces_concurrent_misses():
+    cache = ReadThroughCache(ttl=60)
+    loads = []
+
+    async def load():
+        loads.append(1)
+        await asyncio.sleep(0.01)
+        return {"title": "Guláš"}
+
+    results = await asyncio.gather(*(cache.get("r1", load) for _ in range(10)))
+    assert len(loads) == 1
+    assert all(result is results[0] for result in results)
+    assert await cache.get("r1", load) is results[0]
+    assert cache.stats()["coalesced"] == 9
+
+
+async def test_read_through_cache_drops_loads_overtaken_by_invalidation():
+    cache = ReadThroughCache(ttl=60)
+    release = asyncio.Event()
+
+    async def stale_load():
+        await release.wait()
+        return "before write"
+
+    waiting = asyncio.ensure_future(cache.get("r1", stale_load))
+    await asyncio.sleep(0)
+    cache.invalidate("r1")
+    release.set()
+
+    # Callers already waiting get the value, but it is not kept
+    assert await waiting == "before write"
+    async def fresh_load():
+        return "after write"
+    assert await cache.get("r1", fresh_load) == "after write"
+
+
+async def test_read_through_cache_does_not_keep_missing_values_or_errors():
+    cache = ReadThroughCache(ttl=60)
+
+    async def missing():
+        return None
+
+    async def broken():
+        raise RuntimeError("database down")
+
+    assert await cache.get("r1", missing) is None
+    with pytest.raises(RuntimeError):
+        await cache.get("r1", broken)
+    assert len(cache) == 0
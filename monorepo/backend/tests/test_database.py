@@ -0,0 +1,36 @@
+from pymongo import monitoring
+from core.database import PoolStats
+
+ADDRESS = ("localhost", 27017)
+
+
+def test_pool_stats_tracks_connections_and_checkouts():
+    """Test pool events are reflected in the snapshot."""
+    stats = PoolStats()
+
+    for connection_id in (1, 2):
+        stats.connection_created(monitoring.ConnectionCreatedEvent(ADDRESS, connection_id))
+    stats.connection_checked_out(monitoring.ConnectionCheckedOutEvent(ADDRESS, 1, 0.002))
+    stats.connection_checked_out(monitoring.ConnectionCheckedOutEvent(ADDRESS, 2, 0.010))
+    stats.connection_checked_in(monitoring.ConnectionCheckedInEvent(ADDRESS, 1))
+    stats.connection_check_out_failed(
+        monitoring.ConnectionCheckOutFailedEvent(ADDRESS, monitoring.ConnectionCheckOutFailedReason.TIMEOUT, 5.0)
+    )
+
+    snapshot = stats.snapshot()
+    assert snapshot["open"] == 2
+    assert snapshot["in_use"] == 1
+    assert snapshot["checkouts"] == 2
+    assert snapshot["avg_checkout_ms"] == 6.0
+    assert snapshot["max_checkout_ms"] == 10.0
+    assert snapshot["checkout_failures"] == {"timeout": 1}
+
+
+def test_pool_stats_reset():
+    """Test reset clears all counters."""
+    stats = PoolStats()
+    stats.connection_created(monitoring.ConnectionCreatedEvent(ADDRESS, 1))
+
+    stats.reset()
+
+    assert stats.snapshot()["open"] == 0
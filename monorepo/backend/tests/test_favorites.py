@@ -49,3 +49,165 @@ async def test_favorites_count_initially_zero(client: TestClient, clean_db):
     )
     assert response.status_code == 200
     assert len(response.json()) == 0
+
+@pytest.mark.integration
+async def test_toggle_favorite_twice_removes_it(client: TestClient, clean_db):
+    """Test toggling again removes the favorite and decrements the count."""
+    auth_data = await register_and_login(client)
+    response = client.post(
+        "/api/v1/recipes/",
+        json=create_test_recipe_data(visibility="public"),
+        headers=auth_data["headers"]
+    )
+    recipe_id = response.json()["_id"]
+
+    first = client.post(f"/api/v1/recipes/{recipe_id}/favorite", headers=auth_data["headers"])
+    assert first.json()["is_favorite"] is True
+    assert first.json()["favorite_count"] == 1
+
+    second = client.post(f"/api/v1/recipes/{recipe_id}/favorite", headers=auth_data["headers"])
+    assert second.json()["is_favorite"] is False
+    assert second.json()["favorite_count"] == 0
+
+    response = client.get("/api/v1/recipes/favorites", headers=auth_data["headers"])
+    assert response.json() == []
+
+@pytest.mark.integration
+async def test_favorites_are_per_user(client: TestClient, clean_db):
+    """Test is_favorite reflects the requesting user only."""
+    owner = await register_and_login(client)
+    other = await register_and_login(client)
+    response = client.post(
+        "/api/v1/recipes/",
+        json=create_test_recipe_data(visibility="public"),
+        headers=owner["headers"]
+    )
+    recipe_id = response.json()["_id"]
+
+    client.post(f"/api/v1/recipes/{recipe_id}/favorite", headers=other["headers"])
+
+    as_owner = client.get(f"/api/v1/recipes/{recipe_id}", headers=owner["headers"]).json()
+    as_other = client.get(f"/api/v1/recipes/{recipe_id}", headers=other["headers"]).json()
+    assert as_owner["is_favorite"] is False
+    assert as_other["is_favorite"] is True
+    assert as_owner["favorite_count"] == 1
+
+@pytest.mark.integration
+async def test_deleted_recipe_leaves_favorites(client: TestClient, clean_db):
+    """Test deleting a recipe removes it from everyone's favorites."""
+    auth_data = await register_and_login(client)
+    response = client.post(
+        "/api/v1/recipes/",
+        json=create_test_recipe_data(visibility="public"),
+        headers=auth_data["headers"]
+    )
+    recipe_id = response.json()["_id"]
+    client.post(f"/api/v1/recipes/{recipe_id}/favorite", headers=auth_data["headers"])
+
+    client.delete(f"/api/v1/recipes/{recipe_id}", headers=auth_data["headers"])
+
+    response = client.get("/api/v1/recipes/favorites", headers=auth_data["headers"])
+    assert response.json() == []
+
+@pytest.mark.integration
+@pytest.mark.parametrize("toggles", [7, 10])
+async def test_parallel_toggles_are_serialized(test_db, toggles):
+    """Test concurrent toggles by one user never cancel out or skew the count."""
+    import asyncio
+    from domain.recipe import RecipeInDB, Visibility
+    from repository.recipe_repository import RecipeRepository
+    from repository.favorite_repository import FavoriteRepository
+    from services.recipe_service import RecipeService
+
+    recipe_repo = RecipeRepository(test_db)
+    favorite_repo = FavoriteRepository(test_db)
+    service = RecipeService(recipe_repo, favorite_repo=favorite_repo)
+    recipe = await recipe_repo.create(
+        RecipeInDB(title="Race Recipe", author_id="author", visibility=Visibility.PUBLIC)
+    )
+
+    results = await asyncio.gather(*[
+        service.toggle_favorite(recipe.id, "clicker") for _ in range(toggles)
+    ])
+
+    # The flips are serialized: each state is reported by exactly as many
+    # toggles as a sequential run would produce.
+    assert sum(r.is_favorite for r in results) == (toggles + 1) // 2
+    expected = toggles % 2 == 1
+    assert await favorite_repo.is_favorite("clicker", recipe.id) is expected
+    stored = await recipe_repo.get_by_id(recipe.id)
+    assert stored.favorite_count == int(expected)
+
+@pytest.mark.integration
+async def test_toggle_private_recipe_of_other_user(client: TestClient, clean_db, test_db):
+    """Test favoriting someone else's private recipe is refused and not recorded."""
+    owner = await register_and_login(client)
+    other = await register_and_login(client)
+    response = client.post(
+        "/api/v1/recipes/",
+        json=create_test_recipe_data(visibility="private"),
+        headers=owner["headers"]
+    )
+    recipe_id = response.json()["_id"]
+
+    response = client.post(f"/api/v1/recipes/{recipe_id}/favorite", headers=other["headers"])
+    assert response.status_code == 403
+
+    response = client.get("/api/v1/recipes/favorites", headers=other["headers"])
+    assert response.json() == []
+    assert await test_db.favorites.count_documents({}) == 0
+
+
+@pytest.mark.integration
+async def test_toggle_missing_recipe_writes_nothing(client: TestClient, clean_db, test_db):
+    """Test favoriting a well-formed but unknown id is a 404 without a favorites document."""
+    auth_data = await register_and_login(client)
+
+    response = client.post(f"/api/v1/recipes/{'0' * 24}/favorite", headers=auth_data["headers"])
+
+    assert response.status_code == 404
+    assert await test_db.favorites.count_documents({}) == 0
+
+
+class _MissingRecipeRepo:
+    """Matches nothing: missing, private to someone else, or deleted meanwhile."""
+
+    async def adjust_favorite_count(self, recipe_id, delta, visible_to=None):
+        return None
+
+    async def get_by_id(self, recipe_id):
+        return None
+
+
+class _RecordingFavoriteRepo:
+    def __init__(self, created):
+        self.created = created
+        self.calls = []
+
+    async def flip(self, user_id, recipe_id, upsert=True):
+        self.calls.append(("flip", upsert))
+        return True, self.created
+
+    async def toggle(self, user_id, recipe_id, upsert=True):
+        self.calls.append(("toggle", upsert))
+        return False
+
+    async def delete(self, user_id, recipe_id):
+        self.calls.append(("delete",))
+        return True
+
+
+@pytest.mark.parametrize("created, undo", [(True, ("delete",)), (False, ("toggle", False))])
+async def test_toggle_of_missing_recipe_is_undone_without_upsert(created, undo):
+    """Test a refused toggle deletes the favorite it created, or flips an existing one back without upserting."""
+    from fastapi import HTTPException
+    from services.recipe_service import RecipeService
+
+    favorite_repo = _RecordingFavoriteRepo(created)
+    service = RecipeService(_MissingRecipeRepo(), favorite_repo=favorite_repo)
+
+    with pytest.raises(HTTPException) as error:
+        await service.toggle_favorite("0" * 24, "clicker")
+
+    assert error.value.status_code == 404
+    assert favorite_repo.calls == [("flip", True), undo]
@@ -0,0 +1,59 @@
+from services.ingredient_index import IngredientIndex, ingredient_key, is_staple
+
+
+def _index():
+    index = IngredientIndex()
+    index.build([
+        ("1", "Omeleta", ["Vejce", "Mléko", "Sůl"]),
+        ("2", "Palačinky", ["mouka", "vejce", "mléko", "cukr"]),
+        ("3", "Rajčatový salát", ["Rajčata", "cibule", "olej"]),
+    ])
+    return index
+
+
+def test_ingredient_key_normalizes_case_diacritics_and_inflection():
+    """Test spelling variants of one ingredient share a key and staples are recognized."""
+    assert ingredient_key("Rajčata") == ingredient_key("rajčat")
+    assert ingredient_key("MLÉKO") == ingredient_key("mleko")
+    assert is_staple(ingredient_key("Sůl a pepř"))
+    assert not is_staple(ingredient_key("olivy"))
+
+
+def test_match_ranks_by_missing_then_matched():
+    """Test complete recipes come first and missing ingredients are listed."""
+    assert _index().match(["vejce", "mléko"]) == [
+        ("1", "Omeleta", 2, []),
+        ("2", "Palačinky", 2, ["mouka", "cukr"]),
+    ]
+
+
+def test_match_max_missing_and_staples():
+    """Test staples never count as missing and max_missing filters the rest."""
+    index = _index()
+
+    assert index.match(["rajče", "cibule"], max_missing=0) == [("3", "Rajčatový salát", 2, [])]
+    assert index.match(["vejce"], max_missing=1) == [("1", "Omeleta", 1, ["Mléko"])]
+    assert index.match(["kapr"]) == []
+
+
+def test_put_and_remove():
+    """Test updates replace a recipe's ingredients and removed recipes stop matching."""
+    index = _index()
+    index.put("2", "Palačinky", ["vejce"])
+    index.remove("1")
+    index.remove("unknown")
+
+    assert index.match(["vejce", "mléko"]) == [("2", "Palačinky", 1, [])]
+    assert len(index) == 2
+
+
+def test_compaction_keeps_live_recipes():
+    """Test dead slots are compacted away without losing recipes."""
+    index = IngredientIndex()
+    index.build([(str(n), f"Recipe {n}", [f"ingredient {n % 7}", "vejce"]) for n in range(3000)])
+    for n in range(0, 3000, 2):
+        index.remove(str(n))
+
+    matches = index.match(["vejce"], limit=5000)
+    assert len(index) == 1500
+    assert sorted(int(recipe_id) for recipe_id, *_ in matches) == list(range(1, 3000, 2))
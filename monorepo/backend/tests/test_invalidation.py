@@ -0,0 +1,239 @@
+import asyncio
+import os
+import pytest
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.errors import ConnectionFailure
+from core.invalidation import ChangeEvent, ChangeStreamListener, InvalidationBus
+
+# Change streams need a replica set, e.g. the "replica-set" profile in
+# docker-compose.yaml: mongodb://localhost:27018,localhost:27019/?replicaSet=rs0
+REPLICA_SET_URL = os.getenv("MONGO_REPLICA_SET_URL")
+
+
+def test_bus_delivers_to_collection_subscribers():
+    """Test events reach only the subscribers of their collection, even if one fails."""
+    bus = InvalidationBus()
+    seen = []
+
+    def broken(event):
+        raise RuntimeError("boom")
+
+    bus.subscribe("recipes", broken)
+    bus.subscribe("recipes", seen.append)
+    bus.subscribe("users", lambda event: seen.append("user"))
+
+    bus.publish(ChangeEvent("recipes", "delete", "1"))
+    bus.reset("recipes")
+
+    assert seen == [ChangeEvent("recipes", "delete", "1"), ChangeEvent("recipes", "reset")]
+    assert bus.collections == ["recipes", "users"]
+
+
+def test_recipe_changes_update_in_memory_indexes():
+    """Test writes from other processes reach the suggest and ingredient indexes."""
+    from services.recipe_service import _on_recipe_change
+    from services.suggest_index import suggest_index
+    from services.ingredient_index import ingredient_index
+
+    suggest_index.build([])
+    ingredient_index.build([])
+    document = {
+        "title": "Bramboráky", "author_id": "a", "visibility": "public",
+        "ingredients": [{"name": "brambory", "amount": "1"}],
+    }
+
+    _on_recipe_change(ChangeEvent("recipes", "insert", "r1", document))
+    assert suggest_index.suggest("bram")[0] == [("r1", "Bramboráky")]
+    assert ingredient_index.match(["brambory"])[0][0] == "r1"
+
+    _on_recipe_change(ChangeEvent("recipes", "update", "r1", {**document, "visibility": "private"}))
+    assert suggest_index.suggest("bram") == ([], [])
+
+    _on_recipe_change(ChangeEvent("recipes", "insert", "r1", document))
+    _on_recipe_change(ChangeEvent("recipes", "delete", "r1"))
+    assert ingredient_index.match(["brambory"]) == []
+
+    _on_recipe_change(ChangeEvent("recipes", "reset"))
+    assert not suggest_index.ready and not ingredient_index.ready
+
+
+def test_recipe_updates_of_other_fields_leave_indexes_and_facets_alone():
+    """Test a favorite_count update neither reindexes the recipe nor empties the facets cache."""
+    from services.recipe_service import _on_recipe_change, _public_facets_cache
+    from services.suggest_index import suggest_index
+
+    suggest_index.build([])
+    document = {"title": "Bramboráky", "author_id": "a", "visibility": "public", "tags": ["Oběd"]}
+    _on_recipe_change(ChangeEvent("recipes", "insert", "r1", document))
+    _public_facets_cache.set(20, "facets")
+
+    # Only what the update says changed counts, not the looked-up document
+    renamed = {**document, "title": "Placky", "favorite_count": 3}
+    _on_recipe_change(ChangeEvent("recipes", "update", "r1", renamed, ["favorite_count"], []))
+    assert suggest_index.suggest("bram")[0] == [("r1", "Bramboráky")]
+    assert _public_facets_cache.get(20) == "facets"
+
+    _on_recipe_change(ChangeEvent("recipes", "update", "r1", renamed, ["title"], []))
+    assert suggest_index.suggest("plac")[0] == [("r1", "Placky")]
+    assert _public_facets_cache.get(20) == "facets"
+
+    _on_recipe_change(ChangeEvent("recipes", "update", "r1", {**renamed, "tags": []}, [], ["tags"]))
+    assert suggest_index.suggest("obe") == ([], [])
+    assert _public_facets_cache.get(20) is None
+
+
+def test_change_event_touches():
+    """Test only updates with known fields can rule a field out."""
+    assert ChangeEvent("recipes", "update", "r1", updated_fields=["ingredients.0.name"], removed_fields=[]).touches("ingredients")
+    assert not ChangeEvent("recipes", "update", "r1", updated_fields=["favorite_count"], removed_fields=[]).touches("title")
+    assert ChangeEvent("recipes", "update", "r1").touches("title")
+    assert ChangeEvent("recipes", "replace", "r1", updated_fields=[]).touches("title")
+    assert ChangeEvent("recipes", "reset").touches("title")
+
+
+class _FakeStream:
+    def __init__(self, changes):
+        self._changes = list(changes)
+        self.resume_token = None
+        self.alive = True
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def try_next(self):
+        if not self._changes:
+            self.alive = False
+            return None
+        change = self._changes.pop(0)
+        self.resume_token = {"_data": change.pop("token")}
+        return change
+
+
+class _FakeDatabase:
+    def __init__(self, changes):
+        self.stream = _FakeStream(changes)
+        self.watch_options = None
+
+    def watch(self, pipeline, **options):
+        self.watch_options = options
+        return self.stream
+
+
+async def test_listener_translates_changes():
+    """Test document changes are published, drops become resets and the token is kept."""
+    bus = InvalidationBus()
+    events = []
+    bus.subscribe("recipes", events.append)
+    database = _FakeDatabase([
+        {"token": "1", "operationType": "update", "ns": {"coll": "recipes"},
+         "documentKey": {"_id": "r1"}, "fullDocument": {"title": "New"},
+         "updateDescription": {"updatedFields": {"title": "New"}, "removedFields": ["tags"],
+                               "truncatedArrays": [{"field": "ingredients", "newSize": 1}]}},
+        {"token": "2", "operationType": "delete", "ns": {"coll": "recipes"}, "documentKey": {"_id": "r2"}},
+        {"token": "3", "operationType": "drop", "ns": {"coll": "recipes"}},
+    ])
+    listener = ChangeStreamListener(database, bus)
+    listener._resume_token = {"_data": "0"}
+
+    await listener._tail()
+
+    assert database.watch_options["resume_after"] == {"_data": "0"}
+    assert events == [
+        ChangeEvent("recipes", "update", "r1", {"title": "New"}, ["title", "ingredients"], ["tags"]),
+        ChangeEvent("recipes", "delete", "r2"),
+        ChangeEvent("recipes", "reset"),
+    ]
+    assert listener._resume_token == {"_data": "3"}
+
+
+async def test_listener_restarts_after_drop_database():
+    """Test a dropped database resets every subscribed collection and forgets the token."""
+    bus = InvalidationBus()
+    events = []
+    bus.subscribe("recipes", events.append)
+    bus.subscribe("users", events.append)
+    database = _FakeDatabase([{"token": "1", "operationType": "dropDatabase", "ns": {}}])
+    listener = ChangeStreamListener(database, bus)
+    listener._resume_token = {"_data": "0"}
+
+    await listener._tail()
+
+    assert events == [ChangeEvent("recipes", "reset"), ChangeEvent("users", "reset")]
+    assert listener._resume_token is None
+
+
+@pytest.mark.integration
+@pytest.mark.skipif(not REPLICA_SET_URL, reason="MONGO_REPLICA_SET_URL not set")
+async def test_listener_publishes_writes():
+    """Test a write made through another client is published."""
+    client = AsyncIOMotorClient(REPLICA_SET_URL)
+    db = client["recipe_app_test_changes"]
+    bus = InvalidationBus()
+    events = []
+    bus.subscribe("recipes", events.append)
+    listener = ChangeStreamListener(db, bus, max_await_ms=100)
+    try:
+        assert await listener.start()
+
+        writer = AsyncIOMotorClient(REPLICA_SET_URL)["recipe_app_test_changes"]
+        result = await writer.recipes.insert_one({"title": "From elsewhere"})
+        await writer.users.insert_one({"email": "ignored@example.com"})
+        for _ in range(50):
+            if events:
+                break
+            await asyncio.sleep(0.1)
+
+        assert events[0].operation == "insert"
+        assert events[0].document_id == str(result.inserted_id)
+        assert events[0].document["title"] == "From elsewhere"
+        assert all(event.collection == "recipes" for event in events)
+    finally:
+        await listener.stop()
+        await client.drop_database("recipe_app_test_changes")
+        client.close()
+
+
+class _DroppingStream(_FakeStream):
+    async def try_next(self):
+        if not self._changes:
+            raise ConnectionFailure("connection reset")
+        return await super().try_next()
+
+
+class _DroppingDatabase:
+    """Its first stream delivers `change`, then loses the connection; run() is stopped at the next watch()."""
+
+    def __init__(self, change):
+        self.change = change
+        self.watch_options = []
+
+    def watch(self, pipeline, **options):
+        self.watch_options.append(options)
+        if len(self.watch_options) > 1:
+            raise asyncio.CancelledError
+        return _DroppingStream([self.change])
+
+
+async def test_listener_resumes_from_its_own_token_after_a_dropped_connection():
+    """Test two workers each start at their own time and resume from their own last token."""
+    bus = InvalidationBus()
+    bus.subscribe("recipes", lambda event: None)
+    databases = []
+    for started, token in (("first", "5"), ("second", "9")):
+        database = _DroppingDatabase(
+            {"token": token, "operationType": "delete", "ns": {"coll": "recipes"}, "documentKey": {"_id": "r1"}}
+        )
+        listener = ChangeStreamListener(database, bus, retry_delay=0)
+        listener._start_at = started
+        with pytest.raises(asyncio.CancelledError):
+            await listener.run()
+        databases.append(database)
+
+    first, second = databases
+    assert first.watch_options[0]["start_at_operation_time"] == "first"
+    assert first.watch_options[1]["resume_after"] == {"_data": "5"}
+    assert second.watch_options[0]["start_at_operation_time"] == "second"
+    assert second.watch_options[1]["resume_after"] == {"_data": "9"}
@@ -0,0 +1,207 @@
+import pytest
+from pymongo import IndexModel, ASCENDING, DESCENDING, TEXT
+from pymongo.errors import DuplicateKeyError, OperationFailure
+from core import migrations
+from core.migrations import INDEXES, diff_indexes, ensure_indexes, check_indexes
+
+
+def test_diff_indexes_reports_missing_changed_and_unmanaged():
+    """Test drift detection against index_information() output."""
+    declared = [
+        IndexModel([("email", ASCENDING)], name="users_email", unique=True),
+        IndexModel([("author_id", ASCENDING), ("created_at", DESCENDING)], name="by_author"),
+        IndexModel([("tags", ASCENDING)], name="by_tags"),
+    ]
+    existing = {
+        "_id_": {"key": [("_id", 1)], "v": 2},
+        # Same keys, but not unique
+        "users_email": {"key": [("email", 1)], "v": 2},
+        "by_author": {"key": [("author_id", 1), ("created_at", -1)], "v": 2},
+        "legacy_title": {"key": [("title", 1)], "v": 2},
+    }
+
+    drift = diff_indexes(declared, existing)
+
+    assert drift["missing"] == ["by_tags"]
+    assert drift["changed"] == ["users_email"]
+    assert drift["unmanaged"] == ["legacy_title"]
+
+
+def test_diff_indexes_no_drift():
+    """Test an up to date collection reports no drift."""
+    declared = [IndexModel([("user_id", ASCENDING)], name="carts_user")]
+    existing = {
+        "_id_": {"key": [("_id", 1)], "v": 2},
+        "carts_user": {"key": [("user_id", 1)], "v": 2},
+    }
+
+    assert diff_indexes(declared, existing) == {"missing": [], "changed": [], "obsolete": [], "unmanaged": []}
+
+
+def test_diff_indexes_reports_obsolete_separately():
+    """Test indexes listed as obsolete are not reported as unmanaged."""
+    existing = {
+        "_id_": {"key": [("_id", 1)], "v": 2},
+        "old_favorites": {"key": [("favorite_by", 1)], "v": 2},
+    }
+
+    drift = diff_indexes([], existing, obsolete=["old_favorites", "never_built"])
+
+    assert drift["obsolete"] == ["old_favorites"]
+    assert drift["unmanaged"] == []
+
+
+def test_diff_indexes_text_index_compares_weights():
+    """Test text indexes are matched by their weighted fields, not _fts keys."""
+    declared = [
+        IndexModel(
+            [("search.title", TEXT), ("search.tags", TEXT)],
+            name="recipes_search",
+            weights={"search.title": 10, "search.tags": 5},
+            default_language="none",
+        )
+    ]
+    existing = {
+        "recipes_search": {
+            "key": [("_fts", "text"), ("_ftsx", 1)],
+            "weights": {"search.tags": 5, "search.title": 10},
+            "default_language": "none",
+            "language_override": "language",
+            "textIndexVersion": 3,
+        }
+    }
+
+    assert diff_indexes(declared, existing)["changed"] == []
+
+    existing["recipes_search"]["weights"] = {"search.tags": 1, "search.title": 1}
+    assert diff_indexes(declared, existing)["changed"] == ["recipes_search"]
+
+
+def test_diff_indexes_drops_leftover_rebuild_copies():
+    """Test the temporary copy of an interrupted rebuild is obsolete, not unmanaged."""
+    declared = [IndexModel([("user_id", ASCENDING)], name="carts_user")]
+    existing = {
+        "carts_user": {"key": [("user_id", 1)], "v": 2},
+        "carts_user_rebuild": {"key": [("user_id", 1)], "v": 2},
+    }
+
+    drift = diff_indexes(declared, existing)
+
+    assert drift["obsolete"] == ["carts_user_rebuild"]
+    assert drift["unmanaged"] == []
+
+
+class _FakeIndexedCollection:
+    """Keeps index specs by name; builds of the names in `refuse` fail like the server would."""
+
+    def __init__(self, name, existing=None, refuse=None):
+        self.name = name
+        self.indexes = dict(existing or {})
+        self.refuse = refuse or {}
+
+    async def index_information(self):
+        return dict(self.indexes)
+
+    async def create_indexes(self, models):
+        for model in models:
+            spec = dict(model.document)
+            name = spec.pop("name")
+            if name in self.refuse:
+                raise self.refuse[name]
+            if name in self.indexes:
+                raise OperationFailure(f"An index named {name} already exists", 86)
+            spec["key"] = list(spec["key"].items())
+            if spec in self.indexes.values():
+                raise OperationFailure("Index already exists with a different name", 85)
+            self.indexes[name] = spec
+
+    async def drop_index(self, name):
+        del self.indexes[name]
+
+
+class _FakeIndexedDatabase(dict):
+    def __missing__(self, name):
+        self[name] = _FakeIndexedCollection(name)
+        return self[name]
+
+
+async def test_ensure_indexes_carries_on_past_a_failed_build(monkeypatch):
+    """Test a unique index over duplicates fails alone; the other collections still get theirs."""
+    monkeypatch.setattr(migrations, "INDEXES", {
+        "users": [
+            IndexModel([("email", ASCENDING)], name="users_email", unique=True),
+            IndexModel([("role", ASCENDING)], name="users_role"),
+        ],
+        "recipes": [IndexModel([("search.title", TEXT)], name="recipes_search")],
+    })
+    database = _FakeIndexedDatabase()
+    database["users"] = _FakeIndexedCollection(
+        "users", refuse={"users_email": DuplicateKeyError("E11000 duplicate key error")}
+    )
+
+    report = await ensure_indexes(database)
+
+    assert report["users"]["failed"] == ["users_email"]
+    assert report["recipes"]["failed"] == []
+    assert set(database["users"].indexes) == {"users_role"}
+    assert set(database["recipes"].indexes) == {"recipes_search"}
+
+
+async def test_rebuild_keeps_the_old_index_until_the_new_one_is_built(monkeypatch):
+    """Test a changed index is built under a temporary name first, and kept if that fails."""
+    model = IndexModel([("email", ASCENDING)], name="users_email", unique=True)
+    monkeypatch.setattr(migrations, "INDEXES", {"users": [model]})
+    old = {"users_email": {"key": [("email", 1)], "v": 2}}
+    database = _FakeIndexedDatabase()
+
+    database["users"] = _FakeIndexedCollection(
+        "users", old, refuse={"users_email_rebuild": DuplicateKeyError("E11000 duplicate key error")}
+    )
+    report = await ensure_indexes(database)
+    assert report["users"]["failed"] == ["users_email"]
+    assert database["users"].indexes == old
+
+    database["users"] = _FakeIndexedCollection("users", old)
+    drop_index = database["users"].drop_index
+    remaining = []
+
+    async def record_remaining(name):
+        await drop_index(name)
+        remaining.append(set(database["users"].indexes))
+
+    database["users"].drop_index = record_remaining
+    report = await ensure_indexes(database)
+    assert report["users"]["failed"] == []
+    assert set(database["users"].indexes) == {"users_email"}
+    assert database["users"].indexes["users_email"]["unique"] is True
+    # Some index on email was there all along
+    assert remaining == [{"users_email_rebuild"}, {"users_email"}]
+
+
+async def test_rebuild_replaces_in_place_when_both_cannot_exist(monkeypatch):
+    """Test an index the server will not build next to the old one (a second text index) is replaced directly."""
+    model = IndexModel([("search.title", TEXT)], name="recipes_search", weights={"search.title": 10})
+    monkeypatch.setattr(migrations, "INDEXES", {"recipes": [model]})
+    database = _FakeIndexedDatabase()
+    database["recipes"] = _FakeIndexedCollection(
+        "recipes",
+        {"recipes_search": {"key": [("_fts", "text"), ("_ftsx", 1)], "weights": {"search.title": 1}}},
+        refuse={"recipes_search_rebuild": OperationFailure("only one text index per collection allowed", 67)},
+    )
+
+    report = await ensure_indexes(database)
+
+    assert report["recipes"]["failed"] == []
+    assert database["recipes"].indexes["recipes_search"]["weights"] == {"search.title": 10}
+
+
+@pytest.mark.integration
+async def test_ensure_indexes_is_idempotent(test_db):
+    """Test indexes are built once and a second run finds no drift."""
+    await ensure_indexes(test_db)
+    await ensure_indexes(test_db)
+
+    report = await check_indexes(test_db)
+    for collection_name in INDEXES:
+        assert report[collection_name]["missing"] == []
+        assert report[collection_name]["changed"] == []
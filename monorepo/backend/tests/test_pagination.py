@@ -0,0 +1,67 @@
+import pytest
+from datetime import datetime
+from bson import ObjectId
+from fastapi.testclient import TestClient
+from core.pagination import encode_cursor, decode_cursor, NEXT_CURSOR_HEADER
+from tests.utils import (
+    create_test_recipe_data,
+    register_and_login
+)
+
+
+def test_cursor_round_trip():
+    """Test a cursor decodes back to the id and timestamp it was built from."""
+    item_id = str(ObjectId())
+    created_at = datetime(2024, 5, 1, 12, 30, 15, 123000)
+
+    decoded_id, decoded_created_at = decode_cursor(encode_cursor(item_id, created_at))
+
+    assert str(decoded_id) == item_id
+    assert decoded_created_at == created_at
+
+
+def test_cursor_without_timestamp():
+    """Test id-only cursors used for user listing."""
+    item_id = str(ObjectId())
+
+    assert decode_cursor(encode_cursor(item_id)) == (ObjectId(item_id), None)
+
+
+@pytest.mark.parametrize("cursor", ["", "not-a-cursor", encode_cursor("123")])
+def test_decode_invalid_cursor(cursor):
+    """Test malformed cursors are rejected with ValueError."""
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+@pytest.mark.integration
+async def test_public_recipes_cursor_pagination(client: TestClient, clean_db):
+    """Test following the next cursor walks every recipe exactly once."""
+    auth_data = await register_and_login(client)
+    for _ in range(5):
+        client.post(
+            "/api/v1/recipes/",
+            json=create_test_recipe_data(visibility="public"),
+            headers=auth_data["headers"]
+        )
+
+    seen = []
+    response = client.get("/api/v1/recipes/?limit=2")
+    while True:
+        assert response.status_code == 200
+        seen.extend(r["_id"] for r in response.json())
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if not cursor:
+            break
+        response = client.get(f"/api/v1/recipes/?limit=2&cursor={cursor}")
+
+    assert len(seen) == 5
+    assert len(set(seen)) == 5
+
+
+@pytest.mark.integration
+def test_invalid_cursor_rejected(client: TestClient, clean_db):
+    """Test a malformed cursor returns 400."""
+    response = client.get("/api/v1/recipes/?cursor=garbage")
+
+    assert response.status_code == 400
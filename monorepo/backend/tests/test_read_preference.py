@@ -0,0 +1,85 @@
+import os
+import pytest
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import monitoring
+from pymongo.read_preferences import ReadPreference, SecondaryPreferred
+from core.database import ReadMode, read_preference_for
+from domain.recipe import RecipeInDB, Visibility
+from repository.recipe_repository import RecipeRepository
+
+# A replica set with at least one secondary, e.g. the "replica-set" profile
+# in docker-compose.yaml: mongodb://localhost:27018,localhost:27019/?replicaSet=rs0
+REPLICA_SET_URL = os.getenv("MONGO_REPLICA_SET_URL")
+
+
+def test_read_preference_for_modes():
+    """Test public reads go to secondaries with a staleness bound."""
+    assert read_preference_for(ReadMode.PRIMARY) == ReadPreference.PRIMARY
+    assert read_preference_for(ReadMode.PUBLIC) == SecondaryPreferred(max_staleness=90)
+
+
+def test_unknown_read_preference_fails_at_startup():
+    """Test a misspelled MONGO_PUBLIC_READ_PREFERENCE is refused when settings load, not per request."""
+    from pydantic import ValidationError
+    from core.config import Settings
+
+    assert Settings(MONGO_PUBLIC_READ_PREFERENCE="nearest").MONGO_PUBLIC_READ_PREFERENCE == "nearest"
+    with pytest.raises(ValidationError):
+        Settings(MONGO_PUBLIC_READ_PREFERENCE="secondarypreferred")
+
+
+def test_repository_routes_public_reads():
+    """Test the repository keeps one collection handle per read mode."""
+    # Creating a client does not connect
+    repo = RecipeRepository(AsyncIOMotorClient()["recipe_app_test"])
+
+    assert repo._readers[ReadMode.PRIMARY].read_preference == ReadPreference.PRIMARY
+    assert repo._readers[ReadMode.PUBLIC].read_preference == SecondaryPreferred(max_staleness=90)
+
+
+class _CommandServers(monitoring.CommandListener):
+    """Records which server each read command was sent to."""
+
+    def __init__(self):
+        self.servers = []
+
+    def started(self, event):
+        if event.command_name in ("find", "aggregate"):
+            self.servers.append(event.connection_id)
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+@pytest.mark.integration
+@pytest.mark.skipif(not REPLICA_SET_URL, reason="MONGO_REPLICA_SET_URL not set")
+async def test_public_reads_use_secondary():
+    """Test public feed and random reads hit a secondary while author reads stay on the primary."""
+    listener = _CommandServers()
+    client = AsyncIOMotorClient(REPLICA_SET_URL, event_listeners=[listener])
+    db = client["recipe_app_test_replica"]
+    try:
+        hello = await client.admin.command("hello")
+        primary = tuple(hello["primary"].rsplit(":", 1))
+        primary = (primary[0], int(primary[1]))
+
+        repo = RecipeRepository(db)
+        await repo.create(RecipeInDB(title="Replicated", author_id="author", visibility=Visibility.PUBLIC))
+
+        listener.servers.clear()
+        await repo.get_all(public_only=True)
+        await repo.get_random(limit=1)
+        public_servers = set(listener.servers)
+
+        listener.servers.clear()
+        await repo.get_all(author_id="author")
+        author_servers = set(listener.servers)
+
+        assert public_servers and primary not in public_servers
+        assert author_servers == {primary}
+    finally:
+        await client.drop_database("recipe_app_test_replica")
+        client.close()
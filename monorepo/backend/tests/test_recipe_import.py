@@ -169,3 +169,58 @@ async def test_create_recipe_from_url_scraping_failure(recipe_service, mock_scra
     
     assert excinfo.value.status_code == 400
     assert "Failed to scrape URL" in excinfo.value.detail
+
+async def _lines(*titles):
+    for line_no, title in enumerate(titles, start=1):
+        yield line_no, f'{{"title": "{title}", "visibility": "private"}}'.encode()
+
+@pytest.mark.asyncio
+async def test_bulk_create_reports_failed_batches_and_carries_on(recipe_service, mock_recipe_repo):
+    from pymongo.errors import AutoReconnect
+
+    def insert_many(recipes, errors):
+        if recipes[0].title == "Lost":
+            raise AutoReconnect("connection closed")
+        errors[1] = "Document failed validation"
+        return ["id1", None, None]
+
+    mock_recipe_repo.insert_many.side_effect = insert_many
+
+    results = [
+        result async for result in
+        recipe_service.bulk_create_recipes(_lines("Soup", "Refused", "Known", "Lost", "Lost too"), "user123", batch_size=3)
+    ]
+
+    assert [(result["line"], result["status"]) for result in results] == [
+        (1, "created"), (2, "error"), (3, "duplicate"), (4, "error"), (5, "error")
+    ]
+    assert results[1]["detail"] == "Document failed validation"
+    assert "connection closed" in results[3]["detail"]
+
+@pytest.mark.asyncio
+async def test_insert_many_maps_refused_recipes_to_errors():
+    from bson import ObjectId
+    from pymongo.errors import BulkWriteError
+    from domain.recipe import RecipeInDB
+    from repository.recipe_repository import RecipeRepository
+
+    def insert_many(docs, ordered):
+        for doc in docs:
+            doc["_id"] = ObjectId()
+        raise BulkWriteError({"writeErrors": [
+            {"index": 0, "code": 11000, "errmsg": "E11000 duplicate key error"},
+            {"index": 2, "code": 121, "errmsg": "Document failed validation"},
+        ]})
+
+    db = MagicMock()
+    db.recipes.insert_many = AsyncMock(side_effect=insert_many)
+    repo = RecipeRepository(db)
+    recipes = [RecipeInDB(title=f"Recipe {i}", author_id="importer") for i in range(3)]
+
+    with pytest.raises(BulkWriteError):
+        await repo.insert_many(recipes)
+
+    errors = {}
+    ids = await repo.insert_many(recipes, errors)
+    assert ids[0] is None and ids[1] and ids[2] is None
+    assert errors == {2: "Document failed validation"}
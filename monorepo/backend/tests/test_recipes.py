@@ -1,11 +1,27 @@
 import pytest
 from fastapi.testclient import TestClient
+from domain.recipe import parse_recipe_fields
 from tests.utils import (
     create_test_recipe_data,
     register_and_login
 )
 
 
+def test_parse_recipe_fields_profiles_and_names():
+    """Test field profiles expand and can be combined with single fields."""
+    assert parse_recipe_fields(None) is None
+    assert parse_recipe_fields("summary") == {"title", "image_url", "tags", "is_favorite"}
+    assert parse_recipe_fields("summary, description") == {"title", "image_url", "tags", "is_favorite", "description"}
+
+
+def test_parse_recipe_fields_rejects_unknown_and_internal():
+    """Test unknown and internal fields are rejected."""
+    with pytest.raises(ValueError):
+        parse_recipe_fields("title,password")
+    with pytest.raises(ValueError):
+        parse_recipe_fields("favorite_by")
+
+
 @pytest.mark.integration
 async def test_create_recipe(client: TestClient, clean_db):
     """Test authenticated user can create a recipe."""
@@ -279,3 +295,369 @@ async def test_filter_recipes_by_tags(client: TestClient, clean_db):
     data = response.json()
     assert len(data) == 1
     assert "dessert" in data[0]["tags"]
+
+
+@pytest.mark.integration
+async def test_search_recipes_ranks_title_matches_first(client: TestClient, clean_db):
+    """Test full-text search ranks title matches above description matches."""
+    auth_data = await register_and_login(client)
+
+    in_description = create_test_recipe_data(title="Weekend Stew", visibility="public")
+    in_description["description"] = "Slow cooked, finish with a little garlic."
+    in_title = create_test_recipe_data(title="Garlic Soup", visibility="public")
+
+    client.post("/api/v1/recipes/", json=in_description, headers=auth_data["headers"])
+    client.post("/api/v1/recipes/", json=in_title, headers=auth_data["headers"])
+
+    response = client.get("/api/v1/recipes/?search=garlic")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert [r["title"] for r in data] == ["Garlic Soup", "Weekend Stew"]
+
+
+@pytest.mark.integration
+async def test_search_recipes_ignores_diacritics_and_inflection(client: TestClient, clean_db):
+    """Test Czech queries match regardless of diacritics and word endings."""
+    auth_data = await register_and_login(client)
+
+    recipe = create_test_recipe_data(title="Česneková polévka", visibility="public")
+    client.post("/api/v1/recipes/", json=recipe, headers=auth_data["headers"])
+
+    response = client.get("/api/v1/recipes/?search=cesnek")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data) == 1
+    assert data[0]["title"] == "Česneková polévka"
+
+
+@pytest.mark.integration
+async def test_list_recipes_summary_fields(client: TestClient, clean_db):
+    """Test fields=summary returns only the card fields."""
+    auth_data = await register_and_login(client)
+    response = client.post(
+        "/api/v1/recipes/",
+        json=create_test_recipe_data(visibility="public"),
+        headers=auth_data["headers"]
+    )
+    recipe_id = response.json()["_id"]
+    client.post(f"/api/v1/recipes/{recipe_id}/favorite", headers=auth_data["headers"])
+
+    response = client.get("/api/v1/recipes/?fields=summary", headers=auth_data["headers"])
+
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data) == 1
+    assert set(data[0]) == {"_id", "title", "image_url", "tags", "is_favorite"}
+    assert data[0]["is_favorite"] is True
+
+
+@pytest.mark.integration
+def test_list_recipes_unknown_field(client: TestClient, clean_db):
+    """Test requesting an unknown field returns 400."""
+    response = client.get("/api/v1/recipes/?fields=title,secret")
+
+    assert response.status_code == 400
+
+
+@pytest.mark.integration
+async def test_update_missing_recipe(client: TestClient, clean_db):
+    """Test updating a recipe that does not exist returns 404."""
+    auth_data = await register_and_login(client)
+
+    response = client.put(
+        "/api/v1/recipes/0123456789abcdef01234567",
+        json={"title": "Ghost"},
+        headers=auth_data["headers"]
+    )
+
+    assert response.status_code == 404
+
+
+@pytest.mark.integration
+async def test_update_not_owner_leaves_recipe_unchanged(client: TestClient, clean_db):
+    """Test a rejected update does not modify the stored recipe."""
+    owner = await register_and_login(client)
+    recipe_data = create_test_recipe_data(visibility="public")
+    recipe_id = client.post("/api/v1/recipes/", json=recipe_data, headers=owner["headers"]).json()["_id"]
+
+    other = await register_and_login(client)
+    client.put(f"/api/v1/recipes/{recipe_id}", json={"title": "Hacked"}, headers=other["headers"])
+    client.delete(f"/api/v1/recipes/{recipe_id}", headers=other["headers"])
+
+    response = client.get(f"/api/v1/recipes/{recipe_id}")
+    assert response.status_code == 200
+    assert response.json()["title"] == recipe_data["title"]
+
+
+@pytest.mark.integration
+async def test_random_recipes_are_distinct_and_public(client: TestClient, clean_db):
+    """Test /random returns distinct public recipes only."""
+    auth_data = await register_and_login(client)
+    public_ids = set()
+    for i in range(6):
+        recipe_data = create_test_recipe_data(visibility="public" if i % 3 else "private")
+        response = client.post("/api/v1/recipes/", json=recipe_data, headers=auth_data["headers"])
+        if i % 3:
+            public_ids.add(response.json()["_id"])
+
+    response = client.get("/api/v1/recipes/random?limit=5")
+
+    assert response.status_code == 200
+    ids = [recipe["_id"] for recipe in response.json()]
+    assert len(ids) == len(set(ids)) == len(public_ids)
+    assert set(ids) == public_ids
+
+
+@pytest.mark.integration
+async def test_random_recipes_without_random_key(test_db):
+    """Test recipes written before random_key existed are still picked."""
+    from repository.recipe_repository import RecipeRepository
+
+    await test_db.recipes.insert_many([
+        {"title": f"Old {i}", "author_id": "a", "visibility": "public"} for i in range(3)
+    ])
+
+    recipes = await RecipeRepository(test_db).get_random(limit=2)
+    assert len(recipes) == 2
+
+
+def test_build_import_hash():
+    """Test imports are identified by URL, else by normalized title, per author."""
+    from repository.recipe_repository import build_import_hash
+
+    assert build_import_hash("a", "Guláš", "https://x/1") == build_import_hash("a", "Other", "https://x/1")
+    assert build_import_hash("a", "Guláš  ") == build_import_hash("a", "gulas")
+    assert build_import_hash("a", "Guláš") != build_import_hash("b", "Guláš")
+
+
+@pytest.mark.integration
+async def test_insert_many_skips_duplicates(test_db):
+    """Test re-importing the same recipes inserts nothing."""
+    from domain.recipe import RecipeInDB
+    from repository.recipe_repository import RecipeRepository
+
+    repo = RecipeRepository(test_db)
+    recipes = [RecipeInDB(title=f"Imported {i}", author_id="importer") for i in range(5)]
+
+    assert all(await repo.insert_many(recipes))
+    ids = await repo.insert_many(recipes + [RecipeInDB(title="Imported 5", author_id="importer")])
+    assert ids[:5] == [None] * 5 and ids[5]
+    assert await test_db.recipes.count_documents({"author_id": "importer"}) == 6
+
+
+@pytest.mark.integration
+async def test_bulk_create_recipes(client: TestClient, clean_db):
+    """Test NDJSON bulk import reports a result for every line."""
+    import json
+
+    auth_data = await register_and_login(client)
+    body = "\n".join([
+        json.dumps(create_test_recipe_data(title="Bulk One")),
+        json.dumps({"description": "missing title"}),
+        "",
+        json.dumps(create_test_recipe_data(title="Bulk Two")),
+        json.dumps(create_test_recipe_data(title="Bulk One")),
+    ])
+
+    response = client.post(
+        "/api/v1/recipes/bulk",
+        content=body.encode(),
+        headers={**auth_data["headers"], "Content-Type": "application/x-ndjson"}
+    )
+
+    assert response.status_code == 200
+    *results, summary = [json.loads(line) for line in response.text.splitlines()]
+    statuses = {result["line"]: result["status"] for result in results}
+    assert statuses == {1: "created", 2: "error", 4: "created", 5: "duplicate"}
+    assert summary == {"summary": {"created": 2, "duplicate": 1, "error": 1}}
+
+    response = client.get("/api/v1/recipes/me", headers=auth_data["headers"])
+    assert sorted(recipe["title"] for recipe in response.json()) == ["Bulk One", "Bulk Two"]
+
+
+@pytest.mark.integration
+@pytest.mark.parametrize("export_format", ["ndjson", "json"])
+async def test_export_my_recipes(client: TestClient, clean_db, export_format):
+    """Test the export contains exactly the caller's recipes, newest first."""
+    import json
+
+    auth_data = await register_and_login(client)
+    for i in range(3):
+        client.post("/api/v1/recipes/", json=create_test_recipe_data(title=f"Mine {i}"), headers=auth_data["headers"])
+    other = await register_and_login(client)
+    client.post("/api/v1/recipes/", json=create_test_recipe_data(title="Theirs"), headers=other["headers"])
+
+    response = client.get(f"/api/v1/recipes/me/export?format={export_format}", headers=auth_data["headers"])
+
+    assert response.status_code == 200
+    if export_format == "ndjson":
+        recipes = [json.loads(line) for line in response.text.splitlines()]
+    else:
+        recipes = response.json()
+    assert [recipe["title"] for recipe in recipes] == ["Mine 2", "Mine 1", "Mine 0"]
+    assert "search" not in recipes[0]
+
+
+def test_merge_and_scale_facets():
+    from services.recipe_service import merge_facets, scale_facets
+
+    public = {"total": 10, "visibility": {"public": 10}, "tags": [("soup", 6), ("quick", 4)]}
+    own = {"total": 3, "visibility": {"private": 3}, "tags": [("quick", 3), ("cake", 1)]}
+
+    merged = merge_facets(public, own, tag_limit=2)
+    assert merged["total"] == 13
+    assert merged["visibility"] == {"public": 10, "private": 3}
+    assert merged["tags"] == [("quick", 7), ("soup", 6)]
+    assert merged["estimated"] is False
+
+    scaled = scale_facets(public, 2.5)
+    assert scaled == {
+        "total": 25, "visibility": {"public": 25}, "tags": [("soup", 15), ("quick", 10)], "estimated": True
+    }
+    assert merge_facets(scaled, own, tag_limit=5)["estimated"] is True
+
+
+@pytest.mark.integration
+async def test_recipe_facets(client: TestClient, clean_db):
+    """Test facets count public recipes plus the caller's own private ones."""
+    from services.recipe_service import _public_facets_cache
+    _public_facets_cache.clear()
+
+    auth_data = await register_and_login(client)
+    for title, visibility, tags in [
+        ("Tomato Soup", "public", ["soup", "quick"]),
+        ("Onion Soup", "public", ["soup"]),
+        ("Secret Soup", "private", ["soup", "quick"]),
+    ]:
+        client.post(
+            "/api/v1/recipes/",
+            json=create_test_recipe_data(title=title, visibility=visibility, tags=tags),
+            headers=auth_data["headers"]
+        )
+    other = await register_and_login(client)
+    client.post(
+        "/api/v1/recipes/",
+        json=create_test_recipe_data(title="Their Soup", visibility="private", tags=["soup"]),
+        headers=other["headers"]
+    )
+
+    response = client.get("/api/v1/recipes/facets", headers=auth_data["headers"])
+    assert response.status_code == 200
+    facets = response.json()
+    assert facets["total"] == 3
+    assert facets["visibility"] == {"public": 2, "private": 1}
+    assert facets["tags"] == [{"tag": "soup", "count": 3}, {"tag": "quick", "count": 2}]
+    assert facets["estimated"] is False
+
+    facets = client.get("/api/v1/recipes/facets?tags=quick").json()
+    assert facets["total"] == 1
+    assert facets["visibility"] == {"public": 1}
+
+    facets = client.get("/api/v1/recipes/facets?search=soup", headers=other["headers"]).json()
+    assert facets["total"] == 3
+    assert facets["visibility"] == {"public": 2, "private": 1}
+
+
+@pytest.mark.integration
+async def test_suggest_recipes(client: TestClient, clean_db):
+    """Test suggestions cover public recipes only and follow updates."""
+    from services.suggest_index import suggest_index
+    # Rebuilt from the clean database on first use
+    suggest_index.ready = False
+
+    auth_data = await register_and_login(client)
+    created = client.post(
+        "/api/v1/recipes/",
+        json=create_test_recipe_data(title="Česneková polévka", visibility="public", tags=["Polévka"]),
+        headers=auth_data["headers"]
+    ).json()
+    client.post(
+        "/api/v1/recipes/",
+        json=create_test_recipe_data(title="Polévka tajná", visibility="private"),
+        headers=auth_data["headers"]
+    )
+
+    response = client.get("/api/v1/recipes/suggest?q=polev")
+    assert response.status_code == 200
+    assert response.json() == {
+        "titles": [{"_id": created["_id"], "title": "Česneková polévka"}],
+        "tags": [{"tag": "Polévka", "count": 1}],
+    }
+
+    client.put(f"/api/v1/recipes/{created['_id']}", json={"visibility": "private"}, headers=auth_data["headers"])
+    assert client.get("/api/v1/recipes/suggest?q=polev").json() == {"titles": [], "tags": []}
+
+
+@pytest.mark.integration
+async def test_recipes_by_ingredients(client: TestClient, clean_db):
+    """Test ingredient matching covers public recipes and the AI fast path uses it."""
+    from services.ingredient_index import ingredient_index
+    # Rebuilt from the clean database on first use
+    ingredient_index.ready = False
+
+    auth_data = await register_and_login(client)
+    for title, visibility, names in [
+        ("Omeleta", "public", ["Vejce", "Mléko", "Sůl"]),
+        ("Palačinky", "public", ["Mouka", "Vejce", "Mléko"]),
+        ("Tajná omeleta", "private", ["Vejce"]),
+    ]:
+        data = create_test_recipe_data(title=title, visibility=visibility)
+        data["ingredients"] = [{"name": name, "amount": "1"} for name in names]
+        client.post("/api/v1/recipes/", json=data, headers=auth_data["headers"])
+
+    response = client.get("/api/v1/recipes/by-ingredients?ingredients=vejce&ingredients=mleko")
+    assert response.status_code == 200
+    assert [(m["title"], m["missing"]) for m in response.json()] == [("Omeleta", []), ("Palačinky", ["Mouka"])]
+
+    response = client.post(
+        "/api/v1/agent/generate-from-ingredients",
+        json={"ingredients": ["vejce", "mléko"]},
+        headers=auth_data["headers"]
+    )
+    assert response.status_code == 200
+    assert [recipe["title"] for recipe in response.json()["recipes"]] == ["Omeleta", "Palačinky"]
+
+
+class _CountingRecipeRepo:
+    def __init__(self, recipe):
+        self.recipe = recipe
+        self.reads = 0
+
+    async def get_by_id(self, recipe_id):
+        self.reads += 1
+        return self.recipe
+
+
+class _FavoritesOf:
+    def __init__(self, *user_ids):
+        self.user_ids = set(user_ids)
+
+    async def is_favorite(self, user_id, recipe_id):
+        return user_id in self.user_ids
+
+
+async def test_get_recipe_shares_cached_entry_but_not_is_favorite():
+    """Test one read serves every user, with is_favorite and access control per request."""
+    from fastapi import HTTPException
+    from domain.recipe import RecipeInDB, Visibility
+    from services.recipe_service import RecipeService, recipe_cache
+
+    recipe_cache.clear()
+    recipe = RecipeInDB(_id="r1", title="Svíčková", author_id="chef", visibility="public")
+    repo = _CountingRecipeRepo(recipe)
+    service = RecipeService(repo, favorite_repo=_FavoritesOf("fan"))
+
+    assert (await service.get_recipe("r1", "fan")).is_favorite is True
+    assert (await service.get_recipe("r1", "other")).is_favorite is False
+    assert (await service.get_recipe("r1")).is_favorite is False
+    assert repo.reads == 1
+
+    recipe_cache.invalidate("r1")
+    repo.recipe = recipe.model_copy(update={"visibility": Visibility.PRIVATE})
+    with pytest.raises(HTTPException) as error:
+        await service.get_recipe("r1", "fan")
+    assert error.value.status_code == 403
+    assert (await service.get_recipe("r1", "chef")).title == "Svíčková"
+    assert repo.reads == 2
@@ -0,0 +1,90 @@
+import asyncio
+from datetime import datetime
+import pytest
+from bson import ObjectId
+from core.schema import DocumentSchema, upgrade_collection
+from repository.recipe_repository import RECIPE_SCHEMA, RecipeRepository
+from repository.user_repository import USER_SCHEMA
+
+
+def test_upgrade_applies_missing_steps_and_guards_the_write():
+    """Test only the steps after the stored version run and the write is conditional."""
+    schema = DocumentSchema([
+        lambda doc: {"a": 1},
+        lambda doc: {"b": doc["a"] + 1},
+    ])
+    doc = {"_id": 1, "schema_version": 1, "a": 5}
+
+    update = schema.upgrade(doc)
+
+    assert doc == {"_id": 1, "schema_version": 2, "a": 5, "b": 6}
+    assert update._filter == {"_id": 1, "schema_version": 1, "b": {"$exists": False}}
+    assert update._doc == {"$set": {"b": 6, "schema_version": 2}}
+
+
+def test_upgrade_of_unversioned_document_guards_original_values():
+    """Test version 0 documents match on a missing schema_version and the values read."""
+    schema = DocumentSchema([lambda doc: {"amount": str(doc["amount"])}])
+    doc = {"_id": 1, "amount": 2}
+
+    update = schema.upgrade(doc)
+
+    assert update._filter == {"_id": 1, "schema_version": {"$exists": False}, "amount": {"$eq": 2}}
+    assert doc["amount"] == "2"
+
+
+def test_current_document_is_left_alone():
+    """Test documents at the current version need no write."""
+    doc = {"_id": 1, "schema_version": RECIPE_SCHEMA.version, "title": "Guláš"}
+
+    assert RECIPE_SCHEMA.upgrade(doc) is None
+    assert doc == {"_id": 1, "schema_version": RECIPE_SCHEMA.version, "title": "Guláš"}
+
+
+def test_recipe_v1_upgrade():
+    """Test legacy recipe shapes are normalized."""
+    _id = ObjectId.from_datetime(datetime(2023, 5, 1))
+    doc = {
+        "_id": _id,
+        "title": "Guláš",
+        "author_id": "a",
+        "ingredients": [{"name": "cibule", "amount": 2}, {"name": "sůl", "amount": None}],
+        "favorite_by": ["u1", "u2"],
+    }
+
+    RECIPE_SCHEMA.upgrade(doc)
+
+    assert [i["amount"] for i in doc["ingredients"]] == ["2", ""]
+    assert doc["favorite_count"] == 2
+    assert doc["visibility"] == "private"
+    assert doc["created_at"] == doc["updated_at"] == datetime(2023, 5, 1)
+
+
+def test_user_v1_upgrade():
+    """Test legacy users get their creation time from the ObjectId and default flags."""
+    _id = ObjectId.from_datetime(datetime(2022, 1, 2))
+    doc = {"_id": _id, "email": "old@example.com", "hashed_password": "x"}
+
+    USER_SCHEMA.upgrade(doc)
+
+    assert doc["created_at"] == datetime(2022, 1, 2)
+    assert doc["is_active"] is True
+    assert doc["role"] == "user"
+
+
+@pytest.mark.integration
+async def test_legacy_recipe_is_upgraded_on_read_and_in_bulk(test_db):
+    """Test reads upgrade and write back legacy recipes, and the bulk upgrader finishes the rest."""
+    legacy = {"title": "Starý recept", "author_id": "a", "ingredients": [{"name": "mouka", "amount": 500}]}
+    first = (await test_db.recipes.insert_one(dict(legacy))).inserted_id
+    await test_db.recipes.insert_one(dict(legacy))
+
+    recipe = await RecipeRepository(test_db).get_by_id(str(first))
+    assert recipe.ingredients[0].amount == "500"
+    # Written back in the background
+    await asyncio.sleep(0.1)
+    stored = await test_db.recipes.find_one({"_id": first})
+    assert stored["schema_version"] == RECIPE_SCHEMA.version
+
+    assert await upgrade_collection(test_db.recipes, RECIPE_SCHEMA) == 1
+    assert await test_db.recipes.count_documents(RECIPE_SCHEMA.outdated_query()) == 0
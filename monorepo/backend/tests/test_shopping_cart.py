@@ -0,0 +1,61 @@
+import pytest
+from fastapi.testclient import TestClient
+from tests.utils import register_and_login
+
+
+@pytest.mark.integration
+async def test_add_item_creates_cart(client: TestClient, clean_db):
+    """Test the first item creates the cart in the same request."""
+    auth_data = await register_and_login(client)
+
+    response = client.post(
+        "/api/v1/shopping-cart/items",
+        json={"id": "1", "value": "Milk"},
+        headers=auth_data["headers"]
+    )
+
+    assert response.status_code == 200
+    assert [item["value"] for item in response.json()["items"]] == ["Milk"]
+
+
+@pytest.mark.integration
+async def test_remove_missing_item(client: TestClient, clean_db):
+    """Test removing an item that is not in the cart returns 404."""
+    auth_data = await register_and_login(client)
+    client.post("/api/v1/shopping-cart/items", json={"id": "1", "value": "Milk"}, headers=auth_data["headers"])
+
+    response = client.delete("/api/v1/shopping-cart/items/2", headers=auth_data["headers"])
+    assert response.status_code == 404
+
+    response = client.delete("/api/v1/shopping-cart/items/1", headers=auth_data["headers"])
+    assert response.status_code == 200
+    assert response.json()["items"] == []
+
+
+@pytest.mark.integration
+async def test_clear_cart_without_cart(client: TestClient, clean_db):
+    """Test clearing works before the cart exists."""
+    auth_data = await register_and_login(client)
+
+    response = client.delete("/api/v1/shopping-cart/clear", headers=auth_data["headers"])
+    assert response.status_code == 204
+
+    response = client.get("/api/v1/shopping-cart/me", headers=auth_data["headers"])
+    assert response.json()["items"] == []
+
+
+@pytest.mark.integration
+async def test_parallel_first_adds_create_one_cart(test_db):
+    """Test concurrent first writes for one user end up in a single cart."""
+    import asyncio
+    from domain.shopping_cart import ShoppingItem
+    from repository.shopping_cart_repository import ShoppingCartRepository
+
+    repo = ShoppingCartRepository(test_db)
+    await asyncio.gather(*[
+        repo.add_item("shopper", ShoppingItem(id=str(n), value=f"item {n}")) for n in range(10)
+    ])
+
+    assert await test_db.shopping_carts.count_documents({"user_id": "shopper"}) == 1
+    cart = await repo.get_by_user_id("shopper")
+    assert sorted(item.id for item in cart.items) == sorted(str(n) for n in range(10))
@@ -0,0 +1,97 @@
+import pytest
+from fastapi.testclient import TestClient
+from domain.recipe import Ingredient
+from services.shopping_list_service import parse_amount, normalize_unit, merge_ingredients
+from tests.utils import create_test_recipe_data, register_and_login
+
+
+@pytest.mark.parametrize("amount, expected", [
+    ("400", (400.0, "")),
+    ("0,5", (0.5, "")),
+    ("0.5", (0.5, "")),
+    ("1/2", (0.5, "")),
+    ("1 1/2", (1.5, "")),
+    ("1½", (1.5, "")),
+    ("2-3", (3.0, "")),
+    ("200g", (200.0, "g")),
+    ("to taste", (None, "to taste")),
+    ("", (None, "")),
+])
+def test_parse_amount(amount, expected):
+    """Test amounts in the formats found in scraped and typed recipes."""
+    assert parse_amount(amount) == expected
+
+
+def test_normalize_unit():
+    """Test units map to a base unit regardless of case, diacritics or a trailing dot."""
+    assert normalize_unit("kg") == ("g", 1000)
+    assert normalize_unit("Lžíce") == ("ml", 15)
+    assert normalize_unit("ks.") == ("ks", 1)
+    assert normalize_unit("stroužky") == ("strouzky", 1)
+    assert normalize_unit(None) == (None, 1)
+
+
+def test_merge_ingredients_sums_across_units():
+    """Test the same ingredient is merged after converting to a common unit."""
+    items = merge_ingredients([
+        Ingredient(name="Mouka", amount="200", unit="g"),
+        Ingredient(name="Vejce", amount="2", unit="ks"),
+        Ingredient(name="mouka ", amount="0,8", unit="kg"),
+        Ingredient(name="Mléko", amount="2", unit="dl"),
+        Ingredient(name="Vejce", amount="1", unit=None),
+    ])
+
+    assert [item.value for item in items] == ["Mouka (1 kg)", "Vejce (2 ks)", "Mléko (200 ml)", "Vejce (1)"]
+    assert (items[0].name, items[0].amount, items[0].unit) == ("Mouka", 1.0, "kg")
+
+
+def test_merge_ingredients_drops_unmeasured_duplicates():
+    """Test "to taste" entries disappear when the ingredient is also measured."""
+    items = merge_ingredients([
+        Ingredient(name="Sůl", amount="to taste"),
+        Ingredient(name="Sul", amount="1", unit="tsp"),
+        Ingredient(name="Pepř", amount=""),
+        Ingredient(name="Pepř", amount=""),
+    ])
+
+    assert [item.value for item in items] == ["Sůl (5 ml)", "Pepř"]
+
+
+@pytest.mark.integration
+async def test_add_recipes_to_cart(client: TestClient, clean_db):
+    """Test ingredients of several recipes end up merged in the cart."""
+    auth_data = await register_and_login(client)
+    recipe_ids = []
+    for amount, unit in (("200", "g"), ("0.3", "kg")):
+        recipe_data = create_test_recipe_data()
+        recipe_data["ingredients"] = [{"name": "Flour", "amount": amount, "unit": unit}]
+        response = client.post("/api/v1/recipes/", json=recipe_data, headers=auth_data["headers"])
+        recipe_ids.append(response.json()["_id"])
+
+    response = client.post(
+        "/api/v1/shopping-cart/from-recipes",
+        json={"recipe_ids": recipe_ids + recipe_ids[:1]},
+        headers=auth_data["headers"]
+    )
+
+    assert response.status_code == 200
+    assert [item["value"] for item in response.json()["items"]] == ["Flour (700 g)"]
+
+
+@pytest.mark.integration
+async def test_add_private_recipe_of_other_user(client: TestClient, clean_db):
+    """Test another user's private recipe cannot be added to the cart."""
+    owner = await register_and_login(client)
+    response = client.post("/api/v1/recipes/", json=create_test_recipe_data(visibility="private"), headers=owner["headers"])
+    recipe_id = response.json()["_id"]
+
+    other = await register_and_login(client)
+    response = client.post(
+        "/api/v1/shopping-cart/from-recipes",
+        json={"recipe_ids": [recipe_id]},
+        headers=other["headers"]
+    )
+
+    assert response.status_code == 404
+    response = client.get("/api/v1/shopping-cart/me", headers=other["headers"])
+    assert response.json()["items"] == []
@@ -0,0 +1,69 @@
+import io
+import json
+import pytest
+from core.streaming import JsonRecordParser, iter_json_records, iter_ndjson_lines
+
+RECORDS = [{"title": "Guláš", "tags": ["maso"]}, {"title": "Koláč, \"domácí\""}, {"title": "[]{}"}]
+
+
+@pytest.mark.parametrize("text", [
+    json.dumps(RECORDS),
+    json.dumps(RECORDS, indent=2, ensure_ascii=False),
+    "\n".join(json.dumps(record, ensure_ascii=False) for record in RECORDS) + "\n",
+])
+def test_iter_json_records_array_and_ndjson(text):
+    """Test JSON arrays and NDJSON yield the same records, whatever the chunk size."""
+    for chunk_size in (1, 7, 1 << 16):
+        assert list(iter_json_records(io.StringIO(text), chunk_size=chunk_size)) == RECORDS
+
+
+def test_parser_returns_records_as_they_complete():
+    """Test records are returned as soon as they are complete."""
+    parser = JsonRecordParser()
+
+    assert parser.feed('[{"title": "A"}, {"tit') == [{"title": "A"}]
+    assert parser.feed('le": "B"}]') == [{"title": "B"}]
+    parser.close()
+
+
+def test_parser_fails_fast_on_oversized_or_malformed_record():
+    """Test a malformed record cannot make the parser buffer the rest of the stream."""
+    parser = JsonRecordParser(max_record_chars=100)
+    assert parser.feed('{"title": "A"}\n{"title": oops}\n') == [{"title": "A"}]
+
+    with pytest.raises(ValueError, match="longer than 100"):
+        for _ in range(20):
+            parser.feed('{"title": "B"}\n')
+
+
+@pytest.mark.parametrize("text", [
+    '[{"title": "A"}, {"title": ',
+    '[{"title": "A"}',
+    '{"title": "A"}\n{"title": oops}\n',
+    '[1, 2]',
+    '[{"title": "A"}] {"title": "B"}',
+])
+def test_iter_json_records_invalid(text):
+    """Test truncated or malformed input raises ValueError."""
+    with pytest.raises(ValueError):
+        list(iter_json_records(io.StringIO(text)))
+
+
+async def _chunks(*chunks):
+    for chunk in chunks:
+        yield chunk
+
+
+async def test_iter_ndjson_lines_across_chunks():
+    """Test lines split across chunks are joined and numbered."""
+    lines = [item async for item in iter_ndjson_lines(_chunks(b'{"a"', b': 1}\n\n{"b": 2}\n{"c"', b': 3}'), 100)]
+
+    assert lines == [(1, b'{"a": 1}'), (2, b''), (3, b'{"b": 2}'), (4, b'{"c": 3}')]
+
+
+async def test_iter_ndjson_lines_too_long():
+    """Test an overlong line is dropped as it streams in and reported as None."""
+    chunks = _chunks(b'{"a": 1}\n{"long": "', b"x" * 50, b"x" * 50, b'"}\n{"b": 2}\n')
+    lines = [item async for item in iter_ndjson_lines(chunks, 20)]
+
+    assert lines == [(1, b'{"a": 1}'), (2, None), (3, b'{"b": 2}')]
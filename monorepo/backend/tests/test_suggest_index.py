@@ -0,0 +1,67 @@
+from services.suggest_index import SuggestIndex
+
+
+def _index():
+    index = SuggestIndex()
+    index.build([
+        ("1", "Česneková polévka", ["Polévka", "Rychlé"]),
+        ("2", "Polévka z dýně", ["polévka"]),
+        ("3", "Bramborový salát", ["Salát"]),
+    ])
+    return index
+
+
+def test_suggest_is_diacritic_and_case_insensitive():
+    """Test folded prefixes match titles and tags written with diacritics."""
+    titles, tags = _index().suggest("CESN")
+
+    assert titles == [("1", "Česneková polévka")]
+    assert tags == []
+
+
+def test_suggest_matches_later_words_after_title_starts():
+    """Test titles starting with the prefix rank before mid-title matches."""
+    titles, tags = _index().suggest("pol")
+
+    assert titles == [("2", "Polévka z dýně"), ("1", "Česneková polévka")]
+    assert tags == [("Polévka", 2)]
+
+
+def test_incremental_updates():
+    """Test put, put_many and remove keep titles and tag counts in step."""
+    index = _index()
+    index.put("2", "Dýňové rizoto", ["rizoto"])
+    index.put_many([("4", "Polévka gulášová", ["Polévka"])])
+    index.remove("1")
+    index.remove("unknown")
+
+    titles, tags = index.suggest("pol")
+    assert titles == [("4", "Polévka gulášová")]
+    assert tags == [("Polévka", 1)]
+    assert index.suggest("ryc") == ([], [])
+    assert index.suggest("diy") == ([], [])
+    assert index.suggest("dyn")[0] == [("2", "Dýňové rizoto")]
+    assert len(index) == 3
+
+
+def test_suggest_ignores_punctuation_only_queries():
+    """Test a query without letters or digits returns nothing."""
+    assert _index().suggest(" ,!") == ([], [])
+
+
+def test_put_many_replaces_existing_recipes():
+    """Test put_many re-putting known ids next to new ones leaves no stale keys."""
+    index = _index()
+    index.put_many([
+        ("4", "Zelná polévka", ["Zelí"]),
+        ("3", "Okurkový salát", ["Okurky"]),
+        ("1", "Česnečka", ["Rychlé"]),
+        ("4", "Zelňačka", ["Zelí"]),
+    ])
+
+    assert index.suggest("sal") == ([("3", "Okurkový salát")], [])
+    assert index.suggest("zel") == ([("4", "Zelňačka")], [("Zelí", 1)])
+    assert index.suggest("pol") == ([("2", "Polévka z dýně")], [("Polévka", 1)])
+    assert index.suggest("ces")[0] == [("1", "Česnečka")]
+    assert index.suggest("ok")[1] == [("Okurky", 1)]
+    assert len(index) == 4
@@ -0,0 +1,34 @@
+from core.text import fold, tokenize, stem, search_terms
+from repository.recipe_repository import build_search_fields
+
+
+def test_fold_strips_czech_diacritics():
+    """Test diacritics are removed and text is lowercased."""
+    assert fold("Česneková Polévka s Knedlíčky") == "cesnekova polevka s knedlicky"
+
+
+def test_tokenize_splits_on_punctuation():
+    """Test tokens are alphanumeric runs of folded text."""
+    assert tokenize("Svíčková, na smetaně (2 porce)") == ["svickova", "na", "smetane", "2", "porce"]
+
+
+def test_stem_conflates_czech_inflections():
+    """Test inflected forms of the same word share a stem."""
+    assert stem("brambory") == stem("bramborami") == stem("brambor")
+    assert search_terms("česneková") == search_terms("česnek")
+
+
+def test_stem_keeps_short_words():
+    """Test short tokens are left alone."""
+    assert stem("sul") == "sul"
+    assert stem("a") == "a"
+
+
+def test_build_search_fields_only_present_fields():
+    """Test partial updates only produce search terms for changed fields."""
+    fields = build_search_fields({"title": "Bramborová polévka", "tags": ["Polévky", "Rychlé"]})
+
+    assert fields == {
+        "search.title": "brambor polevk",
+        "search.tags": "polevk rychl",
+    }
@@ -1,5 +1,8 @@
 import pytest
 from fastapi.testclient import TestClient
+from api.deps import _get_user, _on_user_change, user_cache
+from core.invalidation import ChangeEvent
+from domain.user import UserInDB
 from tests.utils import (
     create_test_user_data,
     create_test_admin_data,
@@ -75,3 +78,45 @@ def test_list_users_unauthenticated(client: TestClient, clean_db):
     response = client.get("/api/v1/users/")
     
     assert response.status_code == 401
+
+
+class _FakeUserRepo:
+    def __init__(self, user):
+        self.user = user
+        self.lookups = 0
+
+    async def get_by_email(self, email):
+        self.lookups += 1
+        return self.user
+
+
+async def test_authenticated_user_is_cached_until_changed():
+    """Test repeated lookups hit the cache and a write to the user drops it."""
+    user_cache.clear()
+    user = UserInDB(_id="u1", email="cook@example.com", hashed_password="x")
+    repo = _FakeUserRepo(user)
+
+    first = await _get_user("cook@example.com", repo)
+    second = await _get_user("cook@example.com", repo)
+    assert repo.lookups == 1
+    assert first == second == user
+    # Each request gets its own copy
+    assert first is not second
+
+    repo.user = user.model_copy(update={"is_active": False})
+    _on_user_change(ChangeEvent("users", "update", "u1"))
+    assert (await _get_user("cook@example.com", repo)).is_active is False
+    assert repo.lookups == 2
+
+    _on_user_change(ChangeEvent("users", "reset"))
+    assert len(user_cache) == 0
+
+
+async def test_unknown_user_is_not_cached():
+    """Test a subject without a user is looked up again next time."""
+    user_cache.clear()
+    repo = _FakeUserRepo(None)
+
+    assert await _get_user("gone@example.com", repo) is None
+    assert await _get_user("gone@example.com", repo) is None
+    assert repo.lookups == 2
@@ -2,6 +2,7 @@ import asyncio
 import os
 from motor.motor_asyncio import AsyncIOMotorClient
 from repository.recipe_repository import RecipeRepository
+from repository.favorite_repository import FavoriteRepository
 from domain.recipe import RecipeInDB, Visibility
 from datetime import datetime
 
@@ -14,6 +15,7 @@ async def verify_favorite_feature():
     client = AsyncIOMotorClient(mongo_url)
     db = client.recipe_app_test  # Use a test DB
     repo = RecipeRepository(db)
+    favorite_repo = FavoriteRepository(db)
     
     user_id = "test_user_123"
     
@@ -21,8 +23,7 @@ async def verify_favorite_feature():
     recipe_in = RecipeInDB(
         title="Test Favorite Recipe",
         author_id="author_123",
-        visibility=Visibility.PUBLIC,
-        favorite_by=[]
+        visibility=Visibility.PUBLIC
     )
     created_recipe = await repo.create(recipe_in)
     recipe_id = created_recipe.id
@@ -30,24 +31,28 @@ async def verify_favorite_feature():
     
     # 2. Toggle favorite on (Add)
     print(f"Toggling favorite ON for user {user_id}")
-    success = await repo.toggle_favorite(recipe_id, user_id)
-    assert success is True
+    is_favorite = await favorite_repo.toggle(user_id, recipe_id)
+    assert is_favorite is True
+    await repo.adjust_favorite_count(recipe_id, 1)
     
+    assert await favorite_repo.is_favorite(user_id, recipe_id)
     updated_recipe = await repo.get_by_id(recipe_id)
-    assert user_id in updated_recipe.favorite_by
+    assert updated_recipe.favorite_count == 1
     print("Favorite added successfully.")
     
     # 3. Toggle favorite off (Remove)
     print(f"Toggling favorite OFF for user {user_id}")
-    success = await repo.toggle_favorite(recipe_id, user_id)
-    assert success is True
+    is_favorite = await favorite_repo.toggle(user_id, recipe_id)
+    assert is_favorite is False
+    await repo.adjust_favorite_count(recipe_id, -1)
     
+    assert not await favorite_repo.is_favorite(user_id, recipe_id)
     updated_recipe = await repo.get_by_id(recipe_id)
-    assert user_id not in updated_recipe.favorite_by
+    assert updated_recipe.favorite_count == 0
     print("Favorite removed successfully.")
     
     # Cleanup
-    await db.recipes.delete_one({"_id": created_recipe.id})
+    await repo.delete(recipe_id)
     print("Cleanup done.")
     client.close()
 